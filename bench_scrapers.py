@@ -0,0 +1,195 @@
+"""
+Scraper Benchmark'ı (Çevrimdışı)
+fixtures/sites altındaki GSStore ve Saat&Saat liste/detay sayfası kayıtlarını
+(sonsuz scroll artımları ve pi=N sayfaları dahil) yerel stub sunucudan oynatır,
+her senaryoyu gerçek tarayıcı ve tracker stratejileriyle N kez çalıştırır ve
+sayfa başına gecikme yüzdelikleri, Playwright çağrısı ve ürün sayısını raporlar.
+Playwright çağrısı motorun profiler sarmalayıcılarıyla saydığı gerçek round-trip'lerdir
+(kart başına locator okuması da, toplu okuma da çağrı çağrı sayılır).
+Nezaket beklemeleri kapalıdır; sonuçlar commit'ler arasında karşılaştırılabilir.
+
+Kullanım:
+    python bench_scrapers.py [N]                        # varsayılan 5 tekrar
+    python bench_scrapers.py 5 --json bench.json        # sonucu kaydet
+    python bench_scrapers.py 5 --compare bench.json     # kayıtlı sonuçla karşılaştır
+    python bench_scrapers.py 3 --only gsstore           # adı eşleşen senaryolar
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+# Benchmark tekrarlanabilir olsun: sadece stub sunucu, profil / önbellek / tazelik yok
+os.environ.setdefault("BROWSER_PROFILE_DIR", "")
+os.environ.setdefault("FRESHNESS", "0")
+os.environ.setdefault("PAGINATION_MAX_PAGES", "20")
+
+import tracker
+from scrape_engine import ScrapeEngine
+from stub_server import StubServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sites")
+
+# JSON raporunda Playwright çağrılarının ölçüldüğünü belirtir; eski (tahmini) kayıtlarla
+# çağrı farkı verilmez
+CALLS_MEASURED = "round-trip"
+
+# (isim, stub yolu, strateji, beklenen ürün sayısı)
+SCENARIOS = [
+    ("gsstore-listing", "/gsstore/erkek/", tracker.process_gsstore, 48),
+    ("gsstore-detail", "/gsstore/galatasaray-5-yildiz-t-shirt-e251352/", tracker.process_gsstore, 1),
+    ("saatvesaat-listing", "/saatvesaat/erkek-klasik-saat", tracker.process_saatvesaat, 48),
+    ("saatvesaat-detail", "/saatvesaat/seiko-5-sports-erkek-kol-saati-p-srpd55k1", tracker.process_saatvesaat, 1),
+]
+
+
+def percentile(values, q):
+    """En yakın sıra yöntemiyle yüzdelik (q: 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+async def run_scenario(engine, base_url, name, path, strategy, runs):
+    """Senaryoyu runs kez çalıştırır, her tekrarın ölçümlerini döndürür."""
+    url = base_url + path
+    engine.strategies = {"generic": strategy}
+    samples = []
+    for _ in range(runs):
+        tracker.metrics.reset()
+        engine.reset_stats()
+        started = time.monotonic()
+        results = await engine.run([url], report=False)
+        total = time.monotonic() - started
+        record = tracker.metrics.urls.get(url) or {}
+        phases = record.get("phases", {})
+        counters = record.get("counters", {})
+        samples.append({
+            "seconds": total,
+            "strategy": phases.get("strategy", 0.0),
+            "goto": phases.get("goto", 0.0),
+            "scroll": phases.get("scroll", 0.0),
+            "extract": phases.get("extract", 0.0),
+            "playwright_calls": counters.get("playwright_calls", 0),
+            "products": len(results.get(url) or []),
+            "status": engine.statuses.get(url),
+        })
+    return samples
+
+
+def summarize(name, samples, expected):
+    def stat(key):
+        values = [sample[key] for sample in samples]
+        return {"p50": percentile(values, 50), "p90": percentile(values, 90), "max": max(values)}
+
+    products = [sample["products"] for sample in samples]
+    return {
+        "name": name,
+        "runs": len(samples),
+        "seconds": stat("seconds"),
+        "strategy": stat("strategy"),
+        "goto": stat("goto"),
+        "scroll": stat("scroll"),
+        "extract": stat("extract"),
+        "playwright_calls": stat("playwright_calls"),
+        "products": {"min": min(products), "max": max(products), "expected": expected},
+        "failed": sum(1 for sample in samples if sample["status"] != "ok"),
+    }
+
+
+def print_table(results, baseline=None):
+    base = {row["name"]: row for row in (baseline or {}).get("scenarios", [])}
+    compare_calls = (baseline or {}).get("playwright_calls") == CALLS_MEASURED
+    print(f"\n{'Senaryo':<20} {'p50 sn':>8} {'p90 sn':>8} {'strateji p50':>13} {'scroll p50':>11} "
+          f"{'PW çağrı':>9} {'ürün':>9} {'hata':>5}")
+    for row in results:
+        products = row["products"]
+        mark = "" if products["min"] == products["max"] == products["expected"] else " !"
+        line = (f"{row['name']:<20} {row['seconds']['p50']:8.2f} {row['seconds']['p90']:8.2f} "
+                f"{row['strategy']['p50']:13.2f} {row['scroll']['p50']:11.2f} "
+                f"{row['playwright_calls']['p50']:9.0f} {products['min']:>4}/{products['expected']:<4}{mark} "
+                f"{row['failed']:5d}")
+        old = base.get(row["name"])
+        if old:
+            delta = row["seconds"]["p50"] - old["seconds"]["p50"]
+            ratio = delta / old["seconds"]["p50"] * 100 if old["seconds"]["p50"] else 0.0
+            line += f"   Δ p50 {delta:+.2f} sn ({ratio:+.0f}%)"
+            if compare_calls:
+                calls = row["playwright_calls"]["p50"] - old["playwright_calls"]["p50"]
+                line += f", Δ çağrı {calls:+.0f}"
+        print(line)
+    if baseline:
+        print(f"(karşılaştırma: {baseline.get('revision') or '?'}, {baseline.get('runs')} tekrar)")
+        if not compare_calls:
+            print("(kayıttaki Playwright çağrıları tahmini; çağrı farkı verilmedi)")
+
+
+async def main_async(args):
+    scenarios = [s for s in SCENARIOS if not args.only or args.only in s[0]]
+    results = []
+    with StubServer(FIXTURE_DIR) as server:
+        engine = ScrapeEngine({"generic": tracker.process_generic}, headless=True, profile_dir="",
+                              storage_state_file="", metrics=tracker.metrics, jitter=False)
+        await engine.start()
+        try:
+            # Isınma: tarayıcının ilk sayfa açılışı ölçüme girmesin
+            await engine.run([server.url + scenarios[0][1]], report=False)
+            for name, path, strategy, expected in scenarios:
+                print(f"\n=== {name} ({args.runs} tekrar) ===")
+                samples = await run_scenario(engine, server.url, name, path, strategy, args.runs)
+                results.append(summarize(name, samples, expected))
+        finally:
+            await engine.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çevrimdışı scraper benchmark'ı")
+    parser.add_argument("runs", nargs="?", type=int, default=5)
+    parser.add_argument("--json", help="Sonucu bu dosyaya yaz")
+    parser.add_argument("--compare", help="Bu dosyadaki sonuçla karşılaştır")
+    parser.add_argument("--only", help="Sadece adında bu metin geçen senaryolar")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = asyncio.run(main_async(args))
+    report = {
+        "revision": git_revision(),
+        "runs": args.runs,
+        "card_extraction": tracker.CARD_EXTRACTION,
+        "playwright_calls": CALLS_MEASURED,
+        "python": sys.version.split()[0],
+        "scenarios": results,
+    }
+    print_table(results, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Sonuç yazıldı: {args.json}")
+
+    # Beklenen ürün sayısı tutmayan senaryo varsa hata kodu
+    if any(not (row["products"]["min"] == row["products"]["max"] == row["products"]["expected"]) for row in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
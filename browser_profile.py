@@ -0,0 +1,130 @@
+"""
+Kalıcı Tarayıcı Profili ve Önbellek
+Her tur boş bir context ile başlamak yerine:
+  - BROWSER_PROFILE_DIR verilirse kalıcı bir user-data klasörü kullanılır
+    (çerezler, çerez onayı, service worker'lar ve HTTP disk önbelleği korunur),
+  - STORAGE_STATE_FILE verilirse sadece çerez/localStorage dosyaya kaydedilip yüklenir.
+Profil boyutu ve yaşı sınırlıdır; aşılınca temizlenir.
+CacheStats, CDP üzerinden önbellekten gelen cevapları sayar.
+"""
+
+import os
+import shutil
+import time
+
+PROFILE_DIR = os.environ.get("BROWSER_PROFILE_DIR", "")
+STORAGE_STATE_FILE = os.environ.get("STORAGE_STATE_FILE", "")
+
+PROFILE_MAX_MB = int(os.environ.get("PROFILE_MAX_MB", "300"))
+PROFILE_MAX_AGE_DAYS = float(os.environ.get("PROFILE_MAX_AGE_DAYS", "7"))
+# Chromium disk önbelleği üst sınırı (profil sınırının altında kalsın)
+DISK_CACHE_MB = int(os.environ.get("DISK_CACHE_MB", "200"))
+
+CREATED_MARKER = ".profile_created"
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def prepare_profile(path, max_mb=None, max_age_days=None):
+    """
+    Profil klasörünü hazırlar. Süresi dolmuşsa veya boyut sınırını aşmışsa siler.
+    Klasörün yolunu döndürür.
+    """
+    max_mb = PROFILE_MAX_MB if max_mb is None else max_mb
+    max_age_days = PROFILE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    marker = os.path.join(path, CREATED_MARKER)
+
+    if os.path.isdir(path):
+        reason = None
+        try:
+            with open(marker, "r") as f:
+                created = float(f.read().strip())
+        except (OSError, ValueError):
+            created = 0
+        if time.time() - created > max_age_days * 86400:
+            reason = "süresi doldu"
+        else:
+            size_mb = dir_size(path) / 1024 / 1024
+            if size_mb > max_mb:
+                reason = f"{size_mb:.0f} MB > {max_mb} MB"
+        if reason:
+            print(f"Tarayıcı profili temizleniyor ({reason}): {path}")
+            shutil.rmtree(path, ignore_errors=True)
+
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        with open(marker, "w") as f:
+            f.write(str(time.time()))
+    return path
+
+
+def storage_state_path(path=None, max_age_days=None):
+    """Kaydedilmiş storage_state dosyası geçerliyse yolunu, değilse None döndürür."""
+    path = path or STORAGE_STATE_FILE
+    max_age_days = PROFILE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    if not path or not os.path.exists(path):
+        return None
+    if time.time() - os.path.getmtime(path) > max_age_days * 86400:
+        print(f"storage_state süresi doldu, yok sayılıyor: {path}")
+        return None
+    return path
+
+
+def launch_args():
+    return [f"--disk-cache-size={DISK_CACHE_MB * 1024 * 1024}"]
+
+
+class CacheStats:
+    """CDP Network olaylarından önbellek isabet oranını hesaplar."""
+
+    def __init__(self):
+        self.responses = 0
+        self.from_cache = 0      # Network.requestServedFromCache (bellek/disk)
+        self.disk_cache = 0      # responseReceived.fromDiskCache
+        self.service_worker = 0
+        self.bytes = 0
+
+    async def attach_async(self, page, cdp=None):
+        """Sayfaya CDP dinleyicilerini bağlar, kullanılan CDP oturumunu döndürür."""
+        if cdp is None:
+            cdp = await page.context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+
+        def on_response(params):
+            response = params.get("response") or {}
+            self.responses += 1
+            if response.get("fromDiskCache"):
+                self.disk_cache += 1
+            elif response.get("fromServiceWorker"):
+                self.service_worker += 1
+
+        def on_served_from_cache(params):
+            self.from_cache += 1
+
+        def on_finished(params):
+            self.bytes += int(params.get("encodedDataLength") or 0)
+
+        cdp.on("Network.responseReceived", on_response)
+        cdp.on("Network.requestServedFromCache", on_served_from_cache)
+        cdp.on("Network.loadingFinished", on_finished)
+        return cdp
+
+    def hits(self):
+        return max(self.from_cache, self.disk_cache) + self.service_worker
+
+    def hit_rate(self):
+        return min(1.0, self.hits() / self.responses) if self.responses else 0.0
+
+    def report(self):
+        return (f"Önbellek: %{self.hit_rate() * 100:.0f} isabet "
+                f"({self.hits()}/{self.responses} cevap; disk {self.disk_cache}, "
+                f"service worker {self.service_worker}), ağdan {self.bytes / 1024 / 1024:.1f} MB")
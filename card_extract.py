@@ -0,0 +1,115 @@
+"""
+Toplu Kart Çıkarma
+Liste sayfasındaki tüm ürün kartlarını tek bir page.evaluate çağrısıyla okur.
+Kart başına onlarca Playwright çağrısı (inner_text, get_attribute, is_visible...)
+yerine sayfa başına tek bir tarayıcı gidiş-dönüşü yapılır.
+"""
+
+# Kart okuma kuralları. Seçiciler sırayla denenir.
+#   items:          Kart seçicileri (ilk eşleşen kullanılır)
+#   links:          Link seçicileri; görünür olan ilki, yoksa son seçicinin ilk eşleşmesi
+#   use_title:      İsim için önce linkin title attribute'u okunsun mu
+#   name_fallbacks: İsim kısa kalırsa bakılacak elementler
+#   prices:         Fiyat elementi seçicileri (görünür olan ilki). Boşsa kartın tüm metni
+#   image:          Resim seçicisi
+#   image_visible:  Resim sadece görünürse okunsun mu
+#   image_fallback: src boş/placeholder ise data-src okunsun mu
+GSSTORE_CARD_SPEC = {
+    "items": [".product-item", ".product-item-info"],
+    "links": ["a"],
+    "use_title": True,
+    "name_fallbacks": "[class*='name'], [class*='title']",
+    "prices": [],
+    "image": "img",
+    "image_visible": False,
+    "image_fallback": True,
+}
+
+SAATVESAAT_CARD_SPEC = {
+    "items": [".product-item", ".product-item-info"],
+    "links": ["a.product-item-link", "a"],
+    "use_title": False,
+    "name_fallbacks": "",
+    "prices": [".special-price .price", ".price-box .price"],
+    "image": "img.product-image-photo",
+    "image_visible": True,
+    "image_fallback": False,
+}
+
+CARD_EXTRACT_JS = """
+(spec) => {
+    // Playwright'ın is_visible() mantığına yakın görünürlük kontrolü
+    const visible = (el) => {
+        if (!el) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && el.getClientRects().length > 0;
+    };
+    const text = (el) => (el ? (el.innerText || '') : '');
+
+    let items = [];
+    for (const sel of spec.items) {
+        items = Array.from(document.querySelectorAll(sel));
+        if (items.length) break;
+    }
+
+    return items.map((item) => {
+        let link = null;
+        for (let i = 0; i < spec.links.length; i++) {
+            const el = item.querySelector(spec.links[i]);
+            if (el && (visible(el) || i === spec.links.length - 1)) {
+                link = el;
+                break;
+            }
+        }
+
+        let name = null;
+        if (link) {
+            if (spec.use_title) name = link.getAttribute('title');
+            if (!name) name = text(link).trim();
+        }
+
+        const altNames = spec.name_fallbacks
+            ? Array.from(item.querySelectorAll(spec.name_fallbacks)).map(text)
+            : [];
+
+        let rawPrice = null;
+        if (spec.prices.length) {
+            for (const sel of spec.prices) {
+                const el = item.querySelector(sel);
+                if (visible(el)) {
+                    rawPrice = text(el);
+                    break;
+                }
+            }
+        } else {
+            rawPrice = text(item).replace(/\\n/g, ' ');
+        }
+
+        let image = null;
+        const img = item.querySelector(spec.image);
+        if (img && (!spec.image_visible || visible(img))) {
+            image = img.getAttribute('src');
+            if (spec.image_fallback && (!image || image.includes('placeholder'))) {
+                image = img.getAttribute('data-src') || image;
+            }
+        }
+
+        return {
+            name: name,
+            href: link ? link.getAttribute('href') : null,
+            raw_price: rawPrice,
+            image: image || '',
+            alt_names: altNames,
+        };
+    });
+}
+"""
+
+
+async def bulk_extract_cards(page, spec):
+    """Sayfadaki tüm kartları tek çağrıda okur: [{name, href, raw_price, image, alt_names}, ...]"""
+    try:
+        return await page.evaluate(CARD_EXTRACT_JS, spec) or []
+    except Exception as e:
+        print(f"   Toplu kart okuma hatası: {e}")
+        return []
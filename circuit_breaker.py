@@ -0,0 +1,146 @@
+"""
+Domain Sağlığı (Devre Kesici ve Uyarlanır Zaman Aşımı)
+Bir site çöktüğünde veya bizi engellediğinde o domainin her URL'si 90 sn'lik goto
+zaman aşımını yakmasın diye domain başına sağlık tutulur (prices.db / domain_health):
+  - BREAKER_FAILURES ardışık hata veya engel sayfası (403/429/503, Cloudflare vb.)
+    görülünce devre açılır; BREAKER_COOLDOWN_MINUTES boyunca o domainin kalan URL'leri
+    atlanır (zamanlayıcıda vadeleri değişmez, sonraki turda ilk onlar denenir).
+    Hızlı katmanların (API / HTTP) ağ hataları da hata sayılır.
+  - Bekleme bitince tek bir deneme URL'sine izin verilir (yarı açık); başarılıysa
+    devre kapanır, değilse bekleme süresi ikiye katlanarak yeniden açılır. Deneme URL'si
+    sonuçsuz biterse (ertelendi, sayfa açılmadan kesildi) deneme hakkı bırakılır.
+  - goto zaman aşımı domainin son goto sürelerinin p90'ının TIMEOUT_FACTOR katıdır
+    (TIMEOUT_MIN_MS ile GOTO_TIMEOUT arasında); geçmiş yoksa GOTO_TIMEOUT kullanılır.
+"""
+
+import os
+import re
+import time
+
+CIRCUIT_BREAKER = os.environ.get("CIRCUIT_BREAKER", "1") != "0"
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN_MINUTES = float(os.environ.get("BREAKER_COOLDOWN_MINUTES", "30"))
+BREAKER_MAX_COOLDOWN_MINUTES = 6 * 60
+
+TIMEOUT_MIN_MS = int(os.environ.get("TIMEOUT_MIN_MS", "15000"))
+TIMEOUT_MAX_MS = 90000     # scrape_engine.GOTO_TIMEOUT ile aynı
+TIMEOUT_FACTOR = 4         # p90 gecikmenin kaç katı beklenir
+LATENCY_WINDOW = 20        # Domain başına saklanan son goto süresi
+LATENCY_MIN_SAMPLES = 5    # Bundan az ölçümde uyarlanır zaman aşımı kullanılmaz
+
+# Engel / bot kontrol sayfaları (başlık veya gövdenin başı)
+BLOCK_STATUSES = {403, 429, 503}
+BLOCK_PAGE_RE = re.compile(
+    r"attention required|just a moment|checking your browser|access denied|request unsuccessful|"
+    r"are you a robot|captcha|cf-browser-verification|erişim engellendi|güvenlik kontrolü",
+    re.IGNORECASE
+)
+
+
+class BlockedPage(Exception):
+    """Site bot / engel sayfası döndürdü."""
+
+
+def is_block_page(status=None, title=""):
+    if status in BLOCK_STATUSES:
+        return True
+    return bool(title and BLOCK_PAGE_RE.search(title))
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class CircuitBreaker:
+    def __init__(self, state=None, enabled=CIRCUIT_BREAKER, failures=BREAKER_FAILURES,
+                 cooldown_minutes=BREAKER_COOLDOWN_MINUTES):
+        self.enabled = enabled
+        self.threshold = failures
+        self.cooldown = cooldown_minutes * 60
+        self.reset(state)
+
+    def reset(self, state=None):
+        """Yeni tur: kayıtlı domain sağlığını yükler, tur içi sayaçları temizler."""
+        self.state = state or {}  # domain -> {failures, opened_until, cooldown, latencies, trips}
+        self.probing = set()      # Yarı açık devrede deneme URL'si süren domainler
+        self.skipped = {}         # domain -> atlanan URL sayısı
+
+    def _record(self, key):
+        record = self.state.get(key)
+        if record is None:
+            record = self.state[key] = {"failures": 0, "opened_until": 0.0, "cooldown": self.cooldown,
+                                        "latencies": [], "trips": 0}
+        return record
+
+    def allow(self, key, now=None):
+        """Domainin bir sonraki URL'si denensin mi? False ise URL atlanır."""
+        if not self.enabled:
+            return True
+        record = self.state.get(key)
+        if not record or not record.get("opened_until"):
+            return True
+        now = now or time.time()
+        if now < record["opened_until"] or key in self.probing:
+            self.skipped[key] = self.skipped.get(key, 0) + 1
+            return False
+        # Bekleme bitti: tek deneme
+        self.probing.add(key)
+        print(f"   [{key}] Devre yarı açık, deneme yapılıyor...")
+        return True
+
+    def is_open(self, key, now=None):
+        record = self.state.get(key)
+        return bool(self.enabled and record and (now or time.time()) < (record.get("opened_until") or 0))
+
+    def success(self, key, latency=None):
+        record = self._record(key)
+        if latency is not None:
+            record["latencies"] = (record["latencies"] + [round(latency, 2)])[-LATENCY_WINDOW:]
+        if record["opened_until"]:
+            print(f"   [{key}] Devre kapandı.")
+        record.update(failures=0, opened_until=0.0, cooldown=self.cooldown)
+        self.probing.discard(key)
+
+    def release(self, key):
+        """Deneme URL'si sonuç bildirmeden bitti (ertelendi, atlandı...): devre yarı açık kalır."""
+        self.probing.discard(key)
+
+    def failure(self, key, reason="", now=None):
+        record = self._record(key)
+        record["failures"] += 1
+        probe = key in self.probing
+        self.probing.discard(key)
+        if probe or (self.enabled and record["failures"] >= self.threshold and not record["opened_until"]):
+            now = now or time.time()
+            # Deneme de başarısızsa bekleme uzar
+            cooldown = record.get("cooldown") or self.cooldown
+            cooldown = min(cooldown * (2 if probe else 1), BREAKER_MAX_COOLDOWN_MINUTES * 60)
+            record.update(opened_until=now + cooldown, cooldown=cooldown, trips=record["trips"] + 1)
+            print(f"   [{key}] Devre açıldı: {record['failures']} ardışık hata ({reason}), "
+                  f"{cooldown / 60:.0f} dk atlanacak.")
+
+    def goto_timeout(self, key, default=TIMEOUT_MAX_MS):
+        """Domainin yakın geçmişine göre goto zaman aşımı (ms)."""
+        record = self.state.get(key)
+        latencies = (record or {}).get("latencies") or []
+        if not self.enabled or len(latencies) < LATENCY_MIN_SAMPLES:
+            return default
+        timeout = _percentile(latencies, 0.9) * 1000 * TIMEOUT_FACTOR
+        return int(max(TIMEOUT_MIN_MS, min(default, timeout)))
+
+    def wait_timeout(self, key, default=20000):
+        """Strateji içi bekleme zaman aşımı (ms): goto'nunkinden uzun olmaz."""
+        return min(default, self.goto_timeout(key))
+
+    def report(self):
+        if not self.enabled:
+            return "Devre kesici kapalı (CIRCUIT_BREAKER=0)."
+        parts = []
+        for key, record in sorted(self.state.items()):
+            if self.is_open(key):
+                minutes = (record["opened_until"] - time.time()) / 60
+                parts.append(f"{key}: AÇIK ({minutes:.0f} dk, {self.skipped.get(key, 0)} URL atlandı)")
+            elif record.get("latencies"):
+                parts.append(f"{key}: goto zaman aşımı {self.goto_timeout(key) / 1000:.0f} sn")
+        return "Domain sağlığı: " + (", ".join(parts) if parts else "kayıt yok")
@@ -0,0 +1,45 @@
+"""
+Kapsama Planlayıcısı
+urls.txt liste sayfalarını ve tekil ürün sayfalarını karışık içerir. Bir turda:
+  1. Önce liste sayfaları taranır ve gördükleri ürünler (kanonik URL) kaydedilir,
+  2. sonra sadece hâlâ kapsanmamış detay sayfaları ziyaret edilir.
+Listede görülen ama resmi eksik olan ürünün detay sayfası yine ziyaret edilir
+(resim sadece detayda olabilir).
+"""
+
+from url_canon import canonical_url, is_detail_url
+
+
+class CoveragePlanner:
+    def __init__(self):
+        self.covered = {}  # kanonik ürün URL'si -> ürün kaydı
+        self.avoided = []  # Ziyaret edilmeyen detay URL'leri
+
+    @staticmethod
+    def split(urls):
+        """(liste sayfaları, detay sayfaları)"""
+        listings, details = [], []
+        for url in urls:
+            (details if is_detail_url(url) else listings).append(url)
+        return listings, details
+
+    def record(self, products):
+        for prod in products:
+            self.covered[canonical_url(prod["url"], product=True)] = prod
+
+    def needs_visit(self, url):
+        prod = self.covered.get(canonical_url(url, product=True))
+        return not prod or not prod.get("price") or not prod.get("image")
+
+    def remaining(self, details):
+        """Ziyaret edilmesi gereken detay URL'leri; diğerleri avoided'a eklenir."""
+        remaining = []
+        for url in details:
+            if self.needs_visit(url):
+                remaining.append(url)
+            else:
+                self.avoided.append(url)
+        return remaining
+
+    def report(self):
+        return f"Kapsama: {len(self.avoided)} detay sayfası ziyareti liste sayfalarından karşılandı"
@@ -0,0 +1,164 @@
+"""
+Sayfa Tazeliği (Koşullu İstek ve İçerik Parmak İzi)
+Her URL için son başarılı taramanın bilgisi saklanır (prices.db / freshness tablosu):
+  - kind:          Hangi katmanın parmak izi (api / http / grid)
+  - fingerprint:   Ürün listesi JSON'ı, detay sayfasının meta/JSON-LD'si veya
+                   ürün ızgarası metninin sha1 özeti
+  - etag / last_modified: Site gönderiyorsa koşullu HTTP isteği için
+  - seconds:       Tam işlemenin sürdüğü süre (tasarruf hesabı için)
+  - products:      Liste sayfasında görülen ürün URL'leri (kapsama planlayıcısı için)
+Parmak izi son turla aynıysa katman/strateji UNCHANGED döndürür; ürün çıkarma,
+karşılaştırma ve bildirim adımları atlanır, prices.json'daki kayıtlar olduğu gibi kalır.
+Değişmeyen liste sayfasının son turda gördüğü ürünler listed_products ile alınır.
+FRESHNESS_MAX_AGE_HOURS'tan eski kayıtlar yok sayılır (arada bir tam tarama yapılır).
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+FRESHNESS = os.environ.get("FRESHNESS", "1") != "0"
+FRESHNESS_MAX_AGE_HOURS = float(os.environ.get("FRESHNESS_MAX_AGE_HOURS", "24"))
+
+
+class _Unchanged:
+    def __repr__(self):
+        return "UNCHANGED"
+
+
+# Katman veya stratejinin "sayfa son turdan beri değişmedi" cevabı
+UNCHANGED = _Unchanged()
+
+LD_JSON_RE = re.compile(
+    r"<script[^>]+application/ld\+json[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL
+)
+PRODUCT_META_RE = re.compile(
+    r"<meta[^>]+(?:property|name|itemprop)=[\"'](?:product:price:amount|og:price:amount|price|"
+    r"og:title|og:image|product:availability|availability)[\"'][^>]*>",
+    re.IGNORECASE
+)
+
+# Ürün ızgarasının görünen metni + linkleri (lazy resim src'leri gibi oynak kısımlar hariç)
+GRID_TEXT_JS = """
+(selectors) => {
+    for (const sel of selectors) {
+        const items = document.querySelectorAll(sel);
+        if (!items.length) continue;
+        return Array.from(items).map(item => {
+            const link = item.querySelector('a');
+            return (link ? link.getAttribute('href') : '') + '|' + item.innerText;
+        }).join('\\n');
+    }
+    return '';
+}
+"""
+
+
+def fingerprint(text):
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha1(text).hexdigest()
+
+
+def products_fingerprint(products):
+    """API'den gelen ürün listesinin parmak izi."""
+    return fingerprint(json.dumps(products, sort_keys=True, ensure_ascii=False))
+
+
+def html_fingerprint(html):
+    """
+    Detay sayfasında sadece ürün verisi taşıyan kısımların (JSON-LD + ürün meta'ları)
+    parmak izi. HTML'i ayrıştırmadan regex ile alınır; hiçbiri yoksa None.
+    """
+    parts = LD_JSON_RE.findall(html)
+    parts.extend(PRODUCT_META_RE.findall(html))
+    if not parts:
+        return None
+    return fingerprint("\n".join(part.strip() for part in parts))
+
+
+async def grid_fingerprint(page, selectors):
+    """Tarayıcıdaki ürün ızgarasının parmak izi (kart yoksa None)."""
+    try:
+        text = await page.evaluate(GRID_TEXT_JS, list(selectors))
+    except Exception as e:
+        print(f"   Izgara parmak izi alınamadı: {e}")
+        return None
+    return fingerprint(text) if text else None
+
+
+class Freshness:
+    def __init__(self, previous=None, enabled=FRESHNESS, max_age_hours=FRESHNESS_MAX_AGE_HOURS):
+        self.enabled = enabled
+        self.max_age = max_age_hours * 3600
+        self.previous = previous or {}  # url -> kayıt (son başarılı tur)
+        self.pending = {}               # url -> bu turda toplanan bilgiler
+        self.current = {}               # url -> başarıyla bitenler (kaydedilecek)
+        self.skipped = {}               # url -> kazanılan süre (sn)
+        self.listed = {}                # liste url -> bu turda görülen ürün URL'leri
+
+    def reset(self, previous=None):
+        """Yeni tur: son kayıtları yükler, tur içi bilgileri temizler."""
+        self.previous = previous or {}
+        self.pending = {}
+        self.current = {}
+        self.skipped = {}
+        self.listed = {}
+
+    def _previous(self, url, kind):
+        record = self.previous.get(url)
+        if not self.enabled or not record or record.get("kind") != kind:
+            return None
+        if time.time() - (record.get("checked_at") or 0) > self.max_age:
+            return None
+        return record
+
+    def validators(self, url, kind="http"):
+        """Koşullu GET için If-None-Match / If-Modified-Since başlıkları."""
+        record = self._previous(url, kind)
+        headers = {}
+        if record:
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def is_unchanged(self, url, kind, fp):
+        record = self._previous(url, kind)
+        return bool(fp and record and record.get("fingerprint") == fp)
+
+    def note(self, url, kind, fp=None, etag=None, last_modified=None):
+        """Sayfa başarıyla işlenirse kaydedilecek tazelik bilgisini bırakır."""
+        self.pending[url] = {"kind": kind, "fingerprint": fp, "etag": etag, "last_modified": last_modified}
+
+    def list_products(self, url, product_urls):
+        """Liste sayfasında görülen ürünler (sayfalı listelerde sayfa sayfa birikir)."""
+        self.listed.setdefault(url, set()).update(product_urls)
+
+    def listed_products(self, url):
+        """Liste sayfasının son başarılı turda gördüğü ürün URL'leri."""
+        return (self.previous.get(url) or {}).get("products") or []
+
+    def finished(self, url, seconds, status):
+        """
+        Motor her URL'den sonra çağırır. status: "ok" | "unchanged" | "failed"
+        """
+        pending = self.pending.pop(url, None)
+        listed = self.listed.pop(url, ())
+        if status == "unchanged":
+            previous = self.previous.get(url) or {}
+            self.skipped[url] = max(0.0, (previous.get("seconds") or 0) - seconds)
+        elif status == "ok" and pending:
+            pending["seconds"] = round(seconds, 2)
+            pending["checked_at"] = time.time()
+            pending["products"] = sorted(listed)
+            self.current[url] = pending
+
+    def report(self):
+        if not self.enabled:
+            return "Tazelik kontrolü kapalı (FRESHNESS=0)."
+        return (f"Değişmeyen sayfa: {len(self.skipped)} URL atlandı, "
+                f"~{sum(self.skipped.values()):.0f} sn kazanıldı")
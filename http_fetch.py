@@ -0,0 +1,194 @@
+"""
+HTTP Öncelikli Hızlı Katman
+Ürün detay sayfalarını tarayıcı açmadan, ortak bir requests.Session ile çeker.
+Fiyat/isim/resim bilgisini meta tag, JSON-LD veya bilinen seçicilerden okur.
+Bulamazsa (veya sayfa JS/scroll gerektiren bir liste ise) None döner ve
+Playwright stratejilerine geçilir.
+"""
+
+import json
+import os
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from price_parser import find_price_in_text
+from freshness import UNCHANGED, html_fingerprint
+
+# Varsayılan açık; HTTP_FIRST=0 ile her URL doğrudan tarayıcıya gider
+HTTP_FIRST = os.environ.get("HTTP_FIRST", "1") != "0"
+HTTP_TIMEOUT = 15
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+# Sayfada bunlardan biri varsa liste sayfasıdır -> scroll gerekir, tarayıcıya bırak
+LISTING_MARKERS = [".product-item", ".product-item-info", ".products-grid"]
+
+PRICE_SELECTORS = [
+    ".product-info-main .special-price .price",
+    ".product-info-main .price",
+    ".price-box.price-final_price",
+    "[data-price-type='finalPrice']",
+]
+
+NAME_SELECTORS = ["h1.page-title", "h1"]
+
+_session = None
+
+
+def get_session():
+    """Keep-alive bağlantı havuzlu ortak Session."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=1)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _session.headers.update(HEADERS)
+    return _session
+
+
+def _meta(soup, *keys):
+    for key in keys:
+        el = soup.find("meta", attrs={"property": key}) or soup.find("meta", attrs={"name": key}) \
+            or soup.find("meta", attrs={"itemprop": key})
+        if el and el.get("content"):
+            return el["content"].strip()
+    return None
+
+
+def _json_ld_products(soup):
+    """Sayfadaki JSON-LD bloklarından Product nesnelerini döndürür."""
+    found = []
+    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        try:
+            data = json.loads(script.string or "")
+        except (ValueError, TypeError):
+            continue
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+                continue
+            if not isinstance(node, dict):
+                continue
+            if "@graph" in node:
+                stack.extend(node["@graph"] if isinstance(node["@graph"], list) else [node["@graph"]])
+            node_type = node.get("@type")
+            types = node_type if isinstance(node_type, list) else [node_type]
+            if "Product" in types:
+                found.append(node)
+    return found
+
+
+def _json_ld_price(product):
+    offers = product.get("offers")
+    offer_list = offers if isinstance(offers, list) else [offers]
+    for offer in offer_list:
+        if not isinstance(offer, dict):
+            continue
+        for key in ("price", "lowPrice"):
+            try:
+                return float(str(offer[key]).replace(",", "."))
+            except (KeyError, ValueError, TypeError):
+                continue
+    return None
+
+
+def extract_product(html, url):
+    """HTML'den tek ürün çıkarır. Liste sayfası veya fiyat yoksa None."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    if any(soup.select_one(sel) for sel in LISTING_MARKERS):
+        return None
+
+    name = None
+    image = None
+    price = None
+
+    # 1. Meta tag'ler
+    meta_price = _meta(soup, "product:price:amount", "og:price:amount", "price")
+    if meta_price:
+        try:
+            price = float(meta_price.replace(",", "."))
+        except ValueError:
+            price = None
+
+    # 2. JSON-LD
+    ld_products = _json_ld_products(soup)
+    if ld_products:
+        ld = ld_products[0]
+        if not price:
+            price = _json_ld_price(ld)
+        name = ld.get("name") or None
+        ld_image = ld.get("image")
+        if isinstance(ld_image, list):
+            ld_image = ld_image[0] if ld_image else None
+        if isinstance(ld_image, dict):
+            ld_image = ld_image.get("url")
+        image = ld_image or None
+
+    # 3. Bilinen seçiciler
+    if not price:
+        for sel in PRICE_SELECTORS:
+            el = soup.select_one(sel)
+            if el:
+                price = find_price_in_text(el.get_text(" ", strip=True))
+                if price:
+                    break
+
+    if not price or price <= 0:
+        return None
+
+    if not name:
+        name = _meta(soup, "og:title")
+    if not name:
+        for sel in NAME_SELECTORS:
+            el = soup.select_one(sel)
+            if el and el.get_text(strip=True):
+                name = el.get_text(" ", strip=True)
+                break
+    if not image:
+        image = _meta(soup, "og:image")
+
+    return {
+        "name": (name or "Bilinmeyen Ürün").strip(),
+        "url": url,
+        "price": price,
+        "image": image or ""
+    }
+
+
+def fetch_product_http(url, freshness=None):
+    """
+    URL'yi düz HTTP ile dener. Başarılıysa [ürün], değilse None döner.
+    Ağ hataları (requests.RequestException) yukarı iletilir; motor domain sağlığına yazar.
+    freshness verilirse koşullu istek atılır; 304 veya (ürün ayrıştırıldıktan sonra)
+    aynı parmak izinde UNCHANGED döner.
+    """
+    headers = freshness.validators(url, "http") if freshness else {}
+    response = get_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    if response.status_code == 304:
+        print("   [HTTP] 304 Not Modified")
+        return UNCHANGED
+    if response.status_code != 200 or "html" not in response.headers.get("Content-Type", "html"):
+        print(f"   [HTTP] {response.status_code}, tarayıcıya geçiliyor.")
+        return None
+
+    # Parmak izi sadece sayfa hâlâ ürüne ayrışıyorsa karşılaştırılır; ayrışmayan sayfa
+    # (şablon değişti, engel sayfası...) "değişmedi" diye takılı kalmasın, tarayıcıya gitsin
+    product = extract_product(response.text, url)
+    if not product:
+        return None
+    if freshness:
+        fp = html_fingerprint(response.text)
+        if freshness.is_unchanged(url, "http", fp):
+            return UNCHANGED
+        freshness.note(url, "http", fp, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return [product]
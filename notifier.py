@@ -0,0 +1,207 @@
+"""
+Telegram Bildirim Dağıtıcısı
+Tarama sırasında bildirimleri kuyruğa alır ve arka planda tek bir keep-alive
+Session üzerinden gönderir. Kısa bir toplama penceresindeki bildirimler
+gruplanır: fotoğraflar sendMediaGroup albümlerine (10'arlı), düz metinler
+özet mesajlara birleştirilir. Telegram'ın 429 retry_after cevabına uyulur,
+ağ/5xx hatalarında üstel bekleme ile tekrar denenir.
+Böylece tarama hızı Telegram gecikmesine bağlı kalmaz.
+"""
+
+import json
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.telegram.org/bot{token}/{method}"
+
+BATCH_WINDOW = 2.0      # İlk bildirimden sonra gruplamak için beklenen süre (sn)
+MIN_INTERVAL = 1.0      # Aynı sohbete iki istek arası en az süre (sn)
+MAX_RETRIES = 5
+ALBUM_SIZE = 10         # sendMediaGroup üst sınırı
+CAPTION_LIMIT = 1024
+MESSAGE_LIMIT = 4096
+
+
+class TelegramNotifier:
+    def __init__(self, token, chat_id, session=None, batch_window=BATCH_WINDOW):
+        self.token = token
+        self.chat_id = chat_id
+        self.batch_window = batch_window
+        self.session = session or self._make_session()
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._last_request = 0.0
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        return session
+
+    @property
+    def enabled(self):
+        return bool(self.token and self.chat_id)
+
+    # --- Kuyruk ---
+    def notify(self, text, photo=None):
+        """
+        Bildirimi kuyruğa ekler, beklemeden döner.
+        photo: bytes (yüklenecek resim) veya http(s) URL (Telegram kendisi indirir).
+        """
+        if not self.enabled:
+            print("Telegram ayarları eksik, mesaj atılamadı.")
+            return
+        self._queue.put({"text": text, "photo": photo})
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="telegram-notifier", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout=120):
+        """Kuyruktaki her şey gönderilene kadar bekler."""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    extra = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stop = True
+                    break
+                batch.append(extra)
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                print(f"Telegram gönderim hatası: {e}")
+            if stop:
+                # Kapanırken kalanları da gönder
+                rest = []
+                while not self._queue.empty():
+                    extra = self._queue.get_nowait()
+                    if extra is not None:
+                        rest.append(extra)
+                if rest:
+                    self._dispatch(rest)
+                return
+
+    # --- Gruplama ---
+    def _dispatch(self, batch):
+        photos = [item for item in batch if item["photo"]]
+        texts = [item["text"] for item in batch if not item["photo"]]
+
+        for i in range(0, len(photos), ALBUM_SIZE):
+            album = photos[i:i + ALBUM_SIZE]
+            if len(album) == 1:
+                self._send_photo(album[0])
+            else:
+                self._send_album(album)
+
+        for digest in self._digests(texts):
+            self._call("sendMessage", {"chat_id": self.chat_id, "text": digest})
+
+    @staticmethod
+    def _digests(texts):
+        """Metinleri Telegram mesaj sınırını aşmadan birleştirir."""
+        separator = "\n\n— — —\n\n"
+        current = ""
+        for text in texts:
+            text = text[:MESSAGE_LIMIT]
+            if current and len(current) + len(separator) + len(text) > MESSAGE_LIMIT:
+                yield current
+                current = text
+            else:
+                current = current + separator + text if current else text
+        if current:
+            yield current
+
+    def _send_photo(self, item):
+        data = {"chat_id": self.chat_id, "caption": item["text"][:CAPTION_LIMIT]}
+        if isinstance(item["photo"], (bytes, bytearray)):
+            files = {"photo": ("alert.jpg", item["photo"])}
+            ok = self._call("sendPhoto", data, files=files)
+        else:
+            data["photo"] = item["photo"]
+            ok = self._call("sendPhoto", data)
+        if not ok:
+            # Resim gönderilemezse en azından metin gitsin
+            self._call("sendMessage", {"chat_id": self.chat_id, "text": item["text"]})
+
+    def _send_album(self, album):
+        media = []
+        files = {}
+        for idx, item in enumerate(album):
+            entry = {"type": "photo", "caption": item["text"][:CAPTION_LIMIT]}
+            if isinstance(item["photo"], (bytes, bytearray)):
+                name = f"photo{idx}"
+                files[name] = (f"{name}.jpg", item["photo"])
+                entry["media"] = f"attach://{name}"
+            else:
+                entry["media"] = item["photo"]
+            media.append(entry)
+        data = {"chat_id": self.chat_id, "media": json.dumps(media, ensure_ascii=False)}
+        if not self._call("sendMediaGroup", data, files=files or None):
+            for item in album:
+                self._call("sendMessage", {"chat_id": self.chat_id, "text": item["text"]})
+
+    # --- HTTP ---
+    def _call(self, method, data, files=None):
+        """Rate limit ve tekrar denemeli API çağrısı. Başarılıysa True."""
+        url = API_URL.format(token=self.token, method=method)
+        delay = 1.0
+        for attempt in range(MAX_RETRIES):
+            wait = self._last_request + MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+            try:
+                response = self.session.post(url, data=data, files=files, timeout=30)
+            except requests.RequestException as e:
+                print(f"Telegram hatası ({method}): {e}")
+                time.sleep(delay)
+                delay *= 2
+                continue
+
+            if response.status_code == 429:
+                try:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", delay)
+                except ValueError:
+                    retry_after = delay
+                print(f"Telegram rate limit, {retry_after} sn bekleniyor...")
+                time.sleep(float(retry_after))
+                continue
+            if response.status_code >= 500:
+                time.sleep(delay)
+                delay *= 2
+                continue
+            if response.status_code != 200:
+                print(f"Telegram hatası ({method}): {response.status_code} {response.text[:200]}")
+                self.failed += 1
+                return False
+            self.sent += 1
+            return True
+
+        self.failed += 1
+        return False
@@ -0,0 +1,203 @@
+"""
+Ortak Fiyat Ayrıştırıcı
+tracker.py, test_saat.py ve saatvesaat_advanced.py'deki kopya parse_price /
+find_price_in_text fonksiyonlarının yerine geçer.
+Desenler modül yüklenirken bir kere derlenir; sayı çözümleme sonuçları önbelleğe alınır.
+
+Desteklenen biçimler:
+    1.299,99 TL   -> 1299.99   (Türkçe: nokta binlik, virgül ondalık)
+    ₺1.299        -> 1299.0
+    1299.99       -> 1299.99   (Uluslararası: nokta ondalık)
+    1,299.99 TRY  -> 1299.99
+    749,99TL      -> 749.99
+    1,299 TL      -> 1299.0    (tek ayraç + 3 hane binliktir)
+
+Eski kopyalardan farklar: "1299.99" artık 1299.99 (eskisi noktayı silip 129999 okurdu),
+"1,299" 1299 (eskisi 1.299). Para birimi işaretli sayı yoksa işaretsiz sayılardan önce
+ayraçlı olanlar ("599,99", "1.299") denenir; "Beden 42 - 599,99" -> 599.99.
+
+Doğruluk ve hız kontrolü:
+    python price_parser.py            # Altın küme (fixtures/prices/golden.json)
+    python price_parser.py bench      # + mikro benchmark
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+
+MIN_PRICE = 10
+MAX_PRICE = 100000
+
+NUMBER = r"\d[\d.,]*\d|\d"
+
+# Para birimi işaretli fiyat (₺1.299 / 1.299,99 TL); çoğu metin ilk eşleşmede biter
+CURRENCY_PRICE_RE = re.compile(
+    r"(?:₺|TL|TRY)\s*(" + NUMBER + r")|(" + NUMBER + r")\s*(?:TL|tl|Tl|₺|TRY)"
+)
+# İşaretsiz sayı (para birimi hiç yoksa yedek)
+NUMBER_RE = re.compile(NUMBER)
+
+
+@lru_cache(maxsize=4096)
+def to_number(token):
+    """'1.299,99' gibi tek bir sayı dizisini float'a çevirir. Geçersizse None."""
+    last_dot = token.rfind(".")
+    last_comma = token.rfind(",")
+
+    if last_dot == -1 and last_comma == -1:
+        return float(token)
+
+    if last_dot != -1 and last_comma != -1:
+        # İki ayraç da varsa sondaki ondalıktır
+        decimal, thousands = (".", ",") if last_dot > last_comma else (",", ".")
+        integer, _, fraction = token.rpartition(decimal)
+        integer = integer.replace(thousands, "")
+        if not integer.isdigit() or not fraction.isdigit():
+            return None
+        return float(integer + "." + fraction)
+
+    sep = "." if last_dot != -1 else ","
+    parts = token.split(sep)
+    if any(not p.isdigit() for p in parts):
+        return None
+    if len(parts) == 2:
+        # Tek ayraç: 3 hane binlik (1.299), 1-2 hane ondalık (1299,99)
+        if len(parts[1]) == 3:
+            return float(parts[0] + parts[1])
+        return float(parts[0] + "." + parts[1])
+    # Birden fazla aynı ayraç: binlik; son grup 3 hane değilse ondalıktır
+    if len(parts[-1]) == 3:
+        return float("".join(parts))
+    return float("".join(parts[:-1]) + "." + parts[-1])
+
+
+def parse_price(text):
+    """Metindeki ilk sayıyı fiyat olarak döndürür (aralık kontrolü yok)."""
+    if not text:
+        return None
+    match = NUMBER_RE.search(text)
+    if not match:
+        return None
+    return to_number(match.group())
+
+
+def find_price_in_text(text, min_price=MIN_PRICE, max_price=MAX_PRICE, currency_only=False):
+    """
+    Metin içindeki fiyatı bulur. Para birimi işaretli (TL, ₺, TRY) ilk makul değer
+    tercih edilir; hiç yoksa işaretsiz sayılardan önce ayraçlı olan (599,99 / 1.299),
+    sonra düz tam sayı olan ilk makul değer döner (beden, adet gibi sayılar fiyatın önüne
+    geçmesin diye). currency_only ise işaretsiz sayılara hiç bakılmaz.
+    """
+    if not text:
+        return None
+    for match in CURRENCY_PRICE_RE.finditer(text):
+        value = to_number(match.group(1) or match.group(2))
+        if value is not None and min_price < value < max_price:
+            return value
+    if currency_only:
+        return None
+    plain = None
+    for match in NUMBER_RE.finditer(text):
+        token = match.group()
+        value = to_number(token)
+        if value is None or not min_price < value < max_price:
+            continue
+        if "." in token or "," in token:
+            return value
+        if plain is None:
+            plain = value
+    return plain
+
+
+def find_prices(texts, min_price=MIN_PRICE, max_price=MAX_PRICE, currency_only=False):
+    """Toplu API: her metin için find_price_in_text sonucu (kart listeleri için)."""
+    find = find_price_in_text
+    return [find(text, min_price, max_price, currency_only) for text in texts]
+
+
+# --- ALTIN KÜME VE MİKRO BENCHMARK ---
+# python price_parser.py              -> fixtures/prices/golden.json doğruluk kontrolü
+# python price_parser.py bench [N]    -> kontrol + N tekrarlı hız ölçümü
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "prices", "golden.json")
+
+
+def load_golden(path=GOLDEN_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_golden(cases):
+    """
+    Yanlış sonuç veren örnekleri (örnek, bulunan) listesi olarak döndürür.
+    "known_failure": true olan örneklerde expected doğru cevaptır; ayrıştırıcı henüz
+    bulamıyorsa hata sayılmaz, düzelirse (beklenmedik geçiş) hata sayılır ki işaret kaldırılsın.
+    """
+    failures = []
+    for case in cases:
+        if case.get("func") == "parse":
+            got = parse_price(case["text"])
+        else:
+            got = find_price_in_text(case["text"], max_price=case.get("max_price", MAX_PRICE),
+                                     currency_only=case.get("currency_only", False))
+        if (got == case["expected"]) == bool(case.get("known_failure")):
+            failures.append((case, got))
+    return failures
+
+
+def benchmark(cases, repeat=2000):
+    texts = [case["text"] for case in cases if case.get("func") != "parse"]
+    # Kart listelerine benzesin diye büyük bir parti + sayfa gövdesi örneği
+    batch = texts * 50
+    body = " ".join(texts * 10)[:5000]
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            find_price_in_text(text)
+    single_us = (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+    rounds = max(1, repeat // 50)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        find_prices(batch)
+    batch_ms = (time.perf_counter() - started) / rounds * 1000
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        find_price_in_text(body)
+    body_us = (time.perf_counter() - started) / repeat * 1e6
+
+    return {
+        "single_us": round(single_us, 2),
+        "batch_size": len(batch),
+        "batch_ms": round(batch_ms, 3),
+        "body_5000_us": round(body_us, 2),
+    }
+
+
+def main(argv):
+    cases = load_golden()
+    failures = check_golden(cases)
+    for case, got in failures:
+        if case.get("known_failure"):
+            print(f"DÜZELMİŞ (known_failure kaldırılmalı): {case['text']!r} -> {got}")
+        else:
+            print(f"HATALI: {case['text']!r} -> {got} (beklenen {case['expected']})")
+    known = [case for case in cases if case.get("known_failure")]
+    print(f"Altın küme: {len(cases) - len(failures)}/{len(cases)} beklendiği gibi "
+          f"({len(known)} bilinen hata dahil)")
+
+    if len(argv) > 1 and argv[1] == "bench":
+        repeat = int(argv[2]) if len(argv) > 2 else 2000
+        result = benchmark(cases, repeat)
+        print(f"Tekil: {result['single_us']} µs/metin | "
+              f"Parti ({result['batch_size']} kart): {result['batch_ms']} ms | "
+              f"Sayfa gövdesi (5000 kr): {result['body_5000_us']} µs")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
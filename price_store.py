@@ -0,0 +1,412 @@
+"""
+Fiyat Geçmişi Deposu (SQLite)
+prices.json sadece son fiyatı tutuyordu. Burada:
+  - products:     Her URL'nin güncel durumu (isim, resim, fiyat, updated_at)
+  - observations: Her turda görülen fiyatların ekleme-only kaydı (url, ts, price)
+  - freshness:    URL başına son başarılı taramanın parmak izi / ETag'i ve liste sayfasında
+                  görülen ürün URL'leri (freshness.py)
+  - schedule:     URL başına bir sonraki kontrol zamanı ve değişkenlik (scheduler.py)
+  - domain_health: Domain başına devre kesici durumu ve son goto süreleri (circuit_breaker.py)
+Tur sonunda tüm kayıtlar tek transaction'da toplu yazılır.
+prices.json (script.js'in okuduğu biçim) bu depodan export edilir. Yazım atomiktir
+(geçici dosya + fsync + rename), anahtarlar sıralıdır ve içerik değişmediyse dosyaya
+hiç dokunulmaz; böylece git diff'i sadece değişen fiyatlar kadar olur.
+
+Komut satırı:
+    python price_store.py import [prices.json]   # Mevcut dosyayı bir kere içeri al
+    python price_store.py export [prices.json]   # Depodan prices.json üret
+    python price_store.py lowest <url> [gün]     # Son N gündeki en düşük fiyat
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+DB_FILE = os.environ.get("PRICES_DB", "prices.db")
+
+# prices.json biçimi:
+#   "indent"  -> json.dump(indent=4) (varsayılan, okunaklı)
+#   "compact" -> Her ürün tek satır; diff'te değişen ürün başına tek satır
+PRICES_JSON_FORMAT = os.environ.get("PRICES_JSON_FORMAT", "indent")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    url        TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    image      TEXT NOT NULL DEFAULT '',
+    price      REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    url   TEXT NOT NULL,
+    ts    REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_url_ts ON observations (url, ts);
+CREATE INDEX IF NOT EXISTS idx_observations_ts ON observations (ts);
+CREATE TABLE IF NOT EXISTS freshness (
+    url           TEXT PRIMARY KEY,
+    kind          TEXT NOT NULL,
+    fingerprint   TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    seconds       REAL NOT NULL DEFAULT 0,
+    checked_at    REAL NOT NULL,
+    products      TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS schedule (
+    url         TEXT PRIMARY KEY,
+    next_due    REAL NOT NULL,
+    interval    REAL NOT NULL,
+    volatility  REAL NOT NULL DEFAULT 0,
+    products    INTEGER NOT NULL DEFAULT 0,
+    checks      INTEGER NOT NULL DEFAULT 0,
+    last_change REAL
+);
+CREATE TABLE IF NOT EXISTS domain_health (
+    domain       TEXT PRIMARY KEY,
+    failures     INTEGER NOT NULL DEFAULT 0,
+    opened_until REAL NOT NULL DEFAULT 0,
+    cooldown     REAL NOT NULL DEFAULT 0,
+    latencies    TEXT NOT NULL DEFAULT '[]',
+    trips        INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Eski depolara sonradan eklenen kolonlar: (tablo, kolon, tanım)
+COLUMNS = [
+    ("freshness", "products", "TEXT NOT NULL DEFAULT '[]'"),
+]
+
+
+def serialize_prices(data, fmt=None):
+    """Ürünleri URL'ye göre sıralı, kararlı bir metne çevirir."""
+    fmt = fmt or PRICES_JSON_FORMAT
+    items = sorted(data.items())
+    if fmt == "compact":
+        lines = [
+            json.dumps(url, ensure_ascii=False) + ": "
+            + json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(", ", ": "))
+            for url, record in items
+        ]
+        return "{\n" + ",\n".join(lines) + "\n}\n" if lines else "{}\n"
+    return json.dumps(dict(items), indent=4, ensure_ascii=False, sort_keys=True) + "\n"
+
+
+def write_atomic(path, text):
+    """Geçici dosyaya yazıp fsync'ler ve rename ile yerine koyar (yarım dosya kalmaz)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # rename'in kendisi de diske yazılsın
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_prices_json(path, data, fmt=None):
+    """İçerik değiştiyse atomik yazar. Yazıldıysa True döner."""
+    text = serialize_prices(data, fmt)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    write_atomic(path, text)
+    return True
+
+
+class PriceStore:
+    def __init__(self, path=DB_FILE, readonly=False):
+        """readonly: depo salt okunur açılır (şema / kolon eklenmez, dosya yoksa hata)."""
+        self.path = path
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True)
+            return
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        for table, column, definition in COLUMNS:
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM products LIMIT 1").fetchone() is None
+
+    def record_run(self, records, ts=None):
+        """
+        Bir turda görülen ürünleri yazar.
+        records: {url: {"name", "price", "image", "updated_at"}}
+        """
+        if not records:
+            return 0
+        ts = ts or time.time()
+        rows = [
+            (url, r["name"], r.get("image") or "", r["price"], r["updated_at"], ts, ts)
+            for url, r in records.items()
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO observations (url, ts, price) VALUES (?, ?, ?)",
+                [(url, ts, r["price"]) for url, r in records.items()]
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO products (url, name, image, price, updated_at, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    name = excluded.name,
+                    image = excluded.image,
+                    price = excluded.price,
+                    updated_at = excluded.updated_at,
+                    last_seen = excluded.last_seen
+                """,
+                rows
+            )
+        return len(rows)
+
+    def latest(self):
+        """prices.json biçiminde güncel durum: {url: {name, price, image, updated_at}}"""
+        cursor = self.conn.execute(
+            "SELECT url, name, price, image, updated_at FROM products ORDER BY rowid"
+        )
+        return {
+            url: {"name": name, "price": price, "image": image, "updated_at": updated_at}
+            for url, name, price, image, updated_at in cursor
+        }
+
+    def lowest_price(self, url, days=30):
+        since = time.time() - days * 86400
+        row = self.conn.execute(
+            "SELECT MIN(price) FROM observations WHERE url = ? AND ts >= ?", (url, since)
+        ).fetchone()
+        return row[0] if row else None
+
+    def history(self, url, days=30):
+        since = time.time() - days * 86400
+        return self.conn.execute(
+            "SELECT ts, price FROM observations WHERE url = ? AND ts >= ? ORDER BY ts", (url, since)
+        ).fetchall()
+
+    def load_freshness(self):
+        """{url: {kind, fingerprint, etag, last_modified, seconds, checked_at, products}}"""
+        # Salt okunur açılan eski depoda products kolonu henüz olmayabilir
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(freshness)")}
+        products = "products" if "products" in columns else "'[]'"
+        cursor = self.conn.execute(
+            f"SELECT url, kind, fingerprint, etag, last_modified, seconds, checked_at, {products} FROM freshness"
+        )
+        return {
+            url: {"kind": kind, "fingerprint": fp, "etag": etag, "last_modified": last_modified,
+                  "seconds": seconds, "checked_at": checked_at, "products": json.loads(products or "[]")}
+            for url, kind, fp, etag, last_modified, seconds, checked_at, products in cursor
+        }
+
+    def save_freshness(self, records):
+        if not records:
+            return 0
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO freshness
+                    (url, kind, fingerprint, etag, last_modified, seconds, checked_at, products)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (url, r["kind"], r.get("fingerprint"), r.get("etag"), r.get("last_modified"),
+                     r.get("seconds") or 0, r["checked_at"], json.dumps(r.get("products") or []))
+                    for url, r in records.items()
+                ]
+            )
+        return len(records)
+
+    def load_schedule(self):
+        """{url: {next_due, interval, volatility, products, checks, last_change}}"""
+        cursor = self.conn.execute(
+            "SELECT url, next_due, interval, volatility, products, checks, last_change FROM schedule"
+        )
+        return {
+            url: {"next_due": next_due, "interval": interval, "volatility": volatility,
+                  "products": products, "checks": checks, "last_change": last_change}
+            for url, next_due, interval, volatility, products, checks, last_change in cursor
+        }
+
+    def save_schedule(self, records):
+        if not records:
+            return 0
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO schedule (url, next_due, interval, volatility, products, checks, last_change)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (url, r["next_due"], r["interval"], r.get("volatility") or 0, r.get("products") or 0,
+                     r.get("checks") or 0, r.get("last_change"))
+                    for url, r in records.items()
+                ]
+            )
+        return len(records)
+
+    def load_domain_health(self):
+        """{domain: {failures, opened_until, cooldown, latencies, trips}}"""
+        cursor = self.conn.execute(
+            "SELECT domain, failures, opened_until, cooldown, latencies, trips FROM domain_health"
+        )
+        return {
+            domain: {"failures": failures, "opened_until": opened_until, "cooldown": cooldown,
+                     "latencies": json.loads(latencies or "[]"), "trips": trips}
+            for domain, failures, opened_until, cooldown, latencies, trips in cursor
+        }
+
+    def save_domain_health(self, records):
+        if not records:
+            return 0
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO domain_health (domain, failures, opened_until, cooldown, latencies, trips)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (domain, r.get("failures") or 0, r.get("opened_until") or 0, r.get("cooldown") or 0,
+                     json.dumps(r.get("latencies") or []), r.get("trips") or 0)
+                    for domain, r in records.items()
+                ]
+            )
+        return len(records)
+
+    def merge_urls(self, mapping):
+        """
+        Ürün URL'lerini yeniden adlandırır, aynı kanonik URL'ye düşenleri birleştirir.
+        mapping: {eski_url: yeni_url}. Gözlemler yeni URL'ye taşınır; ürün kaydı olarak
+        en son güncellenen kopya kalır. Birleştirilen (silinen) kayıt sayısını döndürür.
+        """
+        if not mapping:
+            return 0
+        groups = {}
+        for old, new in mapping.items():
+            groups.setdefault(new, []).append(old)
+
+        removed = 0
+        with self.conn:
+            for new, olds in groups.items():
+                urls = olds + [new]
+                marks = ",".join("?" * len(urls))
+                rows = self.conn.execute(
+                    f"SELECT name, image, price, updated_at, first_seen, last_seen FROM products "
+                    f"WHERE url IN ({marks}) ORDER BY updated_at DESC",
+                    urls
+                ).fetchall()
+                if not rows:
+                    continue
+                name, image, price, updated_at = rows[0][:4]
+                first_seen = min(r[4] for r in rows)
+                last_seen = max(r[5] for r in rows)
+                self.conn.executemany("UPDATE observations SET url = ? WHERE url = ?", [(new, old) for old in olds])
+                self.conn.execute(f"DELETE FROM products WHERE url IN ({marks})", urls)
+                self.conn.execute(
+                    "INSERT INTO products (url, name, image, price, updated_at, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (new, name, image, price, updated_at, first_seen, last_seen)
+                )
+                removed += len(rows) - 1
+        return removed
+
+    def target_urls(self):
+        """Tazelik ve zamanlama tablolarındaki tarama hedefi URL'leri."""
+        cursor = self.conn.execute("SELECT url FROM freshness UNION SELECT url FROM schedule")
+        return [row[0] for row in cursor]
+
+    def rename_targets(self, mapping):
+        """Tazelik/zamanlama kayıtlarını kanonik URL'ye taşır (kanonik kayıt varsa o kalır)."""
+        with self.conn:
+            for table in ("freshness", "schedule"):
+                self.conn.executemany(
+                    f"UPDATE OR IGNORE {table} SET url = ? WHERE url = ?",
+                    [(new, old) for old, new in mapping.items()]
+                )
+                self.conn.executemany(
+                    f"DELETE FROM {table} WHERE url = ?", [(old,) for old in mapping]
+                )
+
+    def import_json(self, path):
+        """Eski prices.json'ı içeri alır (her kayıt için bir gözlem de yazılır)."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO products (url, name, image, price, updated_at, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (url, r["name"], r.get("image") or "", r["price"], r["updated_at"],
+                     r["updated_at"], r["updated_at"])
+                    for url, r in data.items()
+                ]
+            )
+            self.conn.executemany(
+                "INSERT INTO observations (url, ts, price) VALUES (?, ?, ?)",
+                [(url, r["updated_at"], r["price"]) for url, r in data.items()]
+            )
+        return len(data)
+
+    def export_json(self, path, fmt=None):
+        """prices.json üretir. (kayıt sayısı, dosya yazıldı mı) döndürür."""
+        data = self.latest()
+        return len(data), write_prices_json(path, data, fmt)
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in ("import", "export", "lowest"):
+        print(__doc__)
+        return 1
+
+    with PriceStore() as store:
+        command = argv[1]
+        if command == "import":
+            path = argv[2] if len(argv) > 2 else "prices.json"
+            print(f"{store.import_json(path)} kayıt içeri alındı -> {store.path}")
+        elif command == "export":
+            path = argv[2] if len(argv) > 2 else "prices.json"
+            count, written = store.export_json(path)
+            print(f"{count} kayıt -> {path} ({'yazıldı' if written else 'değişiklik yok'})")
+        else:
+            url = argv[2]
+            days = int(argv[3]) if len(argv) > 3 else 30
+            print(f"Son {days} günün en düşük fiyatı: {store.lowest_price(url, days)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
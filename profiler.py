@@ -0,0 +1,249 @@
+"""
+Profil Modu (python tracker.py --profile)
+Bir turun süresinin nereye gittiğini gösterir:
+  - Playwright round-trip'leri: Page / Locator / ElementHandle / Keyboard / Mouse...
+    async metotları sarılır; her çağrı, onu yapan satıra (dosya:satır fonksiyon) göre
+    sayılır ve süresi toplanır. Kart başına locator döngüsü gibi IPC bekleyen yerler öne çıkar.
+  - Python tarafı: tur cProfile ile ölçülür, en çok öz-süre harcayan fonksiyonlar listelenir
+    (olay döngüsünün boşta beklemesi ayrı gösterilir).
+  - PROFILE_TRACE_SECONDS verilirse tarama sıralı yapılır ve sadece bu süreden uzun
+    süren URL'lerin Playwright trace'i kaydedilir (npx playwright show-trace ile açılır).
+Rapor PROFILE_OUTPUT_DIR altına profile-<zaman>.txt olarak yazılır; cProfile çıktısı
+aynı adla .prof olarak da kaydedilir (snakeviz / pstats ile incelenebilir).
+Aynı sarmalama motor tarafından da kullanılır (add_round_trip_listener): run_metrics'teki
+playwright_calls sayacı tahmin değil, bu sarmalayıcıların saydığı gerçek çağrılardır.
+"""
+
+import cProfile
+import functools
+import inspect
+import os
+import pstats
+import re
+import sys
+import time
+
+PROFILE_OUTPUT_DIR = os.environ.get("PROFILE_OUTPUT_DIR", "profiles")
+PROFILE_TRACE_SECONDS = float(os.environ.get("PROFILE_TRACE_SECONDS", "0"))  # 0: trace yok
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", "25"))
+
+# Sarılan Playwright sınıfları (async_api)
+WRAPPED_CLASSES = ("BrowserContext", "Page", "Frame", "Locator", "ElementHandle", "JSHandle", "Keyboard",
+                   "Mouse", "CDPSession")
+
+# Olay döngüsünün boşta beklediği fonksiyonlar (Python'un "meşgul" sayılmadığı süre)
+IDLE_FUNCTIONS = ("select", "poll", "epoll", "kqueue")
+
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _is_library_frame(filename):
+    return (
+        filename == _THIS_FILE
+        or f"{os.sep}playwright{os.sep}" in filename
+        or f"{os.sep}asyncio{os.sep}" in filename
+    )
+
+
+def call_site(depth=2):
+    """Playwright'ı çağıran ilk proje satırı: 'tracker.py:512 gsstore_products_from_locators'"""
+    frame = sys._getframe(depth)
+    while frame and _is_library_frame(os.path.abspath(frame.f_code.co_filename)):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+# --- PLAYWRIGHT SARMALAMA ---
+# Her round-trip'te listener(çağrı yeri, "Sınıf.metot", saniye) çağrılır
+_listeners = []
+_originals = []
+
+
+def _wrap(owner, name, func):
+    method = f"{owner}.{name}"
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        site = call_site()
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            for listener in _listeners:
+                listener(site, method, seconds)
+
+    return wrapper
+
+
+def add_round_trip_listener(listener):
+    """İlk dinleyicide async_api sınıflarının coroutine metotlarını sayaçlı sürümleriyle değiştirir."""
+    if not _originals:
+        from playwright import async_api
+        for class_name in WRAPPED_CLASSES:
+            cls = getattr(async_api, class_name)
+            for name, func in list(vars(cls).items()):
+                if name.startswith("_") or not inspect.iscoroutinefunction(func):
+                    continue
+                _originals.append((cls, name, func))
+                setattr(cls, name, _wrap(class_name, name, func))
+    _listeners.append(listener)
+
+
+def remove_round_trip_listener(listener):
+    """Dinleyiciyi çıkarır; dinleyen kalmazsa orijinal metotlar geri konur."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+    if not _listeners:
+        for cls, name, func in reversed(_originals):
+            setattr(cls, name, func)
+        _originals.clear()
+
+
+class RoundTripStats:
+    """(çağrı yeri, metot) -> [adet, toplam sn, en uzun sn]"""
+
+    def __init__(self):
+        self.calls = {}
+
+    def add(self, site, method, seconds):
+        entry = self.calls.get((site, method))
+        if entry is None:
+            entry = self.calls[(site, method)] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    def install(self):
+        add_round_trip_listener(self.add)
+
+    def uninstall(self):
+        remove_round_trip_listener(self.add)
+
+    def total(self):
+        return sum(entry[1] for entry in self.calls.values()), sum(entry[0] for entry in self.calls.values())
+
+    def by_site(self):
+        """Çağrı yeri bazında toplam (aynı satırdaki farklı metotlar birleşir)."""
+        sites = {}
+        for (site, method), (count, seconds, _) in self.calls.items():
+            entry = sites.setdefault(site, [0, 0.0, set()])
+            entry[0] += count
+            entry[1] += seconds
+            entry[2].add(method.split(".", 1)[1])
+        return sites
+
+
+class SlowTraceRecorder:
+    """
+    ScrapeEngine tracer'ı: her tarayıcı URL'si için bir trace parçası açar,
+    URL threshold saniyeden uzun sürdüyse parçayı dosyaya yazar, değilse atar.
+    Trace context başınadır; parçalar karışmasın diye motor sıralı çalıştırılmalıdır.
+    """
+
+    def __init__(self, threshold, output_dir=PROFILE_OUTPUT_DIR, stamp=None):
+        self.threshold = threshold
+        self.output_dir = output_dir
+        self.stamp = stamp or time.strftime("%Y%m%d-%H%M%S")
+        self.saved = []  # (url, saniye, dosya)
+        self._started = False
+
+    async def start(self, context, url):
+        if not self._started:
+            await context.tracing.start(screenshots=True, snapshots=True)
+            self._started = True
+        await context.tracing.start_chunk(title=url)
+
+    async def stop(self, context, url, seconds):
+        if seconds < self.threshold:
+            await context.tracing.stop_chunk()
+            return
+        slug = re.sub(r"[^a-zA-Z0-9]+", "-", url.split("://", 1)[-1]).strip("-")[:80]
+        path = os.path.join(self.output_dir, f"trace-{self.stamp}-{slug}.zip")
+        os.makedirs(self.output_dir, exist_ok=True)
+        await context.tracing.stop_chunk(path=path)
+        self.saved.append((url, seconds, path))
+        print(f"   Yavaş URL ({seconds:.1f} sn), trace kaydedildi: {path}")
+
+
+class RunProfiler:
+    def __init__(self, output_dir=PROFILE_OUTPUT_DIR, trace_seconds=PROFILE_TRACE_SECONDS, top=PROFILE_TOP):
+        self.output_dir = output_dir
+        self.top = top
+        self.stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.round_trips = RoundTripStats()
+        self.tracer = SlowTraceRecorder(trace_seconds, output_dir, self.stamp) if trace_seconds > 0 else None
+        self._profile = cProfile.Profile()
+        self._wall = 0.0
+        self._cpu = 0.0
+
+    def start(self):
+        self.round_trips.install()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self._wall = time.perf_counter() - self._wall
+        self._cpu = time.process_time() - self._cpu
+        self.round_trips.uninstall()
+
+    def _python_hot_spots(self):
+        stats = pstats.Stats(self._profile)
+        idle = 0.0
+        rows = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            if any(part in name for part in IDLE_FUNCTIONS) and ("selectors" in filename or filename == "~"):
+                idle += tottime
+                continue
+            rows.append((tottime, calls, cumtime, f"{os.path.basename(filename)}:{line} {name}"))
+        rows.sort(reverse=True)
+        return rows[:self.top], idle
+
+    def report(self):
+        lines = [f"Profil raporu ({self.stamp})",
+                 f"Duvar süresi: {self._wall:.1f} sn, Python CPU: {self._cpu:.1f} sn"]
+        rt_seconds, rt_calls = self.round_trips.total()
+        lines.append(f"Playwright: {rt_calls} round-trip, toplam {rt_seconds:.1f} sn bekleme "
+                     f"(eşzamanlı sayfalarda duvar süresini aşabilir)")
+
+        lines.append("\n== Playwright çağrı yerleri (toplam bekleme sırasıyla) ==")
+        lines.append(f"{'toplam sn':>10} {'adet':>7} {'ort ms':>8}  çağrı yeri [metotlar]")
+        sites = sorted(self.round_trips.by_site().items(), key=lambda item: -item[1][1])
+        for site, (count, seconds, methods) in sites[:self.top]:
+            lines.append(f"{seconds:10.2f} {count:7d} {seconds / count * 1000:8.1f}  {site} "
+                         f"[{', '.join(sorted(methods))}]")
+
+        lines.append("\n== Playwright metotları ==")
+        lines.append(f"{'toplam sn':>10} {'adet':>7} {'en uzun':>8}  çağrı yeri / metot")
+        calls = sorted(self.round_trips.calls.items(), key=lambda item: -item[1][1])
+        for (site, method), (count, seconds, longest) in calls[:self.top]:
+            lines.append(f"{seconds:10.2f} {count:7d} {longest:8.2f}  {site} / {method}")
+
+        rows, idle = self._python_hot_spots()
+        lines.append(f"\n== Python sıcak noktaları (öz süre; olay döngüsü boşta: {idle:.1f} sn) ==")
+        lines.append(f"{'öz sn':>8} {'kümülatif':>10} {'adet':>8}  fonksiyon")
+        for tottime, count, cumtime, where in rows:
+            lines.append(f"{tottime:8.2f} {cumtime:10.2f} {count:8d}  {where}")
+
+        if self.tracer:
+            lines.append(f"\n== Yavaş URL trace'leri (> {self.tracer.threshold:g} sn) ==")
+            for url, seconds, path in self.tracer.saved or [("-", 0.0, "yok")]:
+                lines.append(f"{seconds:8.1f}  {url}  {path}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self):
+        """Raporu ve .prof dosyasını yazar, rapor dosyasının yolunu döndürür."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{self.stamp}")
+        text = self.report()
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(text)
+        self._profile.dump_stats(base + ".prof")
+        # Konsola sadece en sıcak kısımlar
+        print("\n" + "\n".join(text.splitlines()[:self.top // 2 + 6]))
+        print(f"Profil raporu: {base}.txt ({base}.prof)")
+        return base + ".txt"
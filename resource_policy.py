@@ -0,0 +1,244 @@
+"""
+Kaynak Engelleme Politikası
+page.route ile resim, font, medya ve üçüncü parti takip/sohbet scriptlerini
+tarama sırasında engeller. Biz resim URL'lerini attribute'lardan okuduğumuz için
+dosyaların kendisini indirmeye gerek yok.
+Site bazlı izin/engel kuralları ve basit bir bant genişliği sayacı içerir.
+
+Not: page.route Chromium'un HTTP önbelleğini devre dışı bırakır. Kalıcı profil
+(browser_profile.py) kullanılırken önbellek işe yarasın diye aynı kurallar
+CDP Network.setBlockedURLs ile uygulanır (attach_cdp_async).
+"""
+
+import os
+import weakref
+from urllib.parse import urlparse
+
+# Varsayılan açık; BLOCK_RESOURCES=0 ile kapatılabilir
+BLOCK_RESOURCES = os.environ.get("BLOCK_RESOURCES", "1") != "0"
+
+# Tüm siteler için engellenen kaynak türleri (Playwright resource_type değerleri)
+DEFAULT_BLOCK_TYPES = {"image", "media", "font"}
+
+# Analitik, reklam ve sohbet widget'ları
+DEFAULT_BLOCK_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "criteo.com",
+    "criteo.net",
+    "mc.yandex.ru",
+    "yandex.ru",
+    "analytics.tiktok.com",
+    "useinsider.com",
+    "insider-cdn.com",
+    "onesignal.com",
+    "zopim.com",
+    "zendesk.com",
+    "tawk.to",
+    "livechatinc.com",
+    "smartlook.com",
+    "segment.io",
+]
+
+# CDP modunda kaynak türleri URL kalıplarıyla engellenir
+TYPE_URL_PATTERNS = {
+    "image": ["*.jpg*", "*.jpeg*", "*.png*", "*.webp*", "*.gif*", "*.avif*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*", "*.ogg*"],
+}
+
+# CDP ile engel uygulanan sayfalar -> CDP oturumu (engeli kaldırmak için)
+_cdp_sessions = weakref.WeakKeyDictionary()
+
+# Site bazlı kurallar. Anahtar: sayfanın host'u (alt domainler dahil)
+#   block_types: Varsayılana ek engellenecek türler
+#   allow_types: Varsayılandan çıkarılacak türler
+#   block_hosts: Ek engellenecek hostlar
+#   allow_hosts: Engel listesinde olsa da izin verilecek hostlar
+SITE_RULES = {
+    "gsstore.org": {
+        "block_types": set(),
+        "allow_types": set(),
+        "block_hosts": [],
+        "allow_hosts": [],
+    },
+    "saatvesaat.com.tr": {
+        "block_types": set(),
+        "allow_types": set(),
+        "block_hosts": [],
+        "allow_hosts": [],
+    },
+}
+
+
+def _host(url):
+    return urlparse(url).netloc.lower().split(":")[0]
+
+
+def host_matches(host, pattern):
+    """host, pattern'in kendisi veya alt domaini ise True."""
+    return host == pattern or host.endswith("." + pattern)
+
+
+class ResourcePolicy:
+    """Sayfalara route handler'ı bağlar ve istatistik tutar."""
+
+    def __init__(self, enabled=None, site_rules=None):
+        self.enabled = BLOCK_RESOURCES if enabled is None else enabled
+        self.site_rules = SITE_RULES if site_rules is None else site_rules
+        self.stats = {"allowed": 0, "blocked": 0, "bytes": 0, "blocked_by_type": {}}
+
+    def rules_for(self, page_url):
+        """Sayfa URL'sine göre birleşik kuralları döndürür."""
+        host = _host(page_url)
+        block_types = set(DEFAULT_BLOCK_TYPES)
+        block_hosts = list(DEFAULT_BLOCK_HOSTS)
+        allow_hosts = []
+        for site, rule in self.site_rules.items():
+            if host_matches(host, site):
+                block_types |= set(rule.get("block_types", ()))
+                block_types -= set(rule.get("allow_types", ()))
+                block_hosts += list(rule.get("block_hosts", ()))
+                allow_hosts += list(rule.get("allow_hosts", ()))
+        return {"block_types": block_types, "block_hosts": block_hosts, "allow_hosts": allow_hosts}
+
+    def should_block(self, rules, resource_type, request_url):
+        host = _host(request_url)
+        if any(host_matches(host, p) for p in rules["allow_hosts"]):
+            return False
+        if resource_type in rules["block_types"]:
+            return True
+        return any(host_matches(host, p) for p in rules["block_hosts"])
+
+    def _count(self, blocked, resource_type):
+        if blocked:
+            self.stats["blocked"] += 1
+            by_type = self.stats["blocked_by_type"]
+            by_type[resource_type] = by_type.get(resource_type, 0) + 1
+        else:
+            self.stats["allowed"] += 1
+
+    def _add_response(self, response):
+        """
+        Bayt sayacı: cevabın content-length başlığı (headers ek round-trip yapmaz;
+        request.sizes() her istek için Playwright'a bir çağrı daha demekti).
+        Chunked cevaplarda başlık yoktur, o cevaplar sayılmaz.
+        """
+        try:
+            self.stats["bytes"] += int(response.headers.get("content-length") or 0)
+        except (TypeError, ValueError):
+            pass
+
+    # --- async API (scrape_engine) ---
+    async def attach_async(self, page, page_url):
+        if not self.enabled:
+            return
+        rules = self.rules_for(page_url)
+
+        async def handler(route):
+            request = route.request
+            blocked = self.should_block(rules, request.resource_type, request.url)
+            self._count(blocked, request.resource_type)
+            if blocked:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", handler)
+        page.on("response", self._add_response)
+
+    # --- CDP API (kalıcı profil / HTTP önbelleği açıkken) ---
+    def url_patterns(self, rules):
+        patterns = []
+        for resource_type in sorted(rules["block_types"]):
+            patterns += TYPE_URL_PATTERNS.get(resource_type, [])
+        for host in rules["block_hosts"]:
+            if any(host_matches(host, allowed) for allowed in rules["allow_hosts"]):
+                continue
+            patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+        return patterns
+
+    async def attach_cdp_async(self, page, page_url, cdp):
+        """page.route yerine Network.setBlockedURLs kullanır (önbellek açık kalır)."""
+        if not self.enabled:
+            return
+        await cdp.send("Network.setBlockedURLs", {"urls": self.url_patterns(self.rules_for(page_url))})
+
+        def on_failed(params):
+            if params.get("blockedReason"):
+                self._count(True, (params.get("type") or "other").lower())
+
+        def on_response(params):
+            self._count(False, None)
+
+        def on_finished(params):
+            self.stats["bytes"] += int(params.get("encodedDataLength") or 0)
+
+        cdp.on("Network.loadingFailed", on_failed)
+        cdp.on("Network.responseReceived", on_response)
+        cdp.on("Network.loadingFinished", on_finished)
+        _cdp_sessions[page] = cdp
+
+    # --- sync API (saatvesaat_advanced) ---
+    def attach_sync(self, page, page_url):
+        if not self.enabled:
+            return
+        rules = self.rules_for(page_url)
+
+        def handler(route):
+            request = route.request
+            blocked = self.should_block(rules, request.resource_type, request.url)
+            self._count(blocked, request.resource_type)
+            if blocked:
+                route.abort()
+            else:
+                route.continue_()
+
+        page.route("**/*", handler)
+        page.on("response", self._add_response)
+
+    def report(self):
+        s = self.stats
+        by_type = ", ".join(f"{k}: {v}" for k, v in sorted(s["blocked_by_type"].items()))
+        return (f"Kaynaklar: {s['allowed']} izin, {s['blocked']} engel ({by_type or '-'}), "
+                f"{s['bytes'] / 1024 / 1024:.1f} MB indirildi")
+
+
+# Viewport'taki resimleri yeniden yükletir ve yüklenmelerini (en fazla 3 sn) bekler
+RELOAD_IMAGES_JS = """
+() => {
+    const pending = [];
+    for (const img of document.querySelectorAll('img')) {
+        const r = img.getBoundingClientRect();
+        if (r.bottom < 0 || r.top > window.innerHeight) continue;
+        const src = img.getAttribute('data-src') || img.getAttribute('src');
+        if (!src) continue;
+        img.removeAttribute('src');
+        img.setAttribute('src', src);
+        pending.push(new Promise((resolve) => { img.onload = img.onerror = resolve; }));
+    }
+    return Promise.race([
+        Promise.all(pending),
+        new Promise((resolve) => setTimeout(resolve, 3000)),
+    ]);
+}
+"""
+
+
+async def release_page_async(page):
+    """Sayfadaki engeli kaldırır ve görünen resimleri yükler (indirim screenshot'ı için)."""
+    try:
+        cdp = _cdp_sessions.pop(page, None)
+        if cdp is not None:
+            await cdp.send("Network.setBlockedURLs", {"urls": []})
+        else:
+            await page.unroute("**/*")
+        await page.evaluate(RELOAD_IMAGES_JS)
+    except Exception:
+        pass
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import sys
@@ -5,6 +6,9 @@ import time
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
 
+from url_registry import UrlRegistry
+from url_canon import canonical_url
+
 # Config import
 try:
     import config
@@ -20,6 +24,85 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 URLS_FILE = "urls.txt"
+# tracker.py ile ortak; kilitli, atomik, sadece dosya değişince yeniden okunur
+registry = UrlRegistry(URLS_FILE, normalize=canonical_url)
+
+# Servis modu (python run_bot.py --servis): tarayıcı açık kalır, turlar bu event loop'ta döner
+SERVICE_INTERVAL_MINUTES = float(os.environ.get("SERVICE_INTERVAL_MINUTES", "60"))
+
+# --- Servis Modu ---
+
+class TrackerService:
+    """
+    tracker.run_cycle'ı botla aynı asyncio loop'unda, sıcak bir ScrapeEngine ile çalıştırır.
+    /ekle ile gelen linkler ayrı bir görevde, süren tam turu beklemeden taranır; ikisi aynı
+    motoru (aynı global / domain semaforlarını) paylaştığı için siteye giden yük artmaz.
+    Güncellemeleri sadece bot aldığı için tracker.check_new_urls burada çağrılmaz.
+    """
+
+    def __init__(self, interval_minutes=SERVICE_INTERVAL_MINUTES):
+        self.interval = interval_minutes * 60
+        self.engine = None
+        self.pending = []
+        self._wake = None
+        self._tasks = []
+        self._engine_lock = None
+        self._tracker = None
+
+    async def start(self, application):
+        import tracker  # Playwright vb. sadece servis modunda yüklensin
+        self._tracker = tracker
+        self._wake = asyncio.Event()
+        self._engine_lock = asyncio.Lock()
+        await self._start_engine()
+        self._tasks = [asyncio.create_task(self._loop()), asyncio.create_task(self._scan_pending())]
+        print(f"🔁 Servis modu: her {SERVICE_INTERVAL_MINUTES:g} dakikada bir tarama, tarayıcı açık.")
+
+    async def stop(self, application):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.engine:
+            await self.engine.close()
+        if self._tracker:
+            await asyncio.to_thread(self._tracker.notifier.close)
+
+    async def _start_engine(self):
+        self.engine = self._tracker.make_engine()
+        await self.engine.start()
+
+    def submit(self, url):
+        """Yeni linki hemen taranmak üzere kuyruğa alır."""
+        self.pending.append(url)
+        if self._wake:
+            self._wake.set()
+
+    async def _loop(self):
+        """Tam turlar: her SERVICE_INTERVAL_MINUTES dakikada bir."""
+        while True:
+            await self._run()
+            await asyncio.sleep(self.interval)
+
+    async def _scan_pending(self):
+        """/ekle linkleri: tam tur sürerken de hemen taranır."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            urls, self.pending = self.pending, []
+            if urls:
+                await self._run(urls)
+
+    async def _run(self, only_urls=None):
+        try:
+            # İki görev aynı anda kopuk bağlantı görürse tarayıcı bir kez yeniden başlatılsın
+            async with self._engine_lock:
+                if not self.engine.is_connected:
+                    logger.warning("Tarayıcı bağlantısı kopmuş, yeniden başlatılıyor...")
+                    await self.engine.close()
+                    await self._start_engine()
+            await self._tracker.run_cycle(self.engine, only_urls)
+        except Exception as e:
+            logger.error(f"Tarama turu hatası: {e}")
 
 # --- Komutlar ---
 
@@ -54,37 +137,26 @@ async def add_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Kullanım: /ekle <link>")
         return
     
-    url = " ".join(context.args).strip()
+    url = canonical_url(" ".join(context.args).strip())
     
     if not url.startswith("http"):
         await update.message.reply_text("❌ Geçerli bir URL giriniz (http/https ile başlamalı)")
         return
     
-    # Mevcut URL'leri oku
-    existing_urls = []
-    if os.path.exists(URLS_FILE):
-        with open(URLS_FILE, "r", encoding="utf-8") as f:
-            existing_urls = [line.strip() for line in f if line.strip()]
-    
-    if url in existing_urls:
+    if not registry.add(url):
         await update.message.reply_text("⚠️ Bu link zaten listede!")
         return
     
-    # Ekle
-    with open(URLS_FILE, "a", encoding="utf-8") as f:
-        f.write(f"{url}\n")
-    
-    await update.message.reply_text(f"✅ Link eklendi!\n\n{url}\n\n📊 Toplam {len(existing_urls) + 1} ürün takip ediliyor.")
+    await update.message.reply_text(f"✅ Link eklendi!\n\n{url}\n\n📊 Toplam {len(registry)} ürün takip ediliyor.")
+
+    service = context.application.bot_data.get("service")
+    if service:
+        service.submit(url)
+        await update.message.reply_text("🔎 Link hemen taranıyor...")
 
 async def list_urls(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """URL'leri listele"""
-    if not os.path.exists(URLS_FILE):
-        await update.message.reply_text("📭 Henüz hiç ürün eklenmemiş.")
-        return
-    
-    with open(URLS_FILE, "r", encoding="utf-8") as f:
-        urls = [line.strip() for line in f if line.strip()]
-    
+    urls = registry.urls()
     if not urls:
         await update.message.reply_text("📭 Henüz hiç ürün eklenmemiş.")
         return
@@ -110,24 +182,16 @@ async def remove_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Geçerli bir numara giriniz")
         return
     
-    if not os.path.exists(URLS_FILE):
-        await update.message.reply_text("📭 Henüz hiç ürün eklenmemiş.")
-        return
-    
-    with open(URLS_FILE, "r", encoding="utf-8") as f:
-        urls = [line.strip() for line in f if line.strip()]
-    
-    if index < 0 or index >= len(urls):
-        await update.message.reply_text(f"❌ Geçersiz numara! 1-{len(urls)} arasında bir sayı giriniz.")
+    removed_url = registry.remove_at(index)
+    if removed_url is None:
+        count = len(registry)
+        if not count:
+            await update.message.reply_text("📭 Henüz hiç ürün eklenmemiş.")
+        else:
+            await update.message.reply_text(f"❌ Geçersiz numara! 1-{count} arasında bir sayı giriniz.")
         return
     
-    removed_url = urls.pop(index)
-    
-    # Dosyayı yeniden yaz
-    with open(URLS_FILE, "w", encoding="utf-8") as f:
-        for url in urls:
-            f.write(f"{url}\n")
-    
+    urls = registry.urls()
     await update.message.reply_text(f"🗑️ Link silindi!\n\n{removed_url}\n\n📊 Kalan: {len(urls)} ürün")
 
 async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -149,7 +213,13 @@ def main():
     print(f"📱 Chat ID: {config.TELEGRAM_CHAT_ID}")
     
     # Application oluştur
-    application = Application.builder().token(config.TELEGRAM_TOKEN).build()
+    builder = Application.builder().token(config.TELEGRAM_TOKEN)
+    service = None
+    if "--servis" in sys.argv:
+        service = TrackerService()
+        builder = builder.post_init(service.start).post_shutdown(service.stop)
+    application = builder.build()
+    application.bot_data["service"] = service
     
     # Komut handler'ları ekle
     application.add_handler(CommandHandler("start", start))
@@ -0,0 +1,113 @@
+"""
+Tur Süresi ve Ara Kayıt
+Workflow işi zaman aşımına uğrayıp öldürülürse o turda taranan her şey kaybolmasın diye:
+  - RunDeadline: Turun RUN_DEADLINE_MINUTES sonunda bitmesi gerekir. Süre azalınca motor
+    yeni URL almaz ("deferred"); her URL'ye en fazla URL_BUDGET_SECONDS (ve kalan süre) verilir.
+  - Checkpoint: Görülen ürünler CHECKPOINT_SECONDS'ta bir depoya yazılır ve prices.json
+    yenilenir; turun planı ve biten URL'ler CHECKPOINT_FILE'da tutulur. Önceki tur yarıda
+    kaldıysa veya URL ertelediyse, o URL'ler sonraki turda ilk sıraya alınır.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+from price_store import write_atomic
+
+RUN_DEADLINE_MINUTES = float(os.environ.get("RUN_DEADLINE_MINUTES", "45"))
+URL_BUDGET_SECONDS = float(os.environ.get("URL_BUDGET_SECONDS", "240"))
+CHECKPOINT_SECONDS = float(os.environ.get("CHECKPOINT_SECONDS", "60"))
+CHECKPOINT_FILE = os.environ.get("CHECKPOINT_FILE", "checkpoint.json")
+
+# Bu kadar süre kalmışsa yeni URL başlatılmaz (kayıt ve commit için pay)
+DEADLINE_MARGIN_SECONDS = 30
+MIN_URL_SECONDS = 20
+
+
+class RunDeadline:
+    def __init__(self, minutes=RUN_DEADLINE_MINUTES, url_budget=URL_BUDGET_SECONDS):
+        self.seconds = minutes * 60 if minutes and minutes > 0 else None
+        self.url_budget_seconds = url_budget if url_budget and url_budget > 0 else None
+        self.started = time.monotonic()
+
+    def remaining(self):
+        if self.seconds is None:
+            return float("inf")
+        return self.seconds - (time.monotonic() - self.started)
+
+    def expired(self):
+        """Yeni URL başlatmak için süre kalmadı mı?"""
+        return self.remaining() - DEADLINE_MARGIN_SECONDS < MIN_URL_SECONDS
+
+    def url_budget(self):
+        """Başlayan bir URL'ye verilecek en uzun süre (sn); sınır yoksa None."""
+        budget = self.url_budget_seconds
+        left = self.remaining() - DEADLINE_MARGIN_SECONDS
+        if left != float("inf"):
+            budget = min(budget, left) if budget else left
+        return max(MIN_URL_SECONDS, budget) if budget else None
+
+
+class Checkpoint:
+    """
+    save(batch): {url: kayıt} gözlemlerini depoya yazıp prices.json'ı yenileyen fonksiyon
+    (tracker.save_prices). Aynı kayıt iki kez yazılmaz.
+    path None ise sadece ürünler kaydedilir, tur planı yazılmaz (servis modunda /ekle turları).
+    """
+
+    def __init__(self, save, path=CHECKPOINT_FILE, interval=CHECKPOINT_SECONDS):
+        self.save = save
+        self.path = path
+        self.interval = interval
+        self.saved = {}    # url -> son yazılan kayıt (aynı nesne tekrar yazılmaz)
+        self.planned = []
+        self.flushes = 0
+        self._lock = threading.Lock()  # Arka plan kaydı ile son kayıt çakışmasın
+
+    def carryover(self):
+        """Önceki turun bitmeyen veya ertelenen URL'leri (sonraki turda önce taranır)."""
+        if not self.path or not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ara kayıt okunamadı: {e}")
+            return []
+        done = set(state.get("done") or [])
+        return [url for url in state.get("planned") or [] if url not in done]
+
+    def begin(self, urls):
+        self.saved = {}
+        self.planned = list(urls)
+        self._write([])
+
+    def _write(self, done):
+        if not self.path:
+            return
+        state = {"updated_at": time.time(), "planned": self.planned, "done": sorted(done)}
+        write_atomic(self.path, json.dumps(state, ensure_ascii=False, indent=1))
+
+    def flush(self, observed, done=(), final=False):
+        """Yeni gözlemleri kaydeder; final ise gözlem olmasa da prices.json yenilenir."""
+        with self._lock:
+            batch = {url: record for url, record in observed.items() if self.saved.get(url) is not record}
+            if batch or final:
+                self.save(batch)
+                self.saved.update(batch)
+                self.flushes += 1
+            self._write(done)
+        return len(batch)
+
+    async def run_periodic(self, observed, done):
+        """Tur boyunca arka planda çalışır; done: biten URL'leri veren fonksiyon."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                count = await asyncio.to_thread(self.flush, dict(observed), list(done()))
+                if count:
+                    print(f"   Ara kayıt: {count} ürün kaydedildi.")
+            except Exception as e:
+                print(f"Ara kayıt hatası: {e}")
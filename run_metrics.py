@@ -0,0 +1,213 @@
+"""
+Tur Metrikleri
+Her tur için aşama süreleri (goto, scroll, extract, screenshot, telegram...) ve sayaçlar
+(Playwright çağrıları, ağdan gelen bayt, bulunan ürün, hata, bildirim) URL bazında toplanır.
+Tur sonunda:
+  - RUN_METRICS_FILE (JSON lines) dosyasına tek satırlık tur raporu eklenir,
+  - PROMETHEUS_TEXTFILE verilmişse node_exporter textfile biçiminde özet yazılır.
+Aşamayı hangi URL'nin yaptığı motorun her URL için ayarladığı current_url'den okunur;
+URL dışı aşamalar (fiyat yükleme, Telegram kuyruğunun boşaltılması) tur geneline yazılır.
+
+Son turların özeti:
+    python run_metrics.py [N]
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from price_store import write_atomic
+
+RUN_METRICS_FILE = os.environ.get("RUN_METRICS_FILE", "run_metrics.jsonl")
+RUN_METRICS_KEEP = int(os.environ.get("RUN_METRICS_KEEP", "2000"))  # Dosyada tutulan tur sayısı
+PROMETHEUS_TEXTFILE = os.environ.get("PROMETHEUS_TEXTFILE", "")
+PROMETHEUS_PREFIX = "indirimbotu"
+
+# Şu an işlenen URL (motor her URL görevinde ayarlar; görevler kendi kopyasını görür)
+current_url = ContextVar("current_url", default=None)
+
+
+class RunMetrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Yeni tur: tüm süreleri ve sayaçları sıfırlar."""
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self.phases = {}    # aşama -> toplam sn (tüm URL'ler + tur geneli)
+        self.counters = {}  # sayaç -> toplam
+        self.urls = {}      # url -> {"phases", "counters", "errors", ...}
+
+    def _url(self, url):
+        record = self.urls.get(url)
+        if record is None:
+            record = self.urls[url] = {"phases": {}, "counters": {}, "errors": []}
+        return record
+
+    # --- Kayıt ---
+    def add_phase(self, name, seconds, url=None):
+        url = url or current_url.get()
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if url:
+            phases = self._url(url)["phases"]
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name, url=None):
+        """with metrics.phase("scroll"): ... (async fonksiyonlar içinde de kullanılır)"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.monotonic() - started, url)
+
+    def count(self, name, n=1, url=None):
+        url = url or current_url.get()
+        self.counters[name] = self.counters.get(name, 0) + n
+        if url:
+            counters = self._url(url)["counters"]
+            counters[name] = counters.get(name, 0) + n
+
+    def error(self, message, url=None):
+        url = url or current_url.get()
+        self.count("errors", url=url)
+        if url:
+            self._url(url)["errors"].append(str(message)[:300])
+
+    def url_result(self, url, tier, status, seconds):
+        """Motor her URL bittiğinde çağırır."""
+        record = self._url(url)
+        record.update({"tier": tier, "status": status, "seconds": round(seconds, 3)})
+
+    # --- Rapor ---
+    def summary(self, **extra):
+        """Tur raporu (JSON'a yazılabilir sözlük)."""
+        statuses, tiers = {}, {}
+        for record in self.urls.values():
+            if "status" in record:
+                statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+            if "tier" in record:
+                tiers[record["tier"]] = tiers.get(record["tier"], 0) + 1
+        urls = {}
+        for url, record in self.urls.items():
+            record = dict(record)
+            record["phases"] = {k: round(v, 3) for k, v in record["phases"].items()}
+            urls[url] = record
+        summary = {
+            "started_at": round(self.started_at, 3),
+            "duration": round(time.monotonic() - self._started, 3),
+            "run_id": os.environ.get("GITHUB_RUN_ID"),
+            "urls": len(statuses),
+            "statuses": statuses,
+            "tiers": tiers,
+            "phases": {k: round(v, 3) for k, v in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "url_details": urls,
+        }
+        summary.update(extra)
+        return summary
+
+    def report(self, top=5):
+        """Konsol için kısa özet: en çok süren aşamalar ve en yavaş URL'ler."""
+        lines = ["Aşamalar: " + ", ".join(
+            f"{name} {seconds:.1f} sn"
+            for name, seconds in sorted(self.phases.items(), key=lambda item: -item[1])
+        )]
+        if self.counters:
+            lines.append("Sayaçlar: " + ", ".join(f"{k}: {v}" for k, v in sorted(self.counters.items())))
+        slow = sorted(
+            (record for record in self.urls.items() if "seconds" in record[1]),
+            key=lambda item: -item[1]["seconds"]
+        )[:top]
+        for url, record in slow:
+            phases = ", ".join(f"{k} {v:.1f}" for k, v in sorted(record["phases"].items(), key=lambda i: -i[1]))
+            lines.append(f"   {record['seconds']:.1f} sn [{record.get('tier')}] {url} ({phases})")
+        return "\n".join(lines)
+
+    def write(self, path=RUN_METRICS_FILE, textfile=PROMETHEUS_TEXTFILE, **extra):
+        """Tur raporunu JSONL dosyasına ekler, istenirse Prometheus textfile yazar."""
+        return self.save(self.summary(**extra), path, textfile)
+
+    def save(self, summary, path=RUN_METRICS_FILE, textfile=PROMETHEUS_TEXTFILE):
+        """Hazır özeti yazar (servis modunda özet event loop'ta alınıp dosyaya thread'de yazılır)."""
+        if path:
+            append_jsonl(path, summary, RUN_METRICS_KEEP)
+        if textfile:
+            write_atomic(textfile, prometheus_text(summary))
+        return summary
+
+
+def append_jsonl(path, record, keep=None):
+    line = json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n"
+    lines = []
+    if keep and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    if keep and len(lines) >= keep:
+        lines = lines[len(lines) - keep + 1:]
+        lines.append(line)
+        write_atomic(path, "".join(lines))
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def prometheus_text(summary, prefix=PROMETHEUS_PREFIX):
+    """Tur özetini Prometheus exposition (textfile collector) biçimine çevirir."""
+    lines = [
+        f"# HELP {prefix}_run_duration_seconds Son turun süresi.",
+        f"# TYPE {prefix}_run_duration_seconds gauge",
+        f"{prefix}_run_duration_seconds {summary['duration']}",
+        f"# HELP {prefix}_run_timestamp_seconds Son turun başlangıç zamanı.",
+        f"# TYPE {prefix}_run_timestamp_seconds gauge",
+        f"{prefix}_run_timestamp_seconds {summary['started_at']}",
+        f"# HELP {prefix}_run_urls Son turda durumuna göre URL sayısı.",
+        f"# TYPE {prefix}_run_urls gauge",
+    ]
+    for status, count in sorted(summary["statuses"].items()):
+        lines.append(f'{prefix}_run_urls{{status="{_label(status)}"}} {count}')
+    lines += [
+        f"# HELP {prefix}_run_phase_seconds Son turda aşama başına toplam süre.",
+        f"# TYPE {prefix}_run_phase_seconds gauge",
+    ]
+    for name, seconds in sorted(summary["phases"].items()):
+        lines.append(f'{prefix}_run_phase_seconds{{phase="{_label(name)}"}} {seconds}')
+    lines += [
+        f"# HELP {prefix}_run_count Son turun sayaçları (ürün, hata, bildirim, bayt...).",
+        f"# TYPE {prefix}_run_count gauge",
+    ]
+    for name, value in sorted(summary["counters"].items()):
+        lines.append(f'{prefix}_run_count{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def load_runs(path=RUN_METRICS_FILE):
+    runs = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        runs.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+    return runs
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    for run in load_runs()[-count:]:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started_at"]))
+        phases = sorted(run["phases"].items(), key=lambda item: -item[1])[:3]
+        print(f"{when}  {run['duration']:7.1f} sn  {run['urls']:3d} URL  "
+              f"hata {run['counters'].get('errors', 0):2d}  "
+              + ", ".join(f"{name} {seconds:.0f}" for name, seconds in phases))
@@ -9,6 +9,10 @@ import json
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 from playwright_stealth import Stealth
 
+from resource_policy import ResourcePolicy
+from browser_profile import STORAGE_STATE_FILE, storage_state_path
+from price_parser import parse_price, find_price_in_text
+
 # Test URL'leri
 TEST_LIST_URL = "https://www.saatvesaat.com.tr/erkek-klasik-saat?filters[brand.f]=seiko+5&order=position&direction=desc&pi=2"
 TEST_PRODUCT_URL = "https://www.saatvesaat.com.tr/seiko-5-erkek-kol-saati-p-s5-srpj85k"
@@ -24,25 +28,6 @@ def get_random_user_agent():
     ]
     return random.choice(user_agents)
 
-def parse_price(text):
-    """Fiyat metnini sayıya çevirir"""
-    if not text:
-        return None
-    
-    # TL, TL harflerini temizle
-    clean = text.replace("TL", "").replace("tl", "").replace("₺", "").replace("\n", "").strip()
-    
-    # Türk formatı: 1.299,99 -> 1299.99
-    clean = clean.replace(".", "").replace(",", ".")
-    
-    # Sadece sayı ve nokta kalsın
-    clean = "".join([c for c in clean if c.isdigit() or c == '.'])
-    
-    try:
-        return float(clean)
-    except:
-        return None
-
 def advanced_scrape_saatvesaat(url, headless=True):
     """
     Gelişmiş Saat&Saat scraper
@@ -73,8 +58,14 @@ def advanced_scrape_saatvesaat(url, headless=True):
             ]
         )
         
+        # Önceki turdan kalan çerezler (cookie onayı vb.) varsa yükle
+        saved_state = storage_state_path()
+        if saved_state:
+            print(f"   Kayıtlı oturum yükleniyor: {saved_state}")
+
         # Context oluştur - Gerçekçi browser davranışı
         context = browser.new_context(
+            storage_state=saved_state,
             user_agent=user_agent,
             viewport={"width": 1920, "height": 1080},
             locale="tr-TR",
@@ -103,6 +94,10 @@ def advanced_scrape_saatvesaat(url, headless=True):
         page = context.new_page()
         stealth_config = Stealth()
         stealth_config.apply_stealth_sync(page)
+
+        # Resim, font, medya ve takip scriptlerini engelle
+        resource_policy = ResourcePolicy()
+        resource_policy.attach_sync(page, url)
         
         # WebDriver detection'ı daha da azalt
         page.add_init_script("""
@@ -252,13 +247,7 @@ def advanced_scrape_saatvesaat(url, headless=True):
                         if not price:
                             try:
                                 full_text = item.inner_text()
-                                import re
-                                matches = re.findall(r'([\d\.,]+)\s*(?:TL|₺)', full_text)
-                                if matches:
-                                    for match in matches:
-                                        price = parse_price(match)
-                                        if price and 10 < price < 1000000:
-                                            break
+                                price = find_price_in_text(full_text, max_price=1000000, currency_only=True)
                             except:
                                 pass
                         
@@ -382,6 +371,12 @@ def advanced_scrape_saatvesaat(url, headless=True):
         except Exception as e:
             print(f"   [HATA] {e}")
         finally:
+            print(f"   {resource_policy.report()}")
+            if STORAGE_STATE_FILE:
+                try:
+                    context.storage_state(path=STORAGE_STATE_FILE)
+                except Exception:
+                    pass
             browser.close()
     
     return products
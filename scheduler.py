@@ -0,0 +1,127 @@
+"""
+Değişkenliğe Göre Zamanlayıcı
+Workflow her saat çalışır ama her URL'nin her saat taranması gerekmez.
+Her URL için bir sonraki kontrol zamanı (next_due) tutulur:
+  - Fiyatı değişen URL'nin aralığı yarıya iner, indirim görülen URL en kısa aralığa döner,
+  - değişmeyen URL'nin aralığı her turda büyür (üst sınıra kadar),
+  - çok ürün kapsayan URL'lerin (liste sayfaları) üst sınırı daha kısadır.
+Her turda vakti gelen URL'ler öncelik kuyruğundan (heapq) çekilir ve tahmini sayfa
+süreleri SCHEDULE_BUDGET saniyesini dolduruncaya kadar seçilir; kalanlar ertelenir.
+Durum prices.db içindeki schedule tablosunda saklanır.
+"""
+
+import heapq
+import math
+import os
+import time
+
+SCHEDULER = os.environ.get("SCHEDULER", "1") != "0"
+# Bir turda harcanacak tahmini toplam sayfa süresi (sn, eşzamanlılıktan bağımsız)
+SCHEDULE_BUDGET = float(os.environ.get("SCHEDULE_BUDGET", "1800"))
+
+MIN_INTERVAL_HOURS = float(os.environ.get("SCHEDULE_MIN_HOURS", "1"))
+MAX_INTERVAL_HOURS = float(os.environ.get("SCHEDULE_MAX_HOURS", "48"))
+GROWTH = 1.5            # Değişiklik yoksa aralık çarpanı
+SHRINK = 0.5            # Fiyat değişince aralık çarpanı
+DEFAULT_COST = 30.0     # Süresi bilinmeyen URL için tahmini sayfa süresi (sn)
+# Cron tam saatte kaymasın diye vakti birkaç dakika içinde gelecek olanlar da sayılır
+DUE_SLACK = 300
+
+
+class Scheduler:
+    def __init__(self, state=None, enabled=SCHEDULER, budget=SCHEDULE_BUDGET):
+        self.enabled = enabled
+        self.budget = budget
+        self.state = state or {}   # url -> {next_due, interval, volatility, products, checks, last_change}
+        self.changed = {}          # url -> bu turda güncellenen kayıt
+
+    @staticmethod
+    def max_interval(products):
+        """Çok ürünlü URL'lerin üst sınırı kısalır (100 ürün -> ~1/3)."""
+        return max(MIN_INTERVAL_HOURS, MAX_INTERVAL_HOURS / (1 + math.log10(1 + (products or 0))))
+
+    def priority(self, url, now):
+        record = self.state.get(url)
+        if not record:
+            return math.inf  # Hiç taranmamış URL önce
+        interval = record["interval"] * 3600
+        overdue = max(0.0, now - record["next_due"])
+        weight = 1 + math.log10(1 + (record.get("products") or 0))
+        return (1 + overdue / interval) * (1 + 2 * record.get("volatility", 0)) * weight
+
+    def plan(self, urls, costs=None, now=None, first=None):
+        """
+        Bu turda taranacak URL'leri seçer. (seçilenler, ertelenenler) döndürür.
+        costs: {url: tahmini sayfa süresi sn} (ör. son turdaki süreler)
+        first: vadesine bakılmadan en önce seçilecek URL'ler (önceki turdan kalanlar)
+        """
+        first = set(first or [])
+        # Önceki turdan kalanlar önce, diğerleri dosyadaki sırayla taransın (çıktı okunaklı kalsın)
+        position = {url: (url not in first, i) for i, url in enumerate(urls)}
+        if not self.enabled:
+            return sorted(urls, key=position.get), []
+        now = now or time.time()
+        costs = costs or {}
+
+        heap = []
+        deferred = []
+        for order, url in enumerate(urls):
+            if url in first:
+                heapq.heappush(heap, (-math.inf, order, url))
+                continue
+            record = self.state.get(url)
+            if record and record["next_due"] > now + DUE_SLACK:
+                deferred.append(url)
+                continue
+            heapq.heappush(heap, (-self.priority(url, now), order, url))
+
+        selected = []
+        spent = 0.0
+        while heap:
+            _, _, url = heapq.heappop(heap)
+            cost = costs.get(url) or DEFAULT_COST
+            if selected and spent + cost > self.budget:
+                deferred.append(url)
+                continue
+            selected.append(url)
+            spent += cost
+
+        selected.sort(key=position.get)
+        print(f"Zamanlayıcı: {len(selected)}/{len(urls)} URL seçildi "
+              f"(tahmini {spent:.0f}/{self.budget:.0f} sn), {len(deferred)} ertelendi.")
+        return selected, deferred
+
+    def update(self, url, changed=False, discount=False, products=None, now=None):
+        """Taranan URL'nin bir sonraki kontrol zamanını belirler."""
+        now = now or time.time()
+        record = dict(self.state.get(url) or {
+            "interval": MIN_INTERVAL_HOURS, "volatility": 1.0, "products": 0, "checks": 0, "last_change": now
+        })
+        if products is not None:
+            record["products"] = products
+        record["volatility"] = 0.7 * record.get("volatility", 0) + 0.3 * (1.0 if changed else 0.0)
+        if discount:
+            interval = MIN_INTERVAL_HOURS
+        elif changed:
+            interval = record["interval"] * SHRINK
+        else:
+            interval = record["interval"] * GROWTH
+        interval = min(max(interval, MIN_INTERVAL_HOURS), self.max_interval(record["products"]))
+        if changed or discount:
+            record["last_change"] = now
+
+        record["interval"] = interval
+        record["checks"] = record.get("checks", 0) + 1
+        record["next_due"] = now + interval * 3600
+        self.state[url] = record
+        self.changed[url] = record
+
+    def failed(self, url, now=None):
+        """Hata alan URL bir sonraki turda tekrar denenir, aralığı değişmez."""
+        now = now or time.time()
+        record = self.state.get(url)
+        if not record:
+            return
+        record = dict(record, next_due=now + MIN_INTERVAL_HOURS * 3600)
+        self.state[url] = record
+        self.changed[url] = record
@@ -0,0 +1,532 @@
+"""
+Eşzamanlı Tarama Motoru
+async_playwright üzerinde bir sayfa havuzu çalıştırır.
+Global ve domain başına eşzamanlılık limitleri ile URL'leri paralel tarar,
+böylece bir turun süresi URL sayısına değil en yavaş domaine bağlı olur.
+"""
+
+import asyncio
+import os
+import random
+import time
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+from playwright_stealth import Stealth
+
+from resource_policy import ResourcePolicy
+from browser_profile import (PROFILE_DIR, STORAGE_STATE_FILE, CacheStats, launch_args, prepare_profile,
+                             storage_state_path)
+from freshness import UNCHANGED
+from circuit_breaker import BlockedPage, is_block_page
+from run_metrics import RunMetrics, current_url
+from profiler import add_round_trip_listener, remove_round_trip_listener
+
+# --- AYARLAR ---
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+GOTO_TIMEOUT = 90000
+
+# Aynı anda açık olabilecek toplam sayfa sayısı
+GLOBAL_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", "6"))
+
+# Domain başına limitler ("generic" bilinmeyen tüm siteler için ortak havuzdur)
+# Ortam değişkeni ile ezilebilir: SCRAPE_DOMAIN_LIMITS="gsstore.org=3,generic=1"
+DOMAIN_CONCURRENCY = {
+    "gsstore.org": 3,
+    "saatvesaat.com.tr": 2,
+    "generic": 2,
+}
+
+
+def parse_domain_limits(text):
+    """'gsstore.org=3,generic=1' biçimindeki metni sözlüğe çevirir."""
+    limits = {}
+    for part in (text or "").split(","):
+        if "=" not in part:
+            continue
+        key, value = part.split("=", 1)
+        try:
+            limits[key.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
+DOMAIN_CONCURRENCY.update(parse_domain_limits(os.environ.get("SCRAPE_DOMAIN_LIMITS", "")))
+
+
+def domain_key(url):
+    """URL'nin hangi limit havuzuna düştüğünü döndürür."""
+    host = urlparse(url).netloc.lower().split(":")[0]
+    for key in DOMAIN_CONCURRENCY:
+        if key == "generic":
+            continue
+        if host == key or host.endswith("." + key):
+            return key
+    return "generic"
+
+
+def health_key(url):
+    """Devre kesici anahtarı: bilinen siteler için domain_key, diğerleri için host."""
+    key = domain_key(url)
+    if key == "generic":
+        return urlparse(url).netloc.lower().split(":")[0] or key
+    return key
+
+
+class PagedProducts(list):
+    """
+    Strateji sonucu: bu sayfanın ürünleri + aynı listenin taranacak diğer sayfaları.
+    more_pages: [sayfa URL'si, ...], page_strategy: async def (page, url) -> [ürün, ...]
+    """
+
+    def __init__(self, products, more_pages, page_strategy):
+        super().__init__(products)
+        self.more_pages = more_pages
+        self.page_strategy = page_strategy
+
+
+class ScrapeEngine:
+    """
+    Tek tarayıcı + tek context üzerinde, her URL için ayrı sayfa açan motor.
+
+    strategies: {domain_key: async def strategy(page, url) -> [ürün, ...]}
+    Bilinmeyen domainler için "generic" stratejisi kullanılır.
+    fast_tiers: [(isim, async def(url) -> [ürün, ...] veya None), ...]
+                Her URL önce sırayla bunlarla denenir (ör. "api", "http");
+                hepsi None dönerse tarayıcıya geçilir.
+    freshness:  freshness.Freshness; katman veya strateji UNCHANGED döndürürse
+                on_result çağrılmaz, URL "değişmedi" sayılır.
+    metrics:    run_metrics.RunMetrics; URL başına aşama süreleri ve sayaçlar. Motor açıkken her
+                Playwright round-trip'i (profiler sarmalayıcıları) playwright_calls sayacına yazılır.
+    jitter:     False ise sayfalar arası rastgele nezaket beklemeleri yapılmaz (benchmark).
+    breaker:    circuit_breaker.CircuitBreaker; devresi açık domainin URL'leri "skipped"
+                sayılıp atlanır, goto zaman aşımı domainin yakın geçmişinden alınır.
+    deadline:   run_control.RunDeadline; süre azalınca yeni URL başlatılmaz ("deferred"),
+                başlayan tarayıcı URL'si url_budget() saniyede kesilir ("timeout").
+    tracer:     async start(context, url) / stop(context, url, saniye) metotları olan nesne
+                (ör. profiler.SlowTraceRecorder); her tarayıcı URL'sinin etrafında çağrılır.
+    Strateji PagedProducts döndürürse listenin diğer sayfaları, ilk sayfanın
+    semaforları bırakıldıktan sonra domain limiti kadar eşzamanlı taranır ve
+    her sayfanın yeni ürünleri on_result'a asıl URL ile verilir.
+    """
+
+    def __init__(self, strategies, global_limit=None, domain_limits=None, headless=None, resource_policy=None,
+                 fast_tiers=None, profile_dir=None, storage_state_file=None, freshness=None,
+                 metrics=None, jitter=True, tracer=None, breaker=None, deadline=None):
+        self.strategies = strategies
+        self.global_limit = global_limit or GLOBAL_CONCURRENCY
+        self.domain_limits = dict(DOMAIN_CONCURRENCY)
+        if domain_limits:
+            self.domain_limits.update(domain_limits)
+        if headless is None:
+            headless = True if os.environ.get("GITHUB_ACTIONS") else False
+        self.headless = headless
+        self.resource_policy = resource_policy or ResourcePolicy()
+        self.fast_tiers = fast_tiers or []
+        # Kalıcı profil (çerez + HTTP önbelleği) veya sadece storage_state
+        self.profile_dir = PROFILE_DIR if profile_dir is None else profile_dir
+        self.storage_state_file = STORAGE_STATE_FILE if storage_state_file is None else storage_state_file
+        self.cache_stats = CacheStats()
+        self.freshness = freshness
+        self.metrics = metrics or RunMetrics()
+        self.jitter = jitter
+        self.tracer = tracer
+        self.breaker = breaker
+        self.deadline = deadline
+
+        self._playwright = None
+        self.browser = None
+        self.context = None
+        self._stealth = Stealth()
+        self._global_sem = None
+        self._domain_sems = {}
+        self.domain_times = {}
+        self.tiers = {}  # url -> "api" | "http" | "browser" (+ " (değişmedi)")
+        self.statuses = {}  # url -> "ok" | "unchanged" | "failed" | "timeout" | "skipped" | "deferred"
+        self.seconds = {}   # url -> sayfa/katman süresi
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        add_round_trip_listener(self._count_round_trip)
+        self._playwright = await async_playwright().start()
+        args = ["--disable-blink-features=AutomationControlled"]
+        context_options = {
+            "user_agent": USER_AGENT,
+            "viewport": {"width": 1920, "height": 1080},
+            "locale": "tr-TR",
+            "timezone_id": "Europe/Istanbul",
+        }
+        if self.profile_dir:
+            print(f"Kalıcı tarayıcı profili: {self.profile_dir}")
+            self.context = await self._playwright.chromium.launch_persistent_context(
+                prepare_profile(self.profile_dir),
+                headless=self.headless,
+                args=args + launch_args(),
+                **context_options
+            )
+        else:
+            self.browser = await self._playwright.chromium.launch(headless=self.headless, args=args)
+            state = storage_state_path(self.storage_state_file)
+            if state:
+                print(f"Kayıtlı oturum yükleniyor: {state}")
+                context_options["storage_state"] = state
+            self.context = await self.browser.new_context(**context_options)
+        self._global_sem = asyncio.Semaphore(self.global_limit)
+        self._domain_sems = {}
+
+    async def close(self):
+        try:
+            if self.context and self.storage_state_file:
+                try:
+                    await self.context.storage_state(path=self.storage_state_file)
+                except Exception as e:
+                    print(f"storage_state kaydedilemedi: {e}")
+            if self.browser:
+                await self.browser.close()
+            elif self.context:
+                await self.context.close()
+        finally:
+            self.browser = None
+            self.context = None
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+            remove_round_trip_listener(self._count_round_trip)
+
+    def _count_round_trip(self, site, method, seconds):
+        # current_url'den çağrıyı yapan URL'ye yazılır
+        self.metrics.count("playwright_calls")
+
+    def reset_stats(self):
+        """Sıcak tutulan motorda her tur öncesi tur istatistiklerini sıfırlar."""
+        self.domain_times = {}
+        self.tiers = {}
+        self.statuses = {}
+        self.seconds = {}
+        self.cache_stats = CacheStats()
+        self.resource_policy.stats = {"allowed": 0, "blocked": 0, "bytes": 0, "blocked_by_type": {}}
+
+    @property
+    def is_connected(self):
+        if self.browser:
+            return self.browser.is_connected()
+        return self.context is not None
+
+    def _domain_sem(self, key):
+        if key not in self._domain_sems:
+            limit = self.domain_limits.get(key, self.domain_limits.get("generic", 1))
+            self._domain_sems[key] = asyncio.Semaphore(limit)
+        return self._domain_sems[key]
+
+    async def new_page(self):
+        page = await self.context.new_page()
+        await self._stealth.apply_stealth_async(page)
+        return page
+
+    async def scrape(self, url, on_result=None):
+        """Tek bir URL'yi limitlere uyarak tarar, bulunan ürünleri döndürür."""
+        key = domain_key(url)
+        current_url.set(url)
+        if self.deadline and self.deadline.expired():
+            return self._defer(url)
+        hkey = health_key(url)
+        if self.breaker and not self.breaker.allow(hkey):
+            return self._skip(url)
+        # allow() yarı açık devrenin tek denemesini bu URL'ye verdiyse
+        probe = bool(self.breaker) and hkey in self.breaker.probing
+        try:
+            return await self._scrape_tiers(url, key, on_result)
+        finally:
+            if probe:
+                # Deneme sonuçsuz bittiyse (ertelendi, sayfa açılmadan kesildi...) sonraki URL denesin
+                self.breaker.release(hkey)
+
+    async def _scrape_tiers(self, url, key, on_result):
+        """Önce hızlı katmanlar, hepsi None dönerse tarayıcı."""
+        for tier_name, tier in self.fast_tiers:
+            products = None
+            async with self._domain_sem(key):
+                started = time.monotonic()
+                try:
+                    products = await tier(url)
+                except Exception as e:
+                    # Katmanlar ayrıştırma hatalarını kendileri yutar; buraya ağ hataları gelir
+                    print(f"   [{tier_name.upper()}] Hata ({url}): {e}")
+                    self.metrics.error(f"{tier_name}: {e}")
+                    if self.breaker:
+                        self.breaker.failure(health_key(url), f"{tier_name}: {type(e).__name__}")
+                elapsed = time.monotonic() - started
+                self.metrics.add_phase(tier_name, elapsed)
+            if self.breaker and products:
+                # Site cevap veriyor (yarı açık devrenin denemesi de böyle sonuçlanabilir)
+                self.breaker.success(health_key(url))
+            if products is UNCHANGED:
+                self.tiers[url] = f"{tier_name} (değişmedi)"
+                print(f"\n[{tier_name.upper()}] {url}\n   -> Son turdan beri değişmedi, atlandı.")
+                self._finished(url, elapsed, "unchanged")
+                return []
+            if products:
+                self.tiers[url] = tier_name
+                print(f"\n[{tier_name.upper()}] {url}\n   -> {len(products)} ürün çekildi.")
+                status = "ok"
+                if on_result:
+                    try:
+                        with self.metrics.phase("on_result"):
+                            await on_result(None, url, products)
+                    except Exception as e:
+                        print(f"Genel Hata ({url}): {e}")
+                        self.metrics.error(e)
+                        status = "failed"
+                self.metrics.count("products", len(products))
+                self._finished(url, elapsed, status)
+                return products
+
+        self.tiers[url] = "browser"
+        return await self._scrape_browser(url, key, on_result)
+
+    def _skip(self, url):
+        """Devresi açık domainin URL'si: hiç denenmeden atlanır."""
+        self.tiers[url] = "atlandı (devre açık)"
+        print(f"\n[ATLANDI] {url}\n   -> {health_key(url)} devresi açık.")
+        self.metrics.count("skipped")
+        self._finished(url, 0.0, "skipped")
+        return []
+
+    def _defer(self, url):
+        """Tur süresi doldu: URL başlatılmaz, sonraki tura kalır."""
+        self.tiers[url] = "ertelendi (süre doldu)"
+        self.metrics.count("deferred")
+        self._finished(url, 0.0, "deferred")
+        return []
+
+    def _finished(self, url, seconds, status):
+        self.statuses[url] = status
+        self.seconds[url] = seconds
+        self.metrics.url_result(url, self.tiers.get(url), status, seconds)
+        if self.freshness:
+            self.freshness.finished(url, seconds, status)
+
+    async def _open(self, url):
+        """Yeni sayfa açar, kaynak politikasını bağlar ve URL'ye gider."""
+        metrics = self.metrics
+        with metrics.phase("open"):
+            page = await self.new_page()
+            cdp = await self.cache_stats.attach_async(page)
+            if self.profile_dir:
+                # page.route HTTP önbelleğini kapatır; profil açıkken CDP ile engelle
+                await self.resource_policy.attach_cdp_async(page, url, cdp)
+            else:
+                await self.resource_policy.attach_async(page, url)
+        # Ağdan gelen baytlar bu sayfayı açan URL'ye yazılır
+        owner = current_url.get()
+        cdp.on("Network.loadingFinished",
+               lambda params: metrics.count("bytes", int(params.get("encodedDataLength") or 0), owner))
+        print(f"\nSiteye Gidiliyor: {url}")
+        hkey = health_key(url)
+        timeout = self.breaker.goto_timeout(hkey, GOTO_TIMEOUT) if self.breaker else GOTO_TIMEOUT
+        goto_started = time.monotonic()
+        try:
+            with metrics.phase("goto"):
+                response = await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+            status = response.status if response else None
+            title = await page.title()
+            if is_block_page(status, title):
+                raise BlockedPage(f"engel sayfası ({status}, {title[:60]!r})")
+        except Exception as e:
+            await page.close()
+            if self.breaker:
+                self.breaker.failure(hkey, type(e).__name__)
+            raise
+        goto_seconds = time.monotonic() - goto_started
+        if self.breaker:
+            # 5xx sayfası açıldı ama site sağlıklı değil
+            if status and status >= 500:
+                self.breaker.failure(hkey, f"HTTP {status}")
+            else:
+                self.breaker.success(hkey, goto_seconds)
+        print(f"   domcontentloaded: {goto_seconds:.1f} sn (zaman aşımı {timeout / 1000:.0f} sn)")
+        if self.jitter:
+            with metrics.phase("jitter"):
+                await asyncio.sleep(random.uniform(1, 2.5))
+        return page
+
+    async def _scrape_browser(self, url, key, on_result):
+        strategy = self.strategies.get(key) or self.strategies["generic"]
+        products = []
+        status = "failed"
+        started = time.monotonic()
+
+        async with self._domain_sem(key), self._global_sem:
+            page_started = time.monotonic()
+            # Limitlere takılıp sıra beklenen süre
+            self.metrics.add_phase("queue", page_started - started)
+            # Sıra beklerken domainin devresi açılmış veya tur süresi dolmuş olabilir
+            if self.breaker and self.breaker.is_open(health_key(url)):
+                return self._skip(url)
+            if self.deadline and self.deadline.expired():
+                return self._defer(url)
+            budget = self.deadline.url_budget() if self.deadline else None
+            try:
+                products, status = await asyncio.wait_for(self._visit(url, strategy, on_result), budget)
+            except asyncio.TimeoutError:
+                print(f"Süre Aşımı ({url}): {budget:.0f} sn bütçe doldu, URL kesildi.")
+                self.metrics.error(f"{budget:.0f} sn bütçe aşıldı")
+                products, status = [], "timeout"
+            finally:
+                self.domain_times[key] = self.domain_times.get(key, 0.0) + time.monotonic() - page_started
+
+            # Aynı domaine art arda yüklenmemek için küçük bir nezaket beklemesi
+            if self.jitter:
+                with self.metrics.phase("jitter"):
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
+
+        # Sayfalı liste: kalan sayfalar semaforlar bırakıldıktan sonra taranır
+        more_pages = getattr(products, "more_pages", None)
+        if status == "ok" and more_pages:
+            products = await self._crawl_pages(url, key, products, on_result)
+
+        self.metrics.count("products", len(products))
+        self._finished(url, time.monotonic() - started, status)
+        return products
+
+    async def _visit(self, url, strategy, on_result):
+        """Sayfayı açıp stratejiyi çalıştırır; (ürünler, durum) döndürür. Sayfa her durumda kapanır."""
+        products = []
+        status = "failed"
+        started = time.monotonic()
+        page = None
+        tracing = False
+        try:
+            if self.tracer:
+                await self.tracer.start(self.context, url)
+                tracing = True
+            page = await self._open(url)
+            with self.metrics.phase("strategy"):
+                products = await strategy(page, url)
+            if products is UNCHANGED:
+                self.tiers[url] = "browser (değişmedi)"
+                print("   -> Son turdan beri değişmedi, ürünler işlenmedi.")
+                products = []
+                status = "unchanged"
+            else:
+                print(f"   -> {len(products)} ürün çekildi.")
+                # Sayfa kapanmadan sonucu işle (screenshot vb. için)
+                if on_result:
+                    with self.metrics.phase("on_result"):
+                        await on_result(page, url, products)
+                status = "ok"
+        except Exception as e:
+            print(f"Genel Hata ({url}): {e}")
+            self.metrics.error(e)
+        finally:
+            if tracing:
+                try:
+                    await self.tracer.stop(self.context, url, time.monotonic() - started)
+                except Exception as e:
+                    print(f"Trace hatası ({url}): {e}")
+            if page:
+                await page.close()
+        return products, status
+
+    async def _crawl_pages(self, url, key, first, on_result):
+        """
+        PagedProducts.more_pages sayfalarını domain limiti kadarlık dalgalar halinde
+        eşzamanlı tarar. Hiç kart olmayan sayfa gelince (liste bitti) sonraki dalgalar
+        başlatılmaz; kartları hep önceki sayfalarda görülmüş bir sayfa durdurmaz (sıralama
+        sayfalar arasında kayabilir, arkadaki sayfalarda yeni ürün olabilir).
+        Her sayfanın yeni (önceki sayfalarda görülmemiş) ürünleri on_result'a ana URL ile verilir.
+        """
+        strategy = first.page_strategy
+        pending = list(first.more_pages)
+        seen = {prod["url"] for prod in first}
+        merged = list(first)
+        wave_size = max(1, self.domain_limits.get(key, self.domain_limits.get("generic", 1)))
+        fetched = 0
+
+        while pending:
+            if self.deadline and self.deadline.expired():
+                print(f"   Tur süresi doldu, kalan {len(pending)} sayfa atlandı.")
+                break
+            wave, pending = pending[:wave_size], pending[wave_size:]
+            results = await asyncio.gather(
+                *(self._scrape_extra_page(page_url, key, strategy, url, on_result, seen) for page_url in wave)
+            )
+            fetched += len(wave)
+            for products, cards in results:
+                merged.extend(products)
+            if any(cards == 0 for products, cards in results):
+                if pending:
+                    print(f"   Boş sayfa geldi, kalan {len(pending)} sayfa atlandı.")
+                break
+
+        print(f"   Sayfalama: {fetched + 1} sayfa, toplam {len(merged)} tekil ürün ({url})")
+        return merged
+
+    async def _scrape_extra_page(self, page_url, key, strategy, parent_url, on_result, seen):
+        """
+        Sayfalı listenin tek bir sayfası. (yeni ürünler, sayfadaki ürün sayısı) döndürür;
+        sayfa açılamadı / atlandıysa ürün sayısı None'dır (liste sonu sayılmaz).
+        """
+        async with self._domain_sem(key), self._global_sem:
+            if self.breaker and self.breaker.is_open(health_key(page_url)):
+                return [], None
+            if self.deadline and self.deadline.expired():
+                return [], None
+            page_started = time.monotonic()
+            page = None
+            fresh = []
+            cards = None
+            try:
+                page = await self._open(page_url)
+                with self.metrics.phase("strategy"):
+                    products = await strategy(page, page_url)
+                cards = len(products)
+                fresh = [prod for prod in products if prod["url"] not in seen]
+                seen.update(prod["url"] for prod in fresh)
+                print(f"   -> {len(products)} ürün ({len(fresh)} yeni)")
+                if on_result and fresh:
+                    with self.metrics.phase("on_result"):
+                        await on_result(page, parent_url, fresh)
+            except Exception as e:
+                print(f"Sayfa Hatası ({page_url}): {e}")
+                self.metrics.error(f"{page_url}: {e}")
+            finally:
+                if page:
+                    await page.close()
+                self.domain_times[key] = self.domain_times.get(key, 0.0) + time.monotonic() - page_started
+            if self.jitter:
+                await asyncio.sleep(random.uniform(0.5, 1.5))
+        return fresh, cards
+
+    async def run(self, urls, on_result=None, report=True):
+        """
+        Tüm URL'leri eşzamanlı tarar. {url: ürünler} döndürür.
+        Tur birkaç aşamada çalışıyorsa report=False verilip sonda report() çağrılır.
+        """
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.scrape(url, on_result) for url in urls))
+        if report:
+            self.report(time.monotonic() - started)
+        return dict(zip(urls, results))
+
+    def report(self, elapsed):
+        print(f"\nTarama süresi: {elapsed:.1f} sn")
+        for key, seconds in sorted(self.domain_times.items()):
+            print(f"   {key}: toplam {seconds:.1f} sn sayfa süresi")
+        print(self.resource_policy.report())
+        print(self.cache_stats.report())
+        if self.freshness:
+            print(self.freshness.report())
+        if self.breaker:
+            print(self.breaker.report())
+        counts = {}
+        for tier in self.tiers.values():
+            counts[tier] = counts.get(tier, 0) + 1
+        print("Katmanlar: " + ", ".join(f"{name}: {count}" for name, count in sorted(counts.items())))
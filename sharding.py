@@ -0,0 +1,175 @@
+"""
+Parçalı (Shard) Tarama
+urls.txt N parçaya bölünür ve her parça ayrı bir süreçte veya ayrı bir workflow işinde
+taranır (python tracker.py --shard 2/4). Parça seçimi deterministiktir; aynı urls.txt her
+yerde aynı bölünür: domainler ve her domainin URL'leri md5 özetine göre sıralanır ve sırayla
+(round-robin) parçalara dağıtılır. Böylece parça boyları en fazla 1 farklıdır ve her sitenin
+URL'leri parçalara eşit yayılır (urls.txt'de az domain varken domain bazlı bölme bazı
+parçaları boş bırakıyordu). Her işçinin kendi domain limiti olduğu için bir siteye aynı anda
+en fazla parça sayısı x DOMAIN_CONCURRENCY istek gider; liste/detay kapsaması parça içindedir.
+
+İşçiler depoya yazmaz: gözlemler, zamanlama / tazelik / domain sağlığı kayıtları ve
+indirim bildirimleri SHARD_DIR altındaki shard-<i>-of-<n>.json dosyasında toplanır
+(bildirim screenshot'ları yanına .jpg olarak). Birleştirme adımı (tracker.py --merge-shards)
+dosyaları okur ve depoya yazar:
+  - Aynı URL'yi birden fazla parça gördüyse en son biten parçanın kaydı kalır
+    (eşitlikte parça numarası büyük olan); sıralama her çalıştırmada aynıdır.
+  - Bildirimler ürün URL'sine göre tekilleştirilir; sadece kaydı kalan parçanın bildirimi
+    gönderilir, böylece bildirilen fiyat ile depodaki fiyat hep aynıdır.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+
+from price_store import write_atomic
+from scrape_engine import health_key
+
+SHARD_DIR = os.environ.get("SHARD_DIR", "shards")
+
+
+def parse_shard(text):
+    """'2/4' -> (2, 4). Parça numarası 1'den başlar."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Geçersiz shard: {text!r} (ör. 2/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Geçersiz shard: {text!r} (1 <= i <= N olmalı)")
+    return index, count
+
+
+def _digest(text):
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def assign(urls, count):
+    """{url: parça (1..count)}. Domain domain, her domainin URL'leri sırayla dağıtılır."""
+    domains = {}
+    for url in dict.fromkeys(urls):
+        domains.setdefault(health_key(url), []).append(url)
+    shards = {}
+    position = 0
+    for domain in sorted(domains, key=_digest):
+        for url in sorted(domains[domain], key=_digest):
+            shards[url] = position % count + 1
+            position += 1
+    return shards
+
+
+def select(urls, index, count):
+    shards = assign(urls, count)
+    return [url for url in urls if shards[url] == index]
+
+
+def result_path(index, count, directory=SHARD_DIR):
+    return os.path.join(directory, f"shard-{index}-of-{count}.json")
+
+
+class ShardOutbox:
+    """
+    Shard işçisinin turu: tracker depoya ve Telegram'a yazmak yerine buraya yazar.
+    save_observed Checkpoint'in save fonksiyonu olarak kullanılır; dosya her kayıtta
+    baştan (atomik) yazılır, tur yarıda kesilse de o ana kadarki sonuç birleştirilebilir.
+    """
+
+    def __init__(self, index, count, directory=SHARD_DIR):
+        self.index = index
+        self.count = count
+        self.directory = directory
+        self.path = result_path(index, count, directory)
+        self.observed = {}
+        self.notifications = {}  # ürün url -> {"url", "price", "text", "photo"}
+        self.state = {"schedule": {}, "freshness": {}, "domain_health": {}}
+        self.urls = 0
+        self.domains = set()  # Parçanın domainleri (domain sağlığından sadece bunlar yazılır)
+        self._lock = threading.Lock()  # Ara kayıt arka plan thread'inde çalışır
+
+    def planned(self, urls):
+        self.urls = len(urls)
+        self.domains = {health_key(url) for url in urls}
+
+    def save_observed(self, batch):
+        with self._lock:
+            self.observed.update(batch)
+        self.write()
+
+    def notify(self, url, price, text, photo=None):
+        """İndirim bildirimini saklar; photo bytes (screenshot) ise .jpg olarak yanına yazılır."""
+        if isinstance(photo, bytes):
+            name = f"shard-{self.index}-of-{self.count}-{hashlib.md5(url.encode('utf-8')).hexdigest()[:12]}.jpg"
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "wb") as f:
+                f.write(photo)
+            photo = name
+        with self._lock:
+            self.notifications[url] = {"url": url, "price": price, "text": text, "photo": photo}
+
+    def write(self):
+        with self._lock:
+            data = {
+                "shard": self.index,
+                "count": self.count,
+                "finished_at": time.time(),
+                "urls": self.urls,
+                "observed": self.observed,
+                "notifications": list(self.notifications.values()),
+            }
+            data.update(self.state)
+            os.makedirs(self.directory, exist_ok=True)
+            write_atomic(self.path, json.dumps(data, ensure_ascii=False, sort_keys=True))
+
+
+def clear_results(directory=SHARD_DIR):
+    """Önceki turun shard dosyalarını siler (birleştirmeye karışmasınlar)."""
+    for path in glob.glob(os.path.join(directory, "shard-*-of-*.*")):
+        os.remove(path)
+
+
+def load_results(directory=SHARD_DIR):
+    """Dizindeki shard dosyaları; birleştirme sırasına göre (finished_at, shard)."""
+    results = []
+    for path in sorted(glob.glob(os.path.join(directory, "shard-*-of-*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                results.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Shard dosyası okunamadı ({path}): {e}")
+    counts = {result.get("count") for result in results}
+    if len(counts) > 1:
+        print(f"Uyarı: farklı parça sayılı shard dosyaları var ({sorted(counts)}).")
+    results.sort(key=lambda result: (result.get("finished_at") or 0, result.get("shard") or 0))
+    return results
+
+
+def merge_results(results):
+    """
+    Sıralı shard sonuçlarını birleştirir (sonraki öncekini ezer).
+    {"observed": [(ts, {url: kayıt}), ...], "schedule", "freshness", "domain_health",
+     "notifications", "urls"} döndürür.
+    """
+    winner = {}  # url -> sonucun sırası
+    merged = {"schedule": {}, "freshness": {}, "domain_health": {}}
+    for order, result in enumerate(results):
+        for url in result.get("observed") or {}:
+            winner[url] = order
+        for name, records in merged.items():
+            records.update(result.get(name) or {})
+
+    observed = []
+    for order, result in enumerate(results):
+        batch = {url: record for url, record in (result.get("observed") or {}).items() if winner[url] == order}
+        if batch:
+            observed.append((result.get("finished_at") or time.time(), batch))
+
+    notifications = []
+    for order, result in enumerate(results):
+        for note in result.get("notifications") or []:
+            if winner.get(note["url"]) == order:
+                notifications.append(note)
+    merged.update(observed=observed, notifications=notifications,
+                  urls=sum(result.get("urls") or 0 for result in results))
+    return merged
@@ -0,0 +1,390 @@
+"""
+Mağaza API Adaptörleri
+GSStore (Akinon) ve Saat&Saat (Magento 2) liste sayfalarını DOM/scroll yerine
+platformların kendi JSON uçlarından sayfa sayfa çeker ve
+{name, url, price, image} kayıtlarına çevirir.
+Başarısız olursa None döner; process_gsstore / process_saatvesaat yedek olarak kalır.
+Adaptör, aynı URL için tarayıcının kapsadığı ürün aralığını döndürür: Saat&Saat'te
+sayfalama açıksa (all_pages) URL'deki pi'den bağımsız tüm sayfalar, kapalıysa sadece
+URL'nin sayfası okunur.
+"""
+
+import os
+import re
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from http_fetch import get_session
+
+# Varsayılan açık; STOREFRONT_API=0 ile kapatılabilir
+STOREFRONT_API = os.environ.get("STOREFRONT_API", "1") != "0"
+API_TIMEOUT = 20
+API_MAX_PAGES = 50
+
+# Saat&Saat tekil ürün URL'leri "-p-<sku>" ile biter
+SAATVESAAT_PRODUCT_RE = re.compile(r"-p-[\w-]+/?$")
+
+# Katmanlı navigasyon filtresi: filters[brand.f]=seiko+5 -> ("brand", "seiko 5")
+MAGENTO_FILTER_RE = re.compile(r"^filters\[(\w+)(?:\.\w+)?\]$")
+
+
+def _origin(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _absolute(base, href):
+    if not href:
+        return None
+    return href if href.startswith("http") else base + ("" if href.startswith("/") else "/") + href
+
+
+def _to_float(value):
+    if value is None:
+        return None
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        return None
+
+
+class AkinonClient:
+    """
+    Akinon liste sayfaları, istek JSON kabul ettiğinde ürünleri JSON olarak döndürür:
+    {"products": [...], "pagination": {"current_page": 1, "num_pages": N, ...}}
+    """
+
+    HEADERS = {
+        "Accept": "application/json",
+        "X-Requested-With": "XMLHttpRequest",
+    }
+
+    def __init__(self, base_url=None, session=None):
+        self.base_url = base_url
+        self.session = session or get_session()
+
+    def _page_url(self, url, page):
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        query["page"] = [str(page)]
+        base = self.base_url or _origin(url)
+        return base + urlunparse(("", "", parsed.path or "/", "", urlencode(query, doseq=True), ""))
+
+    def map_product(self, item, base):
+        price = _to_float(item.get("price"))
+        images = item.get("productimage_set") or []
+        image = images[0].get("image", "") if images and isinstance(images[0], dict) else ""
+        url = _absolute(base, item.get("absolute_url"))
+        if not url or not price:
+            return None
+        return {
+            "name": (item.get("name") or "İsimsiz Ürün").strip(),
+            "url": url,
+            "price": price,
+            "image": image or ""
+        }
+
+    def fetch_listing(self, url, all_pages=True, max_pages=None):
+        """
+        Tüm sayfaları gezer. JSON dönmezse (liste değilse) None.
+        GSStore listesi tarayıcıda da sonsuz scroll ile sonuna kadar okunduğu için
+        all_pages / max_pages (Saat&Saat sayfalayıcısı için) yok sayılır.
+        """
+        site = _origin(url)
+        products = []
+        page = 1
+        num_pages = 1
+        while page <= min(num_pages, API_MAX_PAGES):
+            response = self.session.get(self._page_url(url, page), headers=self.HEADERS, timeout=API_TIMEOUT)
+            if response.status_code != 200:
+                return None
+            try:
+                data = response.json()
+            except ValueError:
+                return None
+            if not isinstance(data, dict) or "products" not in data:
+                return None
+
+            for item in data["products"]:
+                product = self.map_product(item, site)
+                if product:
+                    products.append(product)
+
+            pagination = data.get("pagination") or {}
+            num_pages = int(pagination.get("num_pages") or pagination.get("page_count") or 1)
+            if not data["products"]:
+                break
+            page += 1
+        return products
+
+
+class MagentoClient:
+    """Magento 2 GraphQL (/graphql) üzerinden kategori listesi."""
+
+    RESOLVE_QUERY = """
+    query ($url: String!) { urlResolver(url: $url) { id type } }
+    """
+
+    PRODUCTS_QUERY = """
+    query ($filter: ProductAttributeFilterInput!, $page: Int!, $size: Int!, $sort: ProductAttributeSortInput) {
+      products(filter: $filter, currentPage: $page, pageSize: $size, sort: $sort) {
+        page_info { current_page total_pages }
+        items {
+          name
+          url_key
+          url_suffix
+          small_image { url }
+          price_range { minimum_price { final_price { value } } }
+        }
+      }
+    }
+    """
+
+    # Filtre etiketlerinin ("seiko 5") seçenek değerlerine çevrilmesi için
+    AGGREGATIONS_QUERY = """
+    query ($filter: ProductAttributeFilterInput!) {
+      products(filter: $filter, pageSize: 1) {
+        aggregations { attribute_code options { label value } }
+      }
+    }
+    """
+
+    # Liste sayfasının varsayılan sayfa boyu (pi=N'nin hangi ürün aralığı olduğu buna bağlı)
+    STORE_CONFIG_QUERY = """
+    query { storeConfig { grid_per_page } }
+    """
+
+    # Liste URL'sinde bunlar ve filters[...] dışında parametre varsa API ile
+    # birebir aynı sonuç üretilemez -> None döner, DOM scraper devreye girer.
+    SUPPORTED_PARAMS = {"order", "direction", "pi", "product_list_limit"}
+
+    def __init__(self, base_url=None, session=None):
+        self.base_url = base_url
+        self.session = session or get_session()
+
+    def _graphql(self, site, query, variables):
+        response = self.session.post(
+            (self.base_url or site) + "/graphql",
+            json={"query": query, "variables": variables},
+            headers={"Content-Type": "application/json", "Store": "default"},
+            timeout=API_TIMEOUT
+        )
+        if response.status_code != 200:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        if data.get("errors"):
+            return None
+        return data.get("data")
+
+    def map_product(self, item, site):
+        try:
+            price = item["price_range"]["minimum_price"]["final_price"]["value"]
+        except (KeyError, TypeError):
+            price = None
+        if not price or not item.get("url_key"):
+            return None
+        return {
+            "name": (item.get("name") or "İsimsiz Saat").strip(),
+            "url": f"{site}/{item['url_key']}{item.get('url_suffix') or ''}",
+            "price": float(price),
+            "image": (item.get("small_image") or {}).get("url") or ""
+        }
+
+    def _resolve_filters(self, site, category_filter, filters):
+        """
+        {kod: [etiket, ...]} -> GraphQL filtresi. Seçenekler kategorinin aggregations'ından
+        etikete (büyük/küçük harf duyarsız) veya değerin kendisine göre bulunur.
+        Bulunamayan filtre varsa None (DOM scraper aynı sonucu verir, API vermez).
+        """
+        data = self._graphql(site, self.AGGREGATIONS_QUERY, {"filter": category_filter})
+        aggregations = ((data or {}).get("products") or {}).get("aggregations") or []
+        options = {
+            agg.get("attribute_code"): agg.get("options") or []
+            for agg in aggregations
+        }
+        resolved = {}
+        for code, labels in filters.items():
+            values = []
+            for label in labels:
+                wanted = " ".join(label.split()).casefold()
+                match = next(
+                    (opt["value"] for opt in options.get(code, [])
+                     if " ".join(str(opt.get("label") or "").split()).casefold() == wanted
+                     or str(opt.get("value")) == label),
+                    None
+                )
+                if match is None:
+                    print(f"   [API] Filtre seçeneği bulunamadı: {code}={label}")
+                    return None
+                values.append(str(match))
+            resolved[code] = {"eq": values[0]} if len(values) == 1 else {"in": values}
+        return resolved
+
+    def _page_size(self, site, query):
+        """DOM'daki sayfa boyu: URL'deki product_list_limit veya mağazanın grid_per_page'i."""
+        if "product_list_limit" in query:
+            return int(query["product_list_limit"][0])
+        data = self._graphql(site, self.STORE_CONFIG_QUERY, {})
+        size = ((data or {}).get("storeConfig") or {}).get("grid_per_page")
+        return int(size) if size else None
+
+    def fetch_listing(self, url, all_pages=True, max_pages=API_MAX_PAGES):
+        """
+        Kategori listesi. all_pages ise tarayıcının sayfalayıcıdan gezdiği gibi 1..max_pages
+        sayfalarının hepsi (pi yok sayılır), değilse sadece URL'nin sayfası (pi veya 1) okunur.
+        """
+        parsed = urlparse(url)
+        if SAATVESAAT_PRODUCT_RE.search(parsed.path):
+            return None
+        query = parse_qs(parsed.query)
+        filters = {}
+        for key, values in query.items():
+            match = MAGENTO_FILTER_RE.match(key)
+            if match:
+                filters[match.group(1)] = [v for value in values for v in value.split(",") if v]
+            elif key not in self.SUPPORTED_PARAMS:
+                return None
+
+        site = _origin(url)
+        resolved = self._graphql(site, self.RESOLVE_QUERY, {"url": parsed.path.lstrip("/")})
+        target = (resolved or {}).get("urlResolver") or {}
+        if target.get("type") != "CATEGORY":
+            return None
+
+        product_filter = {"category_id": {"eq": str(target["id"])}}
+        if filters:
+            extra = self._resolve_filters(site, product_filter, filters)
+            if extra is None:
+                return None
+            product_filter.update(extra)
+
+        sort = None
+        if "order" in query:
+            direction = (query.get("direction") or ["asc"])[0].upper()
+            sort = {query["order"][0]: "DESC" if direction == "DESC" else "ASC"}
+
+        # Sayfa boyu DOM'daki ile aynı olmalı, yoksa pi=N farklı bir ürün aralığı olur
+        size = self._page_size(site, query)
+        if not size:
+            print("   [API] Sayfa boyu bulunamadı (grid_per_page).")
+            return None
+
+        if all_pages:
+            first, last = 1, max_pages
+        else:
+            first = last = int((query.get("pi") or ["1"])[0])
+
+        products = []
+        page = first
+        while page <= last:
+            data = self._graphql(site, self.PRODUCTS_QUERY, {
+                "filter": product_filter, "page": page, "size": size, "sort": sort
+            })
+            listing = (data or {}).get("products")
+            if listing is None:
+                return None if not products else products
+            for item in listing.get("items") or []:
+                product = self.map_product(item, site)
+                if product:
+                    products.append(product)
+            total_pages = (listing.get("page_info") or {}).get("total_pages") or 1
+            if not listing.get("items"):
+                break
+            last = min(last, total_pages)
+            page += 1
+        return products
+
+
+API_CLIENTS = {
+    "gsstore.org": AkinonClient,
+    "saatvesaat.com.tr": MagentoClient,
+}
+
+
+def fetch_listing_api(url, site_key, base_url=None, all_pages=True, max_pages=API_MAX_PAGES):
+    """
+    site_key için tanımlı adaptörle listeyi çeker. Başarısızsa None.
+    Ağ hataları (requests.RequestException) yukarı iletilir; motor domain sağlığına yazar.
+    """
+    client_cls = API_CLIENTS.get(site_key)
+    if not client_cls:
+        return None
+    try:
+        products = client_cls(base_url=base_url).fetch_listing(url, all_pages, max_pages)
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"   [API] Beklenmeyen cevap: {e}")
+        return None
+    return products or None
+
+
+def replay_test():
+    """
+    fixtures/api altındaki elle hazırlanmış (sentetik) cevapları yerel stub sunucudan
+    oynatarak adaptörleri test eder. Cevaplar platformların şemasına göre yazılmıştır,
+    canlı siteden kaydedilmemiştir.
+    """
+    from stub_server import StubServer
+
+    print("=" * 60)
+    print("MAĞAZA API ADAPTÖR TESTİ (sentetik cevaplar)")
+    print("=" * 60)
+
+    with StubServer(os.path.join("fixtures", "api")) as server:
+        gs = fetch_listing_api("https://www.gsstore.org/outlet-erkek/", "gsstore.org", base_url=server.url)
+        assert gs and len(gs) == 4, gs
+        assert gs[0]["url"] == "https://www.gsstore.org/galatasaray-v-osimhen-artwork-t-shirt-e252999/", gs[0]
+        assert gs[0]["price"] == 749.99
+        print(f"GSStore: {len(gs)} ürün (2 sayfa)")
+
+        # Sayfalama açık: tarayıcı gibi pi'den bağımsız tüm sayfalar
+        sv = fetch_listing_api(
+            "https://www.saatvesaat.com.tr/erkek-klasik-saat?order=position&direction=desc&pi=2",
+            "saatvesaat.com.tr", base_url=server.url
+        )
+        assert sv and len(sv) == 5, sv
+        assert sv[2]["url"] == "https://www.saatvesaat.com.tr/seiko-5-erkek-kol-saati-p-s5-srpj85k", sv[2]
+        print(f"Saat&Saat: {len(sv)} ürün (pi=2, tüm sayfalar)")
+
+        # Sayfalama kapalı: sadece URL'nin sayfası
+        sv = fetch_listing_api(
+            "https://www.saatvesaat.com.tr/erkek-klasik-saat?order=position&direction=desc&pi=2",
+            "saatvesaat.com.tr", base_url=server.url, all_pages=False
+        )
+        assert sv and len(sv) == 2, sv
+        assert sv[0]["url"] == "https://www.saatvesaat.com.tr/seiko-5-erkek-kol-saati-p-s5-srpj85k", sv[0]
+        print(f"Saat&Saat: {len(sv)} ürün (pi=2, tek sayfa)")
+
+        # urls.txt'deki filtreli liste: marka etiketi seçenek değerine çevrilir
+        sv = fetch_listing_api(
+            "https://www.saatvesaat.com.tr/erkek-klasik-saat?direction=desc&filters[brand.f]=seiko+5"
+            "&order=position&pi=2",
+            "saatvesaat.com.tr", base_url=server.url, all_pages=False
+        )
+        assert sv and len(sv) == 2, sv
+        graphql = [body for method, path, body in server.requests if path == "/graphql"]
+        assert any('"brand": {"eq": "5471"}' in body and '"size": 24' in body for body in graphql), graphql
+        print(f"Saat&Saat: {len(sv)} ürün (filters[brand.f]=seiko 5, pi=2, sayfa boyu 24)")
+
+        # Bilinmeyen filtre seçeneği, desteklenmeyen parametre ve tekil ürün -> DOM'a bırakılır
+        assert fetch_listing_api(
+            "https://www.saatvesaat.com.tr/erkek-klasik-saat?filters[brand.f]=rolex&pi=2",
+            "saatvesaat.com.tr", base_url=server.url
+        ) is None
+        assert fetch_listing_api(
+            "https://www.saatvesaat.com.tr/erkek-klasik-saat?q=seiko",
+            "saatvesaat.com.tr", base_url=server.url
+        ) is None
+        assert fetch_listing_api(
+            "https://www.saatvesaat.com.tr/seiko-5-erkek-kol-saati-p-s5-srpj85k",
+            "saatvesaat.com.tr", base_url=server.url
+        ) is None
+        # JSON dönmeyen sayfa -> None
+        assert fetch_listing_api("https://www.gsstore.org/bilinmeyen/", "gsstore.org", base_url=server.url) is None
+
+    print("Test tamamlandi!")
+
+
+if __name__ == "__main__":
+    replay_test()
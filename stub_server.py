@@ -0,0 +1,115 @@
+"""
+Yerel Stub Sunucu
+Kayıtlı site cevaplarını (HTML/JSON) yerel bir HTTP sunucusundan oynatır.
+Canlı sitelere gitmeden adaptör ve scraper'ları denemek için kullanılır.
+
+Her fixture klasöründe bir routes.json bulunur:
+[
+    {"method": "GET", "path": "/outlet-erkek/", "query": {"page": "1"},
+     "file": "akinon_outlet_p1.json", "content_type": "application/json"},
+    {"method": "POST", "path": "/graphql", "body_contains": "urlResolver",
+     "file": "magento_resolve.json"}
+]
+İlk eşleşen kural kullanılır; eşleşme yoksa 404 döner.
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def load_routes(fixture_dir):
+    with open(os.path.join(fixture_dir, "routes.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def match_route(routes, method, path, query, body):
+    for route in routes:
+        if route.get("method", "GET") != method:
+            continue
+        if route["path"] != path:
+            continue
+        expected = route.get("query") or {}
+        if any(query.get(k, [None])[0] != v for k, v in expected.items()):
+            continue
+        contains = route.get("body_contains")
+        if contains and contains not in body:
+            continue
+        return route
+    return None
+
+
+class StubServer:
+    """
+    Kullanım:
+        with StubServer("fixtures/api") as server:
+            requests.get(server.url + "/outlet-erkek/")
+    """
+
+    def __init__(self, fixture_dir, port=0):
+        self.fixture_dir = fixture_dir
+        self.routes = load_routes(fixture_dir)
+        self.requests = []  # (method, path, body) kaydı
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self, method):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8", "replace") if length else ""
+                stub.requests.append((method, self.path, body))
+
+                route = match_route(stub.routes, method, parsed.path, parse_qs(parsed.query), body)
+                if not route:
+                    self.send_response(404)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.end_headers()
+                    self.wfile.write(b"<html><body>404</body></html>")
+                    return
+
+                with open(os.path.join(stub.fixture_dir, route["file"]), "rb") as f:
+                    payload = f.read()
+                self.send_response(route.get("status", 200))
+                self.send_header("Content-Type", route.get("content_type", "application/json"))
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (route.get("headers") or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -1,28 +1,6 @@
 from playwright.sync_api import sync_playwright
 import time
-import re
-
-def parse_price(text):
-    if not text: return None
-    clean = text.replace("TL", "").replace("tl", "").replace("\n", "").strip()
-    clean = clean.replace(".", "").replace(",", ".") 
-    clean = "".join([c for c in clean if c.isdigit() or c == '.'])
-    try:
-        return float(clean)
-    except:
-        return None
-
-def find_price_in_text(text):
-    matches = re.findall(r'([\d\.,]+)\s*(?:TL|tl)', text)
-    if not matches:
-        matches = re.findall(r'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?)', text)
-    
-    if matches:
-        for m in matches:
-            val = parse_price(m)
-            if val and 10 < val < 100000:
-                return val
-    return None
+from price_parser import find_price_in_text
 
 def process_saatvesaat(page, url):
     products = []
@@ -1,11 +1,31 @@
+import asyncio
 import json
 import os
-import time
-import random
-import requests
 import re
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+import signal
+import subprocess
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+from scrape_engine import (ScrapeEngine, PagedProducts, USER_AGENT, GLOBAL_CONCURRENCY, DOMAIN_CONCURRENCY, domain_key,
+                           health_key)
+from resource_policy import release_page_async
+from http_fetch import HTTP_FIRST, fetch_product_http
+from storefront_api import API_CLIENTS, STOREFRONT_API, fetch_listing_api
+from price_store import PriceStore
+from notifier import TelegramNotifier
+from card_extract import bulk_extract_cards, GSSTORE_CARD_SPEC, SAATVESAAT_CARD_SPEC
+from price_parser import find_price_in_text, find_prices
+from freshness import Freshness, UNCHANGED, grid_fingerprint, products_fingerprint
+from scheduler import Scheduler
+from url_registry import UrlRegistry
+from url_canon import canonical_url, canonical_map, is_detail_url, merge_prices
+from coverage_planner import CoveragePlanner
+from run_metrics import RunMetrics
+from circuit_breaker import CircuitBreaker
+from run_control import RunDeadline, Checkpoint
+from sharding import (SHARD_DIR, ShardOutbox, parse_shard, select as select_shard, clear_results,
+                      load_results, merge_results)
 # from fake_useragent import UserAgent (Gerek kalmadı, elle veriyoruz)
 
 # --- AYARLAR ---
@@ -14,6 +34,40 @@ PRICES_FILE = "prices.json"
 CONFIG_FILE = "config.py"
 LAST_UPDATE_FILE = ".last_update_id"
 
+# Liste kartlarını okuma modu:
+#   "bulk"    -> Sayfa başına tek page.evaluate (varsayılan, hızlı)
+#   "locator" -> Kart başına ayrı Playwright çağrıları (eski yöntem)
+CARD_EXTRACTION = os.environ.get("CARD_EXTRACTION", "bulk")
+
+# İndirim bildirimine eklenecek kanıt:
+#   "card"  -> Sadece ürün kartının JPEG screenshot'ı (bellekte, dosyasız) - varsayılan
+#   "image" -> Ürün resim URL'si (Telegram kendisi indirir, yükleme yok)
+#   "page"  -> Tüm görünen sayfanın JPEG screenshot'ı (eski davranış)
+#   "none"  -> Sadece metin
+EVIDENCE_MODE = os.environ.get("EVIDENCE_MODE", "card")
+EVIDENCE_JPEG_QUALITY = 70
+
+# Saat&Saat liste sayfaları pi=N ile sayfalıdır. Açıkken ilk sayfanın sayfalayıcısından
+# toplam sayfa sayısı okunur ve kalan sayfalar da (domain limiti kadar eşzamanlı) taranır.
+PAGINATION = os.environ.get("PAGINATION", "1") != "0"
+PAGINATION_MAX_PAGES = int(os.environ.get("PAGINATION_MAX_PAGES", "20"))
+
+# Scroll ayarları (site bazlı)
+#   budget:        Toplam scroll süresi üst sınırı (sn)
+#   max_rounds:    En fazla scroll turu
+#   round_timeout: Bir turda yeni kart gelmesi için beklenecek süre (sn)
+#   plateau:       Kart sayısı kaç tur artmazsa durulsun
+#   cards:         Ürün kartı seçicisi (sayım için)
+#   sentinel:      Görününce listenin bittiği anlaşılan element (opsiyonel)
+SCROLL_SETTINGS = {
+    "gsstore.org": {"budget": 60, "max_rounds": 40, "round_timeout": 4, "plateau": 2,
+                    "cards": ".product-item, .product-item-info", "sentinel": None},
+    "saatvesaat.com.tr": {"budget": 30, "max_rounds": 15, "round_timeout": 3, "plateau": 2,
+                          "cards": ".product-item, .product-item-info", "sentinel": None},
+    "generic": {"budget": 15, "max_rounds": 5, "round_timeout": 2, "plateau": 1,
+                "cards": None, "sentinel": None},
+}
+
 # Telegram Fonksiyonları
 try:
     import config
@@ -23,23 +77,22 @@ except ImportError:
         TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "")
     config = Config()
 
-def send_telegram(message):
-    if not config.TELEGRAM_TOKEN or not config.TELEGRAM_CHAT_ID:
-        print("Telegram ayarları eksik, mesaj atılamadı.")
-        return
+# Bildirimler kuyruğa alınır ve arka planda gruplanarak gönderilir (notifier.py)
+notifier = TelegramNotifier(config.TELEGRAM_TOKEN, config.TELEGRAM_CHAT_ID)
 
-    url = f"https://api.telegram.org/bot{config.TELEGRAM_TOKEN}/sendMessage"
-    payload = {"chat_id": config.TELEGRAM_CHAT_ID, "text": message}
-    try:
-        requests.post(url, data=payload, timeout=10)
-    except Exception as e:
-        print(f"Telegram hatası: {e}")
+# urls.txt: bot ile ortak, kilitli ve atomik (url_registry.py)
+registry = UrlRegistry(URLS_FILE, normalize=canonical_url)
+
+def send_telegram(message):
+    """Mesajı kuyruğa ekler, beklemeden döner."""
+    metrics.count("notifications")
+    notifier.notify(message)
 
 def get_telegram_updates():
     if not config.TELEGRAM_TOKEN: return []
     url = f"https://api.telegram.org/bot{config.TELEGRAM_TOKEN}/getUpdates"
     try:
-        response = requests.get(url, timeout=10).json()
+        response = notifier.session.get(url, timeout=10).json()
         if response.get("ok"):
             return response["result"]
     except Exception as e:
@@ -60,12 +113,6 @@ def check_new_urls():
         except:
             pass
     
-    # Mevcut URL'leri oku
-    existing_urls = []
-    if os.path.exists(URLS_FILE):
-        with open(URLS_FILE, "r") as f:
-            existing_urls = [line.strip() for line in f if line.strip()]
-
     max_update_id = last_update_id
     
     for update in updates:
@@ -84,8 +131,8 @@ def check_new_urls():
             if chat_id != config.TELEGRAM_CHAT_ID: continue
             
             if text.startswith("/ekle "):
-                url_to_add = text.split("/ekle ", 1)[1].strip()
-                if url_to_add.startswith("http") and url_to_add not in existing_urls and url_to_add not in new_urls:
+                url_to_add = canonical_url(text.split("/ekle ", 1)[1])
+                if url_to_add.startswith("http") and registry.add(url_to_add):
                     new_urls.append(url_to_add)
                     send_telegram(f"✅ Yeni link listeye eklendi: {url_to_add}")
     
@@ -95,26 +142,36 @@ def check_new_urls():
             f.write(str(max_update_id))
     
     if new_urls:
-        with open(URLS_FILE, "a") as f:
-            for url in new_urls:
-                f.write(f"\n{url}")
         print(f"{len(new_urls)} yeni link eklendi.")
 
-def send_telegram_photo(message, photo_path):
-    if not config.TELEGRAM_TOKEN or not config.TELEGRAM_CHAT_ID:
-        return
+def notify_discount(url, price, message, photo=None):
+    """İndirim bildirimi. Shard işçisinde gönderilmez, birleştirmede tekilleştirilip gönderilir."""
+    if shard_outbox:
+        shard_outbox.notify(url, price, message, photo)
+    elif photo:
+        send_telegram_photo(message, photo)
+    else:
+        send_telegram(message)
 
-    url = f"https://api.telegram.org/bot{config.TELEGRAM_TOKEN}/sendPhoto"
-    payload = {"chat_id": config.TELEGRAM_CHAT_ID, "caption": message}
+def send_telegram_photo(message, photo):
+    """
+    Fotoğraflı mesajı kuyruğa ekler.
+    photo: bytes, http(s) resim URL'si veya dosya yolu (hemen okunur, dosya silinebilir).
+    """
+    if not notifier.enabled:
+        return
     try:
-        with open(photo_path, 'rb') as f:
-            files = {'photo': f}
-            requests.post(url, data=payload, files=files, timeout=20)
+        if isinstance(photo, str) and not photo.startswith("http"):
+            with open(photo, 'rb') as f:
+                photo = f.read()
+        metrics.count("notifications")
+        notifier.notify(message, photo=photo)
     except Exception as e:
         print(f"Telegram Foto hatası: {e}")
 
 # --- KAYIT SİSTEMİ ---
-def load_prices():
+# Asıl kayıt SQLite deposudur (price_store.py); prices.json dashboard için export edilir.
+def load_prices_json():
     if os.path.exists(PRICES_FILE):
         try:
             with open(PRICES_FILE, "r", encoding="utf-8") as f:
@@ -123,143 +180,395 @@ def load_prices():
             return {}
     return {}
 
-def save_prices(data):
-    with open(PRICES_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+def prepare_store(store):
+    """
+    Depo boşsa mevcut prices.json'ı bir kere içeri alır, kanonik olmayan (varyant, takip
+    parametreli...) kayıtları birleştirir (url_canon.py). Güncel fiyatları döndürür.
+    """
+    if store.is_empty() and os.path.exists(PRICES_FILE):
+        print(f"Fiyat deposu boş, {PRICES_FILE} içeri alınıyor...")
+        store.import_json(PRICES_FILE)
+    prices = store.latest()
+    mapping = canonical_map(prices, product=True)
+    if mapping:
+        merged = store.merge_urls(mapping)
+        store.rename_targets(canonical_map(store.target_urls()))
+        print(f"{merged} kopya ürün kaydı kanonik URL'lerde birleştirildi.")
+        prices = store.latest()
+    return prices
+
+def read_store():
+    """Okuma için depo. Shard işçisi depoyu salt okunur açar; yazma birleştirme işindedir."""
+    return PriceStore(readonly=shard_outbox is not None)
+
+def load_prices():
+    """
+    Güncel fiyatları depodan okur (prepare_store). Shard işçisi depoya hiç yazmaz:
+    içeri alma ve kopya birleştirme birleştirme işine kalır, kopyalar burada sadece
+    bellekte birleştirilir.
+    """
+    try:
+        if shard_outbox:
+            with read_store() as store:
+                return merge_prices(store.latest() or load_prices_json())
+        with PriceStore() as store:
+            return prepare_store(store)
+    except Exception as e:
+        print(f"Fiyat deposu okunamadı, {PRICES_FILE} kullanılıyor: {e}")
+        return merge_prices(load_prices_json())
+
+# URL başına son turun parmak izi / ETag'i (freshness.py); değişmeyen sayfalar atlanır
+freshness = Freshness()
+
+def load_freshness():
+    try:
+        with read_store() as store:
+            return store.load_freshness()
+    except Exception as e:
+        print(f"Tazelik bilgisi okunamadı: {e}")
+        return {}
+
+def save_freshness():
+    if shard_outbox:
+        shard_outbox.state["freshness"] = dict(freshness.current)
+        return
+    try:
+        with PriceStore() as store:
+            store.save_freshness(dict(freshness.current))
+    except Exception as e:
+        print(f"Tazelik bilgisi kaydedilemedi: {e}")
+
+# URL başına bir sonraki kontrol zamanı (scheduler.py)
+scheduler = Scheduler()
+
+# Domain başına devre kesici ve uyarlanır zaman aşımı (circuit_breaker.py)
+breaker = CircuitBreaker()
+
+def load_domain_health():
+    try:
+        with read_store() as store:
+            return store.load_domain_health()
+    except Exception as e:
+        print(f"Domain sağlığı okunamadı: {e}")
+        return {}
+
+def save_domain_health():
+    if shard_outbox:
+        shard_outbox.state["domain_health"] = {
+            key: record for key, record in breaker.state.items() if key in shard_outbox.domains
+        }
+        return
+    try:
+        with PriceStore() as store:
+            store.save_domain_health(dict(breaker.state))
+    except Exception as e:
+        print(f"Domain sağlığı kaydedilemedi: {e}")
+
+# Tur metrikleri: aşama süreleri ve sayaçlar (run_metrics.py), tur sonunda JSONL'e yazılır
+metrics = RunMetrics()
+
+# --profile ile çalışırken profiler.RunProfiler (main ayarlar)
+profiler = None
+
+# --shard i/N ile çalışırken sharding.ShardOutbox: sonuçlar depo yerine shard dosyasına yazılır
+shard_outbox = None
+
+def write_metrics():
+    print(metrics.report())
+    extra = {"shard": f"{shard_outbox.index}/{shard_outbox.count}"} if shard_outbox else {}
+    try:
+        metrics.write(telegram_sent=notifier.sent, telegram_failed=notifier.failed, **extra)
+    except Exception as e:
+        print(f"Tur metrikleri yazılamadı: {e}")
+
+async def write_metrics_async():
+    """Servis modu: özet event loop'ta alınır (aynı anda süren /ekle taraması sayaçlara yazar), dosyaya thread'de yazılır."""
+    print(metrics.report())
+    summary = metrics.summary(telegram_sent=notifier.sent, telegram_failed=notifier.failed)
+    try:
+        await asyncio.to_thread(metrics.save, summary)
+    except Exception as e:
+        print(f"Tur metrikleri yazılamadı: {e}")
+
+def load_schedule():
+    try:
+        with read_store() as store:
+            return store.load_schedule()
+    except Exception as e:
+        print(f"Zamanlama bilgisi okunamadı: {e}")
+        return {}
+
+def save_schedule():
+    if shard_outbox:
+        shard_outbox.state["schedule"] = dict(scheduler.changed)
+        return
+    try:
+        with PriceStore() as store:
+            store.save_schedule(dict(scheduler.changed))
+    except Exception as e:
+        print(f"Zamanlama bilgisi kaydedilemedi: {e}")
+
+def save_prices(observed):
+    """Bu turda görülen ürünleri tek transaction'da depoya yazar ve prices.json'ı yeniler."""
+    with PriceStore() as store:
+        store.record_run(observed)
+        count, written = store.export_json(PRICES_FILE)
+    if written:
+        print(f"{len(observed)} gözlem kaydedildi, {count} ürün {PRICES_FILE} dosyasına yazıldı.")
+    else:
+        print(f"{len(observed)} gözlem kaydedildi, {PRICES_FILE} değişmedi (yazılmadı).")
 
 # --- İNSAN TAKLİDİ VE YARDIMCILAR ---
-def simulate_human_behavior(page):
-    """Sayfanın sonuna kadar scroll yaparak lazy load tetikler."""
+# Yeni kart, liste sonu işareti veya (kart seçicisi yoksa) yükseklik artışı olunca döner
+SCROLL_SIGNAL_JS = """
+([cards, count, height, sentinel]) => {
+    if (sentinel && document.querySelector(sentinel)) return 'sentinel';
+    if (cards) return document.querySelectorAll(cards).length > count ? 'cards' : false;
+    return document.body.scrollHeight > height ? 'height' : false;
+}
+"""
+
+class NetworkWatcher:
+    """Sayfadaki devam eden XHR/fetch isteklerini sayar."""
+
+    def __init__(self, page):
+        self.inflight = 0
+        self.last_change = time.monotonic()
+        page.on("request", self._on_start)
+        page.on("requestfinished", self._on_end)
+        page.on("requestfailed", self._on_end)
+
+    def _on_start(self, request):
+        if request.resource_type in ("xhr", "fetch"):
+            self.inflight += 1
+            self.last_change = time.monotonic()
+
+    def _on_end(self, request):
+        if request.resource_type in ("xhr", "fetch"):
+            self.inflight = max(0, self.inflight - 1)
+            self.last_change = time.monotonic()
+
+    async def settle(self, quiet=0.5, timeout=3):
+        """quiet sn boyunca hiç istek kalmayana kadar (en fazla timeout sn) bekler."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.inflight == 0 and time.monotonic() - self.last_change >= quiet:
+                return True
+            await asyncio.sleep(0.1)
+        return False
+
+async def count_cards(page, selector):
+    if not selector:
+        return 0
+    return await page.evaluate("(sel) => document.querySelectorAll(sel).length", selector)
+
+async def simulate_human_behavior(page, site="generic"):
+    """
+    Lazy load / infinite scroll tetikler. Sabit beklemeler yerine kart sayısının artmasını,
+    ağın durulmasını veya liste sonu işaretini bekler; kart sayısı artmayı bırakınca durur.
+    {"rounds", "cards", "seconds", "reason"} döndürür.
+    """
+    settings = SCROLL_SETTINGS.get(site) or SCROLL_SETTINGS["generic"]
+    started = time.monotonic()
+    result = {"rounds": 0, "cards": 0, "seconds": 0.0, "reason": "budget"}
     print(">>> SCROLL BAŞLIYOR <<<")
     try:
-        # Önceki yükseklik
-        last_height = page.evaluate("document.body.scrollHeight")
-        
-        for i in range(10): # Maksimum 10 sayfa/tur scroll
-            print(f"   Scroll Turu: {i+1}")
-            
-            # Klavye ile 'End' tuşuna bas (Daha etkili)
-            page.keyboard.press("End")
-            time.sleep(0.5)
-            
-            # Mouse ile de aşağı in
-            page.mouse.wheel(0, 10000)
-            time.sleep(1)
-            
+        watcher = NetworkWatcher(page)
+        cards = await count_cards(page, settings["cards"])
+        # Hiç kart yoksa (detay sayfası) tek tur yeterli
+        plateau = settings["plateau"] if cards else 1
+        stalls = 0
+
+        while result["rounds"] < settings["max_rounds"]:
+            remaining = settings["budget"] - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            result["rounds"] += 1
+            height = await page.evaluate("document.body.scrollHeight")
+
+            # Klavye ile 'End' tuşuna bas, mouse ile de aşağı in
+            await page.keyboard.press("End")
+            await page.mouse.wheel(0, 10000)
+
             # "Daha Fazla Göster" butonu varsa tıkla
             try:
                 load_more = page.locator(".action.more, .btn-load-more, button.load-more").first
-                if load_more.is_visible():
+                if await load_more.is_visible():
                     print("   'Daha Fazla Göster' butonu bulundu, tıklanıyor...")
-                    load_more.click()
-                    time.sleep(2)
+                    await load_more.click()
             except: pass
 
-            # Yeni yükseklik kontrolü
-            new_height = page.evaluate("document.body.scrollHeight")
-            if new_height == last_height:
-                print("   Sayfa sonuna gelindi (Yükseklik değişmedi).")
-                break 
-            last_height = new_height
-            
-        print(">>> SCROLL BİTTİ <<<")
-        
+            signal = None
+            try:
+                handle = await page.wait_for_function(
+                    SCROLL_SIGNAL_JS,
+                    arg=[settings["cards"], cards, height, settings["sentinel"]],
+                    timeout=min(settings["round_timeout"], remaining) * 1000,
+                    polling=200
+                )
+                signal = await handle.json_value()
+            except Exception:
+                signal = None
+
+            if signal:
+                # Yeni parti gelirken biten istekleri bekle
+                await watcher.settle(timeout=min(3, max(0.1, remaining)))
+
+            new_cards = await count_cards(page, settings["cards"])
+            print(f"   Scroll Turu: {result['rounds']} ({new_cards} kart)")
+
+            if signal == "sentinel":
+                result["reason"] = "sentinel"
+                cards = new_cards
+                break
+            if signal and (new_cards > cards or not settings["cards"]):
+                stalls = 0
+            else:
+                stalls += 1
+            cards = new_cards
+            if stalls >= plateau:
+                result["reason"] = "plateau"
+                print("   Sayfa sonuna gelindi (Yeni ürün gelmedi).")
+                break
+        else:
+            result["reason"] = "max_rounds"
+
+        result["cards"] = cards
     except Exception as e:
         print(f"Human behavior hatası: {e}")
+        result["reason"] = "error"
 
-def parse_price(text):
-    if not text: return None
-    clean = text.replace("TL", "").replace("tl", "").replace("\n", "").strip()
-    clean = clean.replace(".", "").replace(",", ".") 
-    clean = "".join([c for c in clean if c.isdigit() or c == '.'])
-    try:
-        return float(clean)
-    except:
-        return None
-
-def find_price_in_text(text):
-    # Metin içindeki 1.250,00 TL veya 1250 TL gibi ifadeleri bulur
-    matches = re.findall(r'([\d\.,]+)\s*(?:TL|tl)', text)
-    if not matches:
-        matches = re.findall(r'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?)', text)
-    
-    if matches:
-        for m in matches:
-            val = parse_price(m)
-            if val and 10 < val < 100000: # Mantıklı fiyat aralığı
-                return val
-    return None
+    result["seconds"] = round(time.monotonic() - started, 2)
+    metrics.add_phase("scroll", time.monotonic() - started)
+    metrics.count("scroll_rounds", result["rounds"])
+    print(f">>> SCROLL BİTTİ <<< {result['rounds']} tur, {result['cards']} kart, "
+          f"{result['seconds']} sn ({result['reason']})")
+    return result
 
 # --- SCRAPER (VERİ ÇEKİCİ) ---
-def process_gsstore(page, url):
+# Tüm stratejiler async'tir: scrape_engine.ScrapeEngine tarafından eşzamanlı çağrılır.
+def gsstore_products_from_cards(cards):
+    """bulk_extract_cards çıktısını GSStore ürün kayıtlarına çevirir."""
+    products = []
+    prices = find_prices([card.get("raw_price") or "" for card in cards])
+    for card, price in zip(cards, prices):
+
+        name = "İsimsiz Ürün"
+        name_candidate = card.get("name")
+        if name_candidate and len(name_candidate) > 3:
+            name = name_candidate
+
+        if len(name) < 5 or "İsimsiz" in name:
+            for p in card.get("alt_names") or []:
+                if len(p.strip()) > 5:
+                    name = p.strip()
+                    break
+
+        href = card.get("href")
+        full_link = None
+        if href:
+            full_link = href if href.startswith("http") else "https://www.gsstore.org" + href
+
+        if full_link and price:
+            if str(price) in name:
+                name = name.replace(str(price), "").replace("TL", "").strip()
+            products.append({
+                "name": name,
+                "url": full_link,
+                "price": price,
+                "image": card.get("image") or ""
+            })
+    return products
+
+async def gsstore_products_from_locators(items):
+    """Eski yöntem: her kart için ayrı Playwright çağrıları."""
+    products = []
+    for item in items:
+        try:
+            full_text = (await item.inner_text()).replace("\n", " ")
+            price = find_price_in_text(full_text)
+            
+            name = "İsimsiz Ürün"
+            link_el = item.locator("a").first
+            href = await link_el.get_attribute("href")
+            
+            if await link_el.count() > 0:
+                name_candidate = await link_el.get_attribute("title")
+                if not name_candidate:
+                    name_candidate = (await link_el.inner_text()).strip()
+                if name_candidate and len(name_candidate) > 3: 
+                    name = name_candidate
+
+            if len(name) < 5 or "İsimsiz" in name:
+                possible_names = await item.locator("[class*='name'], [class*='title']").all_inner_texts()
+                for p in possible_names:
+                     if len(p.strip()) > 5:
+                         name = p.strip()
+                         break
+            
+            full_link = None
+            if href:
+                full_link = href if href.startswith("http") else "https://www.gsstore.org" + href
+
+            image_url = ""
+            try:
+                img_el = item.locator("img").first
+                if await img_el.count() > 0:
+                    image_url = await img_el.get_attribute("src")
+                    if not image_url or "placeholder" in image_url:
+                        data_src = await img_el.get_attribute("data-src")
+                        if data_src: image_url = data_src
+            except: pass
+
+            if full_link and price:
+                if str(price) in name:
+                    name = name.replace(str(price), "").replace("TL", "").strip()
+                products.append({
+                    "name": name, 
+                    "url": full_link, 
+                    "price": price,
+                    "image": image_url
+                })
+        except Exception as e: 
+            continue
+    return products
+
+async def process_gsstore(page, url):
     products = []
     print(f"GSSTORE: {url}")
     
     try:
-        print(f"   Sayfa Başlığı: {page.title()}")
+        print(f"   Sayfa Başlığı: {await page.title()}")
     except: pass
 
     # SCROLL ÇAĞRISI (Ürünleri yükle) - Liste sayfasıysa işe yarar
     print("   [DEBUG] process_gsstore içinde scroll başlatılıyor...")
-    simulate_human_behavior(page)
-    time.sleep(2)
+    await simulate_human_behavior(page, "gsstore.org")
+
+    # Izgara son turdakiyle aynıysa kartları okumaya gerek yok
+    with metrics.phase("fingerprint"):
+        fp = await grid_fingerprint(page, GSSTORE_CARD_SPEC["items"])
+    if freshness.is_unchanged(url, "grid", fp):
+        return UNCHANGED
+    if fp:
+        freshness.note(url, "grid", fp)
 
     # 1. YÖNTEM: LİSTE SAYFASI TARAMA
-    items = page.locator(".product-item").all()
-    if not items:
-        items = page.locator(".product-item-info").all()
+    if CARD_EXTRACTION == "bulk":
+        with metrics.phase("extract"):
+            cards = await bulk_extract_cards(page, GSSTORE_CARD_SPEC)
+        if cards:
+            print(f"   {len(cards)} adet liste öğesi (kart) tek seferde okundu...")
+            return gsstore_products_from_cards(cards)
+    else:
+        items = await page.locator(".product-item").all()
+        if not items:
+            items = await page.locator(".product-item-info").all()
 
-    if items:
-        print(f"   {len(items)} adet liste öğesi (kart) inceleniyor...")
-        for item in items:
-            try:
-                full_text = item.inner_text().replace("\n", " ")
-                price = find_price_in_text(full_text)
-                
-                name = "İsimsiz Ürün"
-                link_el = item.locator("a").first
-                href = link_el.get_attribute("href")
-                
-                if link_el.count() > 0:
-                    name_candidate = link_el.get_attribute("title")
-                    if not name_candidate:
-                        name_candidate = link_el.inner_text().strip()
-                    if name_candidate and len(name_candidate) > 3: 
-                        name = name_candidate
-
-                if len(name) < 5 or "İsimsiz" in name:
-                    possible_names = item.locator("[class*='name'], [class*='title']").all_inner_texts()
-                    for p in possible_names:
-                         if len(p.strip()) > 5:
-                             name = p.strip()
-                             break
-                
-                full_link = None
-                if href:
-                    full_link = href if href.startswith("http") else "https://www.gsstore.org" + href
-
-                image_url = ""
-                try:
-                    img_el = item.locator("img").first
-                    if img_el.count() > 0:
-                        image_url = img_el.get_attribute("src")
-                        if not image_url or "placeholder" in image_url:
-                            data_src = img_el.get_attribute("data-src")
-                            if data_src: image_url = data_src
-                except: pass
-
-                if full_link and price:
-                    if str(price) in name:
-                        name = name.replace(str(price), "").replace("TL", "").strip()
-                    products.append({
-                        "name": name, 
-                        "url": full_link, 
-                        "price": price,
-                        "image": image_url
-                    })
-            except Exception as e: 
-                continue
-        return products
+        if items:
+            print(f"   {len(items)} adet liste öğesi (kart) inceleniyor...")
+            with metrics.phase("extract"):
+                return await gsstore_products_from_locators(items)
 
     # 2. YÖNTEM: TEKİL ÜRÜN SAYFASI (Detail Page)
     # Eğer liste öğesi bulunamadıysa, buranın bir ürün sayfası olup olmadığına bak.
@@ -267,23 +576,23 @@ def process_gsstore(page, url):
     try:
         # Fiyat kontrolü
         price_box = page.locator(".price-box.price-final_price").first
-        if price_box.is_visible():
-            raw_price = price_box.inner_text()
+        if await price_box.is_visible():
+            raw_price = await price_box.inner_text()
             price = find_price_in_text(raw_price)
             
             if price:
                 # İsim
                 name_el = page.locator("h1.page-title").first
-                name = name_el.inner_text().strip() if name_el.is_visible() else "Detay Sayfası Ürünü"
+                name = (await name_el.inner_text()).strip() if await name_el.is_visible() else "Detay Sayfası Ürünü"
                 
                 # Resim
                 image = ""
                 img_el = page.locator(".gallery-placeholder__image").first
-                if not img_el.is_visible():
+                if not await img_el.is_visible():
                      img_el = page.locator(".fotorama__img").first
                 
-                if img_el.is_visible():
-                    image = img_el.get_attribute("src")
+                if await img_el.is_visible():
+                    image = await img_el.get_attribute("src")
                 
                 print(f"   -> TEKİL ÜRÜN BULUNDU: {name} - {price} TL")
                 products.append({
@@ -299,67 +608,171 @@ def process_gsstore(page, url):
     print("!!! HİÇ ÜRÜN BULUNAMADI (Liste veya Tekil) !!!")
     return []
 
-def process_saatvesaat(page, url):
+def saatvesaat_products_from_cards(cards, url):
+    """bulk_extract_cards çıktısını Saat&Saat ürün kayıtlarına çevirir."""
+    products = []
+    prices = find_prices([card.get("raw_price") or "" for card in cards])
+    for card, price in zip(cards, prices):
+        name = "İsimsiz Saat"
+        full_link = url
+        if card.get("name") is not None:
+            name = card["name"].strip()
+        href = card.get("href")
+        if href:
+            full_link = href if href.startswith("http") else "https://www.saatvesaat.com.tr" + href
+
+        if price:
+            products.append({
+                "name": name,
+                "url": full_link,
+                "price": price,
+                "image": card.get("image") or ""
+            })
+    return products
+
+async def saatvesaat_products_from_locators(items, url):
+    """Eski yöntem: her kart için ayrı Playwright çağrıları."""
+    products = []
+    for item in items:
+        try:
+            # İsim ve Link
+            name = "İsimsiz Saat"
+            link_el = item.locator("a.product-item-link").first
+            if not await link_el.is_visible():
+                 link_el = item.locator("a").first
+            
+            full_link = url
+            if await link_el.count() > 0:
+                name = (await link_el.inner_text()).strip()
+                href = await link_el.get_attribute("href")
+                if href:
+                    full_link = href if href.startswith("http") else "https://www.saatvesaat.com.tr" + href
+
+            # Fiyat
+            price = None
+            price_el = item.locator(".special-price .price").first
+            if not await price_el.is_visible():
+                price_el = item.locator(".price-box .price").first
+            
+            if await price_el.is_visible():
+                 raw_price = await price_el.inner_text()
+                 price = find_price_in_text(raw_price)
+
+            # Resim
+            image = ""
+            try:
+                img_el = item.locator("img.product-image-photo").first
+                if await img_el.is_visible():
+                    image = await img_el.get_attribute("src")
+            except: pass
+
+            if price:
+                products.append({
+                    "name": name, 
+                    "url": full_link, 
+                    "price": price,
+                    "image": image if image else ""
+                })
+        except Exception as e:
+            continue
+    return products
+
+# Magento sayfalayıcısı / toolbar'dan toplam sayfa sayısı (bulunamazsa 0)
+MAGENTO_PAGE_COUNT_JS = """
+(param) => {
+    let max = 0;
+    const re = new RegExp('[?&]' + param + '=(\\d+)');
+    document.querySelectorAll('.pages a[href], .pager a[href], .toolbar a[href]').forEach(a => {
+        const m = a.href.match(re);
+        if (m) max = Math.max(max, parseInt(m[1], 10));
+    });
+    document.querySelectorAll('.pages .item').forEach(item => {
+        const nums = item.innerText.match(/\\d+/g);
+        if (nums) max = Math.max(max, parseInt(nums[nums.length - 1], 10));
+    });
+    if (!max) {
+        // "1-36 / 250 ürün" -> ceil(250 / 36)
+        const amount = document.querySelector('.toolbar-amount');
+        const nums = amount ? (amount.innerText.match(/\\d+/g) || []).map(Number) : [];
+        if (nums.length >= 3 && nums[1] >= nums[0]) max = Math.ceil(nums[2] / (nums[1] - nums[0] + 1));
+    }
+    return max;
+}
+"""
+
+def page_url(url, param, number):
+    """URL'deki sayfa parametresini değiştirir (diğer parametreler korunur)."""
+    parsed = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != param]
+    query.append((param, str(number)))
+    return urlunparse(parsed._replace(query=urlencode(query, safe="[]")))
+
+async def magento_more_pages(page, url, param="pi"):
+    """İlk yüklenen sayfa dışındaki liste sayfalarının URL'leri."""
+    try:
+        total = int(await page.evaluate(MAGENTO_PAGE_COUNT_JS, param) or 0)
+    except Exception as e:
+        print(f"   Sayfa sayısı okunamadı: {e}")
+        return []
+    if total <= 1:
+        return []
+    total = min(total, PAGINATION_MAX_PAGES)
+    current = dict(parse_qsl(urlparse(url).query)).get(param, "1")
+    print(f"   Sayfalayıcı: {total} sayfa (şu an {current})")
+    return [page_url(url, param, n) for n in range(1, total + 1) if str(n) != current]
+
+async def saatvesaat_extract_listing(page, url):
+    """Yüklenmiş liste sayfasındaki kartları okur."""
+    if CARD_EXTRACTION == "bulk":
+        with metrics.phase("extract"):
+            cards = await bulk_extract_cards(page, SAATVESAAT_CARD_SPEC)
+        if cards:
+            print(f"   {len(cards)} adet liste öğesi (kart) tek seferde okundu...")
+            return saatvesaat_products_from_cards(cards, url)
+        return []
+    items = await page.locator(".product-item").all()
+    if not items:
+        items = await page.locator(".product-item-info").all()
+    if items:
+        print(f"   {len(items)} adet liste öğesi (kart) inceleniyor...")
+        with metrics.phase("extract"):
+            return await saatvesaat_products_from_locators(items, url)
+    return []
+
+async def saatvesaat_listing_page(page, url):
+    """Sayfalamanın diğer sayfaları için strateji: scroll + kart okuma."""
+    await page.wait_for_load_state("domcontentloaded", timeout=breaker.wait_timeout(health_key(url)))
+    await simulate_human_behavior(page, "saatvesaat.com.tr")
+    return await saatvesaat_extract_listing(page, url)
+
+async def process_saatvesaat(page, url):
     products = []
     print(f"SAAT&SAAT: {url}")
     try:
-        page.wait_for_load_state("domcontentloaded", timeout=20000)
+        await page.wait_for_load_state("domcontentloaded", timeout=breaker.wait_timeout(health_key(url)))
 
         # --- LİSTE SAYFASI KONTROLÜ ---
         # Önce scroll yapalım ki lazy load ürünler gelsin
-        simulate_human_behavior(page)
+        await simulate_human_behavior(page, "saatvesaat.com.tr")
+
+        with metrics.phase("pager"):
+            more_pages = await magento_more_pages(page, url) if PAGINATION else []
+
+        # Sayfalı listelerde diğer sayfalar da değişmiş olabilir; parmak izi kısayolu kullanılmaz
+        if not more_pages:
+            with metrics.phase("fingerprint"):
+                fp = await grid_fingerprint(page, SAATVESAAT_CARD_SPEC["items"])
+            if freshness.is_unchanged(url, "grid", fp):
+                return UNCHANGED
+            if fp:
+                freshness.note(url, "grid", fp)
         
-        items = page.locator(".product-item").all()
-        if not items:
-            items = page.locator(".product-item-info").all()
+        products = await saatvesaat_extract_listing(page, url)
 
-        if items:
-            print(f"   {len(items)} adet liste öğesi (kart) inceleniyor...")
-            for item in items:
-                try:
-                    # İsim ve Link
-                    name = "İsimsiz Saat"
-                    link_el = item.locator("a.product-item-link").first
-                    if not link_el.is_visible():
-                         link_el = item.locator("a").first
-                    
-                    full_link = url
-                    if link_el.count() > 0:
-                        name = link_el.inner_text().strip()
-                        href = link_el.get_attribute("href")
-                        if href:
-                            full_link = href if href.startswith("http") else "https://www.saatvesaat.com.tr" + href
-
-                    # Fiyat
-                    price = None
-                    price_el = item.locator(".special-price .price").first
-                    if not price_el.is_visible():
-                        price_el = item.locator(".price-box .price").first
-                    
-                    if price_el.is_visible():
-                         raw_price = price_el.inner_text()
-                         price = find_price_in_text(raw_price)
-
-                    # Resim
-                    image = ""
-                    try:
-                        img_el = item.locator("img.product-image-photo").first
-                        if img_el.is_visible():
-                            image = img_el.get_attribute("src")
-                    except: pass
-
-                    if price:
-                        products.append({
-                            "name": name, 
-                            "url": full_link, 
-                            "price": price,
-                            "image": image if image else ""
-                        })
-                except Exception as e:
-                    continue
-            
-            if products:
-                return products
+        if products:
+            if more_pages:
+                return PagedProducts(products, more_pages, saatvesaat_listing_page)
+            return products
 
         # --- TEKİL ÜRÜN SAYFASI (ESKİ MANTIK) ---
         print("   -> Liste bulunamadı, tekil ürün kontrolü yapılıyor...")
@@ -370,8 +783,8 @@ def process_saatvesaat(page, url):
         # 1. Deneme: .product-info-main .price
         try:
             price_el = page.locator(".product-info-main .price").first
-            if price_el.is_visible():
-                 raw_price = price_el.inner_text()
+            if await price_el.is_visible():
+                 raw_price = await price_el.inner_text()
                  price = find_price_in_text(raw_price)
         except: pass
         
@@ -379,15 +792,15 @@ def process_saatvesaat(page, url):
         if not price:
              try:
                 price_el = page.locator(".special-price .price").first
-                if price_el.is_visible():
-                    raw_price = price_el.inner_text()
+                if await price_el.is_visible():
+                    raw_price = await price_el.inner_text()
                     price = find_price_in_text(raw_price)
              except: pass
 
         # 3. Deneme: Meta tag
         if not price:
             try:
-                meta_price = page.locator('meta[property="product:price:amount"]').first.get_attribute("content")
+                meta_price = await page.locator('meta[property="product:price:amount"]').first.get_attribute("content")
                 if meta_price:
                     price = float(meta_price)
             except: pass
@@ -397,21 +810,21 @@ def process_saatvesaat(page, url):
             name = "Saat&Saat Ürünü"
             try:
                 name_el = page.locator("h1.page-title").first
-                if not name_el.is_visible():
+                if not await name_el.is_visible():
                      name_el = page.locator("h1").first
-                if name_el.is_visible():
-                    name = name_el.inner_text().strip()
+                if await name_el.is_visible():
+                    name = (await name_el.inner_text()).strip()
             except: pass
             
             # Resim
             image = ""
             try:
                 img_el = page.locator(".gallery-placeholder__image").first
-                if not img_el.is_visible():
+                if not await img_el.is_visible():
                         img_el = page.locator(".fotorama__img").first
                 
-                if img_el.is_visible():
-                    image = img_el.get_attribute("src")
+                if await img_el.is_visible():
+                    image = await img_el.get_attribute("src")
             except: pass
             
             print(f"   -> SAAT&SAAT BULDU: {name} - {price} TL")
@@ -429,164 +842,509 @@ def process_saatvesaat(page, url):
             
     return products
 
-# --- ANA MOTOR ---
-def main():
-    print("--- V3.0 FINAL FIX ---")
-    print("Bot Calisiyor... (Stealth Mode: ON)")
-    check_new_urls()
+async def process_generic(page, url):
+    # Generic scraper denemesi
+    print("  -> GSStore değil, geneleksel tarayıcı (generic scraper) devreye giriyor.")
+    found_products = []
+    try:
+        # 1. Title/Name
+        name = "Bilinmeyen Ürün"
+        try:
+            og_title = await page.locator('meta[property="og:title"]').first.get_attribute("content")
+            if og_title: name = og_title
+            else: name = await page.title()
+        except: name = await page.title()
+
+        # 2. Image
+        image = ""
+        try:
+            og_image = await page.locator('meta[property="og:image"]').first.get_attribute("content")
+            if og_image: image = og_image
+            else:
+                # Fallback: En büyük resmi bulmaya calis (basit bir mantik)
+                imgs = await page.locator("img").all()
+                for img in imgs[:5]: # Ilk 5 resme bak
+                    if await img.is_visible() and int(await img.get_attribute("width") or 0) > 200:
+                        image = await img.get_attribute("src")
+                        break
+        except: pass
+
+        # 3. Price
+        price = None
+        try:
+            # Tüm text icinde ara
+            body_text = await page.inner_text("body")
+            # Regex ile fiyat ara (find_price_in_text fonksiyonunu kullan)
+            price = find_price_in_text(body_text[:5000]) # Ilk 5000 karakter yeterli olabilir
+            
+            # Eger genel textte bulamazsa, belli classlara bak
+            if not price:
+                price_candidates = await page.locator("[class*='price'], [id*='price']").all_inner_texts()
+                for pc in price_candidates:
+                    found = find_price_in_text(pc)
+                    if found:
+                        price = found
+                        break
+        except: pass
+
+        if price and price > 0:
+             print(f"   GENERIC BULDU: {name} - {price} TL")
+             found_products = [{
+                 "name": name.strip(),
+                 "url": url,
+                 "price": price,
+                 "image": image
+             }]
+        else:
+             print("   -> Generic scraper fiyat bulamadı.")
+             
+    except Exception as ge:
+         print(f"   Generic scraper hatası: {ge}")
+    return found_products
+
+async def api_tier(url):
+    """Akinon / Magento JSON uçlarından liste çekmeyi dener."""
+    # Tarayıcıyla aynı ürün aralığı: sayfalama açıksa tüm sayfalar, kapalıysa URL'nin sayfası
+    products = await asyncio.to_thread(fetch_listing_api, url, domain_key(url),
+                                       all_pages=PAGINATION, max_pages=PAGINATION_MAX_PAGES)
+    if products:
+        fp = products_fingerprint(products)
+        if freshness.is_unchanged(url, "api", fp):
+            return UNCHANGED
+        freshness.note(url, "api", fp)
+    return products
+
+async def http_tier(url):
+    """Düz HTTP ile dener; ürün bulunamazsa None döner ve tarayıcıya geçilir."""
+    # Liste sayfalarını bu katman hep reddeder (API / scroll gerekir); adaptörü olan
+    # sitelerde boşa GET atılmasın diye sadece tekil ürün sayfaları denenir
+    if domain_key(url) in API_CLIENTS and not is_detail_url(url):
+        return None
+    return await asyncio.to_thread(fetch_product_http, url, freshness)
+
+STRATEGIES = {
+    "gsstore.org": process_gsstore,
+    "saatvesaat.com.tr": process_saatvesaat,
+    "generic": process_generic,
+}
+
+# --- İNDİRİM KANITI ---
+CARD_SELECTORS = [".product-item", ".product-item-info"]
+GSSTORE_COLOUR_PREFIX_RE = re.compile(r"(-[a-z]\d{5,6}-\d{1,2})-1$")
+DETAIL_SELECTORS = [".product-info-main", ".product-main", ".product-detail"]
+
+async def find_card(page, prod):
+    """Ürünün sayfadaki kartını (detay sayfasında ürün bilgi alanını) bulur."""
+    # Kanonik URL'de beden eki yok (veya "-1"e indirgenmiş: /urun-e251352-2-1/);
+    # kart linki /urun-e251352-2-3/ olabilir, önek olarak /urun-e251352-2- aranır
+    path = urlparse(prod["url"]).path.rstrip("/").replace('"', '\\"')
+    path = GSSTORE_COLOUR_PREFIX_RE.sub(r"\1-", path)
+    if path:
+        for sel in CARD_SELECTORS:
+            card = page.locator(sel).filter(has=page.locator(f'a[href*="{path}"]')).first
+            if await card.count() > 0:
+                return card
+    if canonical_url(page.url, product=True) == prod["url"]:
+        for sel in DETAIL_SELECTORS:
+            area = page.locator(sel).first
+            if await area.count() > 0:
+                return area
+    return None
+
+async def capture_evidence(page, prod):
+    """
+    EVIDENCE_MODE'a göre bildirime eklenecek resmi döndürür:
+    JPEG bytes, resim URL'si veya None (sadece metin).
+    """
+    image_url = prod.get("image") or ""
+    image_url = image_url if image_url.startswith("http") else None
+    if EVIDENCE_MODE == "none":
+        return None
+    if EVIDENCE_MODE == "image" or page is None:
+        return image_url
+
+    try:
+        if EVIDENCE_MODE == "card":
+            card = await find_card(page, prod)
+            if card is not None:
+                await card.scroll_into_view_if_needed(timeout=5000)
+                # Screenshot'ta resimler görünsün diye engeli bu sayfa için kaldır
+                await release_page_async(page)
+                return await card.screenshot(type="jpeg", quality=EVIDENCE_JPEG_QUALITY, timeout=10000)
+            # Kart bulunamadıysa resim URL'si yeterli
+            if image_url:
+                return image_url
+
+        await release_page_async(page)
+        return await page.screenshot(type="jpeg", quality=EVIDENCE_JPEG_QUALITY)
+    except Exception as err:
+        print(f"Screenshot hatası: {err}")
+        return image_url
+
+# --- FİYAT KARŞILAŞTIRMA ---
+async def handle_products(page, found_products, old_prices, new_prices):
+    """
+    Bulunan ürünleri eski fiyatlarla karşılaştırır. İndirim bildirildiyse True döner.
+    page None ise (API/HTTP katmanı) screenshot alınmaz, varsa resim URL'si gönderilir.
+    """
     discount_found = False
-    
-    if not os.path.exists(URLS_FILE):
-        print("urls.txt bulunamadı!")
-        return
+    for prod in found_products:
+        uid = prod["url"]
+        price = prod["price"]
+        name = prod["name"]
+        image = prod.get("image", "")
         
-    with open(URLS_FILE, "r") as f:
-        urls = [line.strip() for line in f if line.strip()]
+        last_updated = time.time()
+        price_changed = True
 
-    old_prices = load_prices()
-    new_prices = old_prices.copy()
-    
-    # User-Agent: Masaüstü Sabit
-    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    print(f"User-Agent: {user_agent}")
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True if os.environ.get("GITHUB_ACTIONS") else False,
-            args=["--disable-blink-features=AutomationControlled"]
-        )
-        context = browser.new_context(
-            user_agent=user_agent,
-            viewport={"width": 1920, "height": 1080},
-            locale="tr-TR",
-            timezone_id="Europe/Istanbul"
-        )
+        if uid in old_prices:
+            old_price = old_prices[uid]["price"]
+            if price == old_price:
+                price_changed = False
+                last_updated = old_prices[uid]["updated_at"]
+            elif price < old_price:
+                discount = int(((old_price - price) / old_price) * 100)
+                if discount >= 5:
+                    msg = f"INDIRIM! (%{discount})\n\n{name}\nEski: {old_price} TL\nYeni: {price} TL\nLink: {uid}"
+                    print(f"   Bildirim: {name}")
+                    
+                    with metrics.phase("screenshot"):
+                        evidence = await capture_evidence(page, prod)
+                    notify_discount(uid, price, msg, evidence)
+                    discount_found = True
         
-        page = context.new_page()
-        Stealth().apply_stealth_sync(page)
+        new_prices[uid] = {
+            "name": name,
+            "price": price,
+            "image": image,
+            "updated_at": last_updated
+        }
+    return discount_found
 
-        for url in urls:
-            try:
-                print(f"\nSiteye Gidiliyor: {url}")
-                page.goto(url, timeout=90000, wait_until="domcontentloaded")
-                time.sleep(random.uniform(1, 2.5))
-                # simulate_human_behavior(page) -> KALDIRILDI, process_gsstore icine tasindi
-                
-                found_products = []
-                if "gsstore" in url:
-                    found_products = process_gsstore(page, url)
-                elif "saatvesaat" in url:
-                    found_products = process_saatvesaat(page, url)
-                else:
-                    # Generic scraper denemesi
-                    print("  -> GSStore değil, geneleksel tarayıcı (generic scraper) devreye giriyor.")
-                    from playwright.sync_api import TimeoutError
-                    
-                    try:
-                        # 1. Title/Name
-                        name = "Bilinmeyen Ürün"
-                        try:
-                            og_title = page.locator('meta[property="og:title"]').first.get_attribute("content")
-                            if og_title: name = og_title
-                            else: name = page.title()
-                        except: name = page.title()
-
-                        # 2. Image
-                        image = ""
-                        try:
-                            og_image = page.locator('meta[property="og:image"]').first.get_attribute("content")
-                            if og_image: image = og_image
-                            else:
-                                # Fallback: En büyük resmi bulmaya calis (basit bir mantik)
-                                imgs = page.locator("img").all()
-                                for img in imgs[:5]: # Ilk 5 resme bak
-                                    if img.is_visible() and int(img.get_attribute("width") or 0) > 200:
-                                        image = img.get_attribute("src")
-                                        break
-                        except: pass
-
-                        # 3. Price
-                        price = None
-                        try:
-                            # Tüm text icinde ara
-                            body_text = page.inner_text("body")
-                            # Regex ile fiyat ara (find_price_in_text fonksiyonunu kullan)
-                            price = find_price_in_text(body_text[:5000]) # Ilk 5000 karakter yeterli olabilir
-                            
-                            # Eger genel textte bulamazsa, belli classlara bak
-                            if not price:
-                                price_candidates = page.locator("[class*='price'], [id*='price']").all_inner_texts()
-                                for pc in price_candidates:
-                                    found = find_price_in_text(pc)
-                                    if found:
-                                        price = found
-                                        break
-                        except: pass
-
-                        if price and price > 0:
-                             print(f"   GENERIC BULDU: {name} - {price} TL")
-                             found_products = [{
-                                 "name": name.strip(),
-                                 "url": url,
-                                 "price": price,
-                                 "image": image
-                             }]
-                        else:
-                             print("   -> Generic scraper fiyat bulamadı.")
-                             
-                    except Exception as ge:
-                         print(f"   Generic scraper hatası: {ge}")
+# --- ANA MOTOR ---
+def make_engine():
+    """tracker ayarlarıyla (katmanlar + tazelik) bir ScrapeEngine oluşturur."""
+    fast_tiers = []
+    if STOREFRONT_API:
+        fast_tiers.append(("api", api_tier))
+    if HTTP_FIRST:
+        fast_tiers.append(("http", http_tier))
+    tracer = profiler.tracer if profiler else None
+    # Trace context başına tutulur; yavaş URL trace'leri karışmasın diye sıralı tarama
+    return ScrapeEngine(STRATEGIES, fast_tiers=fast_tiers, freshness=freshness, metrics=metrics,
+                        global_limit=1 if tracer else None, tracer=tracer, breaker=breaker)
 
-                
-                print(f"   -> {len(found_products)} ürün çekildi.")
-                
-                for prod in found_products:
-                    uid = prod["url"]
-                    price = prod["price"]
-                    name = prod["name"]
-                    image = prod.get("image", "")
-                    
-                    last_updated = time.time()
-                    price_changed = True
-
-                    if uid in old_prices:
-                        old_price = old_prices[uid]["price"]
-                        if price == old_price:
-                            price_changed = False
-                            last_updated = old_prices[uid]["updated_at"]
-                        elif price < old_price:
-                            discount = int(((old_price - price) / old_price) * 100)
-                            if discount >= 5:
-                                msg = f"INDIRIM! (%{discount})\n\n{name}\nEski: {old_price} TL\nYeni: {price} TL\nLink: {uid}"
-                                print(f"   Bildirim: {name}")
-                                
-                                screenshot_path = f"screenshot_{int(time.time())}.png"
-                                try:
-                                    page.screenshot(path=screenshot_path)
-                                    send_telegram_photo(msg, screenshot_path)
-                                    os.remove(screenshot_path)
-                                except Exception as err:
-                                    print(f"Screenshot hatası: {err}")
-                                    send_telegram(msg)
-                                discount_found = True
-                    
-                    new_prices[uid] = {
-                        "name": name,
-                        "price": price,
-                        "image": image,
-                        "updated_at": last_updated
-                    }
-                time.sleep(random.uniform(1.5, 3))
-            except Exception as e:
-                print(f"Genel Hata ({url}): {e}")
-
-        browser.close()
-        
-    save_prices(new_prices)
+async def run_async(urls, old_prices, new_prices, observed, engine=None, checkpoint=None, deadline=None,
+                    quick=False):
+    """
+    URL'leri eşzamanlı motorla tarar. İndirim bulunduysa True döner.
+    engine verilirse (servis modu) açık tarayıcı kullanılır ve kapatılmaz.
+    checkpoint verilirse gözlemler tur boyunca ara ara, tur bitince veya kesilince
+    (hata, SIGTERM) de son kez kaydedilir; deadline motorun süre sınırıdır.
+    quick: servis modunda /ekle taraması; tam turla aynı anda çalışabilir, bu yüzden
+    motorun tur istatistiklerine ve süre sınırına dokunmaz.
+    """
+    discount_found = False
+
+    url_results = {}
+    # Önce liste sayfaları, sonra listelerde görülmeyen detay sayfaları (coverage_planner.py)
+    planner = CoveragePlanner()
+    listings, details = planner.split(urls)
+    listing_urls = set(listings)
+
+    async def on_result(page, url, found_products):
+        nonlocal discount_found
+        # Aynı ürünün varyantları / kopyaları tek kanonik kayda insin
+        unique = {}
+        for prod in found_products:
+            prod["url"] = canonical_url(prod["url"], product=True)
+            unique.setdefault(prod["url"], prod)
+        found_products = list(unique.values())
+        planner.record(found_products)
+        if url in listing_urls:
+            freshness.list_products(url, unique)
+        changed = any(
+            (old_prices.get(prod["url"]) or {}).get("price") != prod["price"] for prod in found_products
+        )
+        discount = await handle_products(page, found_products, old_prices, new_prices)
+        if discount:
+            discount_found = True
+        for prod in found_products:
+            observed[prod["url"]] = new_prices[prod["url"]]
+        # Sayfalı listelerde on_result sayfa başına çağrılır; sonuçlar birikir
+        prev_changed, prev_discount, prev_count = url_results.get(url, (False, False, 0))
+        url_results[url] = (prev_changed or changed, prev_discount or discount, prev_count + len(found_products))
+
+    own_engine = engine is None
+    if own_engine:
+        engine = make_engine()
+        await engine.start()
+    elif not quick:
+        engine.reset_stats()
+    if not quick:
+        engine.deadline = deadline
+
+    def finished():
+        # Ertelenen ve devresi açık olduğu için atlanan URL'ler sonraki tura kalır
+        done = [url for url, status in engine.statuses.items() if status not in ("deferred", "skipped")]
+        return done + planner.avoided
+
+    saver = asyncio.create_task(checkpoint.run_periodic(observed, finished)) if checkpoint else None
+    try:
+        started = time.monotonic()
+        if listings:
+            await engine.run(listings, on_result, report=False)
+        # Değişmeyen liste on_result'a uğramaz; son turda gördüğü ürünler kapsanmış sayılır
+        for url in listings:
+            if engine.statuses.get(url) == "unchanged":
+                planner.record([dict(old_prices[product_url], url=product_url)
+                                for product_url in freshness.listed_products(url) if product_url in old_prices])
+        remaining = planner.remaining(details)
+        if remaining:
+            await engine.run(remaining, on_result, report=False)
+        if not quick:
+            engine.report(time.monotonic() - started)
+        print(planner.report())
+    finally:
+        if saver:
+            saver.cancel()
+        if not quick:
+            # Turlar arası /ekle taramaları biten turun süre sınırına takılmasın
+            engine.deadline = None
+        # Tur yarıda kesilse de o ana kadar görülen ürünler kaybolmasın
+        if checkpoint:
+            with metrics.phase("save_prices"):
+                await asyncio.to_thread(checkpoint.flush, dict(observed), finished(), True)
+        if own_engine:
+            await engine.close()
+    # Depo yazımları thread'de: servis modunda bot komutları beklemesin
+    await asyncio.to_thread(save_freshness)
+    await asyncio.to_thread(save_domain_health)
+
+    # Zamanlayıcı: değişen URL daha sık, değişmeyen daha seyrek taranır
+    for url in urls:
+        status = engine.statuses.get(url, "failed")
+        if url in planner.avoided:
+            status = "covered"
+        if status == "ok" and url in url_results:
+            changed, discount, count = url_results[url]
+            scheduler.update(url, changed, discount, count)
+        elif status in ("unchanged", "covered"):
+            scheduler.update(url)
+        elif status in ("skipped", "deferred"):
+            # Devresi açık domain veya tur süresi yetmedi: vade değişmez, sonraki turda öncelikli denenir
+            continue
+        else:
+            scheduler.failed(url)
+    await asyncio.to_thread(save_schedule)
+    deferred = sum(1 for status in engine.statuses.values() if status == "deferred")
+    if deferred:
+        print(f"Süre yetmedi: {deferred} URL sonraki tura ertelendi.")
+    return discount_found
+
+def plan_cycle(urls, checkpoint):
+    """
+    Tur durumunu (tazelik, domain sağlığı, zamanlama) depodan yükler ve bu turun
+    URL'lerini seçer: vakti gelenler, önceliğe göre, süre bütçesi kadar.
+    Depo ve dosya okuduğu için servis modunda thread'de çalıştırılır.
+    """
+    freshness.reset(load_freshness())
+    breaker.reset(load_domain_health())
+    scheduler.state = load_schedule()
+    scheduler.changed = {}
+    # Devresi açık domainlerin URL'leri bütçeye girmez; vadeleri bekler
+    blocked = [url for url in urls if breaker.is_open(health_key(url))]
+    if blocked:
+        print(f"Devresi açık domainler nedeniyle {len(blocked)} URL bu tur atlandı.")
+        urls = [url for url in urls if url not in set(blocked)]
+    costs = {url: record.get("seconds") for url, record in freshness.previous.items()}
+    # Önceki tur yarıda kaldıysa bitmeyen URL'leri önce taranır
+    planned = set(urls)
+    carryover = [url for url in checkpoint.carryover() if url in planned]
+    if carryover:
+        print(f"Önceki turdan kalan {len(carryover)} URL öne alındı.")
+    urls, deferred = scheduler.plan(urls, costs, first=carryover)
+    checkpoint.begin(urls)
+    if shard_outbox:
+        shard_outbox.planned(urls)
+    return urls
+
+async def run_cycle(engine=None, only_urls=None):
+    """
+    Bir tarama turu. only_urls verilirse zamanlayıcı atlanır ve sadece onlar taranır
+    (servis modunda /ekle ile gelen link). İndirim bulunduysa True döner.
+    only_urls turu servis modunda tam turla aynı anda çalışabilir: tur durumunu
+    (metrikler, tazelik, zamanlama, domain sağlığı) sıfırlamaz, tam turunkini paylaşır.
+    Depo / dosya işleri thread'de yapılır, event loop (Telegram botu) bloklanmaz.
+    """
+    if only_urls:
+        urls = list(only_urls)
+    else:
+        urls = registry.urls()
+        if not urls:
+            print("urls.txt bulunamadı veya boş!")
+            return False
+        if shard_outbox:
+            total = len(urls)
+            urls = select_shard(urls, shard_outbox.index, shard_outbox.count)
+            print(f"Shard {shard_outbox.index}/{shard_outbox.count}: {len(urls)}/{total} URL.")
+
+    if not only_urls:
+        metrics.reset()
+    deadline = RunDeadline()
+    if shard_outbox:
+        # İşçi depoya yazmaz; ara kayıtlar shard dosyasına gider
+        checkpoint = Checkpoint(shard_outbox.save_observed, path=None)
+    elif only_urls:
+        # Servis modundaki /ekle turları tam turun planını (CHECKPOINT_FILE) ezmesin
+        checkpoint = Checkpoint(save_prices, path=None)
+    else:
+        checkpoint = Checkpoint(save_prices)
+    with metrics.phase("load_prices"):
+        old_prices = await asyncio.to_thread(load_prices)
+    new_prices = old_prices.copy()
+
+    if not only_urls:
+        with metrics.phase("plan"):
+            urls = await asyncio.to_thread(plan_cycle, urls, checkpoint)
+
+    print(f"User-Agent: {USER_AGENT}")
+    print(f"Eşzamanlılık: global {GLOBAL_CONCURRENCY}, domain {DOMAIN_CONCURRENCY}")
+
+    observed = {}
+    discount_found = False
+    if urls:
+        discount_found = await run_async(urls, old_prices, new_prices, observed, engine, checkpoint, deadline,
+                                         quick=bool(only_urls))
+    else:
+        with metrics.phase("save_prices"):
+            await asyncio.to_thread(checkpoint.flush, observed, (), True)
     print("\nKontrol Tamamlandi.")
     
-    if not discount_found:
+    # Shard turlarında bu mesaj birleştirmede (tüm parçalar için bir kez) gönderilir
+    if urls and not discount_found and not only_urls and not shard_outbox:
+        send_telegram("Kontrol ettim, herhangi bir değişiklik yok.")
+    # Servis modunda bildirim kuyruğu arka planda boşalır; rapor burada yazılır.
+    # /ekle taramaları ayrı tur sayılmaz (sayaçları o an süren tam tura eklenir)
+    if engine is not None and not only_urls:
+        await write_metrics_async()
+    return discount_found
+
+def merge_shards(directory=SHARD_DIR):
+    """
+    Shard işçilerinin sonuçlarını depoya yazar, prices.json'ı yeniler ve
+    tekilleştirilmiş indirim bildirimlerini gönderir (sharding.py).
+    """
+    results = load_results(directory)
+    if not results:
+        print(f"{directory} içinde shard sonucu bulunamadı.")
+        return False
+    merged = merge_results(results)
+    with PriceStore() as store:
+        # İşçiler depoya yazmadığı için içeri alma / kopya birleştirme burada yapılır
+        prepare_store(store)
+        for ts, batch in merged["observed"]:
+            store.record_run(batch, ts)
+        store.save_schedule(merged["schedule"])
+        store.save_freshness(merged["freshness"])
+        store.save_domain_health(merged["domain_health"])
+        count, written = store.export_json(PRICES_FILE)
+    observations = sum(len(batch) for _, batch in merged["observed"])
+    print(f"{len(results)} shard birleştirildi: {merged['urls']} URL, {observations} gözlem, "
+          f"{len(merged['notifications'])} bildirim. {PRICES_FILE}: {count} ürün"
+          f"{'' if written else ' (değişmedi)'}.")
+
+    for note in merged["notifications"]:
+        photo = note.get("photo")
+        if photo and not photo.startswith("http"):
+            photo = os.path.join(directory, photo)
+        if photo:
+            send_telegram_photo(note["text"], photo)
+        else:
+            send_telegram(note["text"])
+    if merged["urls"] and not merged["notifications"]:
         send_telegram("Kontrol ettim, herhangi bir değişiklik yok.")
+    return bool(merged["notifications"])
+
+def run_workers(count, directory=SHARD_DIR):
+    """--workers N: N shard işçisini ayrı süreçlerde çalıştırır, bitince sonuçları birleştirir."""
+    clear_results(directory)
+    workers = []
+    for index in range(1, count + 1):
+        env = dict(os.environ, SHARD_DIR=directory)
+        # Chromium aynı profil klasörünü iki süreçte açamaz
+        for name in ("BROWSER_PROFILE_DIR", "STORAGE_STATE_FILE"):
+            if env.get(name):
+                env[name] = f"{env[name]}-shard{index}"
+        command = [sys.executable, "-u", os.path.abspath(__file__), "--shard", f"{index}/{count}"]
+        workers.append(subprocess.Popen(command, env=env))
+    for index, worker in enumerate(workers, 1):
+        code = worker.wait()
+        if code:
+            print(f"Shard {index}/{count} hata koduyla bitti: {code}")
+    merge_shards(directory)
+
+def cli_option(name):
+    """sys.argv'de name'den sonra gelen değer (yoksa None)."""
+    if name in sys.argv:
+        position = sys.argv.index(name) + 1
+        if position < len(sys.argv) and not sys.argv[position].startswith("--"):
+            return sys.argv[position]
+    return None
+
+async def run_until_signal():
+    """run_cycle'ı SIGTERM gelince (workflow iptali / zaman aşımı) iptal edilebilir çalıştırır."""
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass  # Windows
+    return await run_cycle()
+
+def main():
+    global profiler, shard_outbox
+    print("--- V3.0 FINAL FIX ---")
+    print("Bot Calisiyor... (Stealth Mode: ON)")
+
+    if "--shard" in sys.argv:
+        # İşçi: /ekle komutlarını birleştirme adımı işler (Telegram offset'i tek yerde ilerlesin)
+        index, count = parse_shard(cli_option("--shard") or "")
+        shard_outbox = ShardOutbox(index, count)
+    else:
+        check_new_urls()
+
+    if "--merge-shards" in sys.argv or "--workers" in sys.argv:
+        if "--workers" in sys.argv:
+            run_workers(int(cli_option("--workers") or os.cpu_count() or 1))
+        else:
+            merge_shards(cli_option("--merge-shards") or SHARD_DIR)
+        with metrics.phase("telegram_flush"):
+            notifier.close()
+        print(f"Telegram: {notifier.sent} istek gönderildi, {notifier.failed} başarısız.")
+        return
+
+    if "--profile" in sys.argv:
+        from profiler import RunProfiler
+        profiler = RunProfiler()
+        print("Profil modu: Playwright çağrıları ve Python süresi ölçülüyor...")
+        profiler.start()
+    try:
+        asyncio.run(run_until_signal())
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        print("Tur yarıda kesildi; o ana kadar taranan ürünler kaydedildi.")
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.write_report()
+        if shard_outbox:
+            shard_outbox.write()
+            print(f"Shard sonucu yazıldı: {shard_outbox.path}")
+
+    # Kuyrukta kalan bildirimlerin gönderilmesini bekle
+    with metrics.phase("telegram_flush"):
+        notifier.close()
+    print(f"Telegram: {notifier.sent} istek gönderildi, {notifier.failed} başarısız.")
+    write_metrics()
 
 if __name__ == "__main__":
     main()
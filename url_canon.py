@@ -0,0 +1,238 @@
+"""
+URL Kanonikleştirme
+Aynı ürünün / sayfanın farklı yazımlarını tek bir anahtara indirger:
+  - şema ve host küçük harf; bilinen sitelerde asıl host (gsstore.org -> www.gsstore.org)
+    ve https (bilinmeyen sitelerin şeması değiştirilmez),
+  - fragment ve takip parametreleri (utm_*, gclid, fbclid...) atılır, kalan parametreler sıralanır,
+  - sondaki eğik çizgi site kuralına göre eklenir / atılır,
+  - sayfalama yoksa sıralama parametreleri (order, direction) atılır,
+  - product=True ise (ürün kayıtları) beden / kopya ekleri de atılır, renk eki kalır:
+        /galatasaray-5-yildiz-t-shirt-e251352-2-3/ -> /galatasaray-5-yildiz-t-shirt-e251352-2-1/
+        /galatasaray-erkek-t-shirt-e231119-223-2/  -> /galatasaray-erkek-t-shirt-e231119-223/
+        /basketbol-forma-erkek-e222500-10/         -> /basketbol-forma-erkek-e222500/
+    GSStore'da ürün kodundan sonraki ilk ek 3 haneliyse veya arkasından başka ek geliyorsa
+    renktir (E251352-1 / E251352-2, E231158-301 / E231158-302 ayrı ürünlerdir); tek başına
+    1-2 haneli ek aynı ürünün kopyasıdır. 1-2 haneli renk ekinin arkasına "-1" konur ki
+    kanonik URL tekrar kanonikleştirilince değişmesin (ve sitede açılabilsin).
+Tarama hedefleri (urls.txt) varyant eki atılmadan kanonikleştirilir; sayfa açılabilir kalsın.
+
+Mevcut kayıtları birleştirmek için:
+    python url_canon.py migrate     # prices.db, prices.json ve urls.txt
+Kuralları örnek URL'lerle denemek için:
+    python url_canon.py check
+"""
+
+import json
+import os
+import re
+import sys
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from price_store import DB_FILE, PriceStore, write_prices_json
+from url_registry import UrlRegistry
+
+TRACKING_PARAMS = {"gclid", "fbclid", "yclid", "msclkid", "srsltid", "_ga", "_gl", "mc_cid", "mc_eid", "ref"}
+TRACKING_PREFIXES = ("utm_",)
+
+# Site kuralları (domain_key ile aynı anahtarlar)
+#   host:           Asıl host
+#   trailing_slash: True -> her yol "/" ile biter, False -> sondaki "/" atılır
+#   order_params:   Sayfalama yoksa atılan sıralama parametreleri
+#   page_params:    Sayfalama parametreleri
+#   variant_re:     Ürün yolunu (ürün koduna kadar, ek dizisi) olarak bölen desen; ek dizisinden
+#                   sadece renk eki korunur (colour_suffix)
+#   detail_re:      Tekil ürün (detay) sayfası yolu; eşleşmeyenler liste sayfası sayılır
+SITE_RULES = {
+    "gsstore.org": {
+        "host": "www.gsstore.org",
+        "trailing_slash": True,
+        "order_params": ("sorter", "order"),
+        "page_params": ("page",),
+        # ...-e251352-2-1/ : ürün kodu (harf + 5-6 hane) sonrası sayısal ekler
+        "variant_re": re.compile(r"^(/.+-[a-z]\d{5,6})((?:-\d{1,3})*)/?$"),
+        "detail_re": re.compile(r"-[a-z]\d{5,6}(?:-\d{1,3})*/?$"),
+    },
+    "saatvesaat.com.tr": {
+        "host": "www.saatvesaat.com.tr",
+        "trailing_slash": False,
+        "order_params": ("order", "direction"),
+        "page_params": ("pi",),
+        "variant_re": None,
+        "detail_re": re.compile(r"-p-[\w-]+/?$"),
+    },
+}
+
+
+def site_rules(host):
+    host = host.lower()
+    for key, rules in SITE_RULES.items():
+        if host == key or host.endswith("." + key):
+            return rules
+    return None
+
+
+def colour_suffix(suffixes):
+    """
+    GSStore ek dizisinden (-2-3, -301-1, -4...) korunacak renk eki.
+    3 haneli ilk ek renktir; 1-2 haneli ilk ek sadece arkasından başka ek geliyorsa renktir
+    ve "-1" ile korunur (-2-3 -> -2-1), böylece sonuç tekrar aynı kurala girince değişmez.
+    """
+    parts = suffixes.split("-")[1:]
+    if parts and len(parts[0]) == 3:
+        return f"-{parts[0]}"
+    if len(parts) > 1:
+        return f"-{parts[0]}-1"
+    return ""
+
+
+def canonical_url(url, product=False):
+    """URL'nin kanonik biçimi. product=True ise varyant ekleri de atılır."""
+    url = (url or "").strip()
+    parsed = urlparse(url)
+    # urlparse şemayı küçük harfe çevirir (HTTPS://... da kanonikleşir)
+    if parsed.scheme not in ("http", "https"):
+        return url
+    scheme = parsed.scheme
+    host = parsed.netloc.lower()
+    rules = site_rules(host)
+    path = parsed.path or "/"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PREFIXES)
+    ]
+
+    if rules:
+        scheme = "https"
+        host = rules["host"]
+        keys = {k for k, _ in query}
+        if not keys.intersection(rules["page_params"]):
+            query = [(k, v) for k, v in query if k not in rules["order_params"]]
+        if product:
+            query = []
+            if rules["variant_re"]:
+                match = rules["variant_re"].match(path)
+                if match:
+                    path = match.group(1) + colour_suffix(match.group(2))
+        if path != "/":
+            path = path.rstrip("/") + ("/" if rules["trailing_slash"] else "")
+
+    return urlunparse((scheme, host, path, "", urlencode(sorted(query), safe="[]"), ""))
+
+
+def is_detail_url(url):
+    """Bilinen bir sitenin tekil ürün sayfası mı? (Bilinmeyen siteler için False)"""
+    parsed = urlparse(url)
+    rules = site_rules(parsed.netloc)
+    return bool(rules and rules.get("detail_re") and rules["detail_re"].search(parsed.path))
+
+
+def canonical_map(urls, product=False):
+    """Kanonik biçimi farklı olanlar için {eski: kanonik} döndürür."""
+    mapping = {}
+    for url in urls:
+        canon = canonical_url(url, product)
+        if canon != url:
+            mapping[url] = canon
+    return mapping
+
+
+def merge_prices(data):
+    """
+    prices.json biçimindeki kayıtları kanonik anahtarlarda birleştirir.
+    Aynı ürünün kopyalarından en son güncelleneni kalır.
+    """
+    merged = {}
+    for url, record in data.items():
+        canon = canonical_url(url, product=True)
+        kept = merged.get(canon)
+        if kept is None or record.get("updated_at", 0) > kept.get("updated_at", 0):
+            merged[canon] = record
+    return merged
+
+
+# (url, product, beklenen) -- python url_canon.py check
+CHECK_CASES = [
+    ("https://gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-2-1/?utm_source=x#top", False,
+     "https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-2-1/"),
+    ("https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-2-1/", True,
+     "https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-2-1/"),
+    ("https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-2-3/", True,
+     "https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-2-1/"),
+    ("https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-1-1/", True,
+     "https://www.gsstore.org/galatasaray-5-yildiz-t-shirt-e251352-1-1/"),
+    ("https://www.gsstore.org/galatasaray-gsfit-erkek-t-shirt-e231158-301-1/", True,
+     "https://www.gsstore.org/galatasaray-gsfit-erkek-t-shirt-e231158-301/"),
+    ("https://www.gsstore.org/galatasaray-gsfit-erkek-t-shirt-e231158-302-1/", True,
+     "https://www.gsstore.org/galatasaray-gsfit-erkek-t-shirt-e231158-302/"),
+    ("https://www.gsstore.org/galatasaray-erkek-t-shirt-e231119-223-2/", True,
+     "https://www.gsstore.org/galatasaray-erkek-t-shirt-e231119-223/"),
+    ("https://www.gsstore.org/galatasaray-erkek-t-shirt-e231119-223/", True,
+     "https://www.gsstore.org/galatasaray-erkek-t-shirt-e231119-223/"),
+    ("https://www.gsstore.org/basketbol-forma-erkek-e222500-10/", True,
+     "https://www.gsstore.org/basketbol-forma-erkek-e222500/"),
+    ("https://www.gsstore.org/galatasaray-metin-oktay-ceket-e88100-k023-e88100-209-1/", True,
+     "https://www.gsstore.org/galatasaray-metin-oktay-ceket-e88100-k023-e88100-209/"),
+    ("https://www.gsstore.org/galatasaray-24-kolaj-t-shirt-e241407-4/", True,
+     "https://www.gsstore.org/galatasaray-24-kolaj-t-shirt-e241407/"),
+    ("https://www.gsstore.org/galatasaray-24-kolaj-t-shirt-e241407", True,
+     "https://www.gsstore.org/galatasaray-24-kolaj-t-shirt-e241407/"),
+    ("https://www.gsstore.org/erkek/?order=price&page=2", False,
+     "https://www.gsstore.org/erkek/?order=price&page=2"),
+    ("https://www.gsstore.org/erkek/?sorter=price", False, "https://www.gsstore.org/erkek/"),
+    ("HTTPS://WWW.GSSTORE.ORG/erkek/", False, "https://www.gsstore.org/erkek/"),
+    ("http://gsstore.org/erkek", False, "https://www.gsstore.org/erkek/"),
+    ("HTTP://Example.com/urun?utm_source=x", False, "http://example.com/urun"),
+    ("https://example.com/urun/", False, "https://example.com/urun/"),
+    ("ftp://example.com/dosya", False, "ftp://example.com/dosya"),
+    ("https://saatvesaat.com.tr/erkek-saat/?order=price&direction=asc", False,
+     "https://www.saatvesaat.com.tr/erkek-saat"),
+]
+
+
+def check():
+    """Kanonikleştirme kurallarını örneklerle dener; hepsi tutuyorsa True."""
+    failed = 0
+    for url, product, expected in CHECK_CASES:
+        got = canonical_url(url, product)
+        # Kanonik URL tekrar kanonikleştirilince değişmemeli
+        again = canonical_url(got, product)
+        if got != expected or again != got:
+            failed += 1
+            print(f"HATA: {url} (product={product})\n  beklenen: {expected}\n  bulunan:  {got}"
+                  f"\n  tekrar:   {again}")
+    print(f"{len(CHECK_CASES) - failed}/{len(CHECK_CASES)} örnek doğru.")
+    return not failed
+
+
+def migrate(db_path=DB_FILE, prices_path="prices.json", urls_path="urls.txt"):
+    """Mevcut kopyaları birleştirir. Birden fazla çalıştırılabilir (ikincisi bir şey yapmaz)."""
+    registry = UrlRegistry(urls_path, normalize=canonical_url)
+    before = len(UrlRegistry(urls_path).urls())
+    after = registry.normalize_file()
+    print(f"{urls_path}: {before} -> {after} URL")
+
+    if os.path.exists(db_path):
+        with PriceStore(db_path) as store:
+            merged = store.merge_urls(canonical_map(store.latest(), product=True))
+            store.rename_targets(canonical_map(store.target_urls()))
+            count, written = store.export_json(prices_path)
+        print(f"{db_path}: {merged} kopya kayıt birleştirildi, {prices_path}: {count} ürün")
+    elif os.path.exists(prices_path):
+        with open(prices_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        merged = merge_prices(data)
+        write_prices_json(prices_path, merged)
+        print(f"{prices_path}: {len(data)} -> {len(merged)} ürün")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate()
+    elif len(sys.argv) > 1 and sys.argv[1] == "check":
+        sys.exit(0 if check() else 1)
+    elif len(sys.argv) > 1:
+        for arg in sys.argv[1:]:
+            print(canonical_url(arg), canonical_url(arg, product=True))
+    else:
+        print(__doc__)
@@ -0,0 +1,140 @@
+"""
+Ortak URL Kaydı (urls.txt)
+tracker.py ve run_bot.py aynı dosyayı kullanır. Burada:
+  - URL'ler sıralı bir küme olarak bellekte tutulur (dict: O(1) üyelik, ekleme sırası korunur),
+  - dosya sadece değiştiyse (mtime/boyut/inode) yeniden okunur,
+  - yazmalar urls.txt.lock üzerinde flock ile kilitlenir ve atomik yapılır
+    (geçici dosya + rename), böylece bot ile tracker aynı anda yazınca satır kaybolmaz,
+    tekrarlanmaz, boş satır oluşmaz.
+normalize verilirse (ör. url_canon.canonical_url) okunan ve eklenen her URL ondan geçer.
+"""
+
+import os
+from contextlib import contextmanager
+
+from price_store import write_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows: kilit yok, atomik yazım yine geçerli
+    fcntl = None
+
+URLS_FILE = "urls.txt"
+
+
+class UrlRegistry:
+    def __init__(self, path=URLS_FILE, normalize=None):
+        self.path = path
+        self.normalize = normalize  # ör. url_canon.canonical_url
+        self.lock_path = path + ".lock"
+        self._urls = {}       # url -> None (sıralı küme)
+        self._signature = None
+
+    @contextmanager
+    def _locked(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read(self):
+        urls = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        urls[self.normalize(line) if self.normalize else line] = None
+        self._urls = urls
+        self._signature = self._stat()
+
+    def reload(self, force=False):
+        """Dosya son okumadan beri değiştiyse yeniden okur."""
+        if not force and self._signature is not None and self._stat() == self._signature:
+            return
+        with self._locked(exclusive=False):
+            self._read()
+
+    def _write(self):
+        text = "".join(f"{url}\n" for url in self._urls)
+        write_atomic(self.path, text)
+        self._signature = self._stat()
+
+    # --- Okuma ---
+    def urls(self):
+        self.reload()
+        return list(self._urls)
+
+    def __contains__(self, url):
+        self.reload()
+        return (self.normalize(url) if self.normalize else url) in self._urls
+
+    def __len__(self):
+        self.reload()
+        return len(self._urls)
+
+    def __iter__(self):
+        return iter(self.urls())
+
+    # --- Yazma ---
+    def add_many(self, urls):
+        """Listede olmayanları ekler, eklenenleri döndürür."""
+        with self._locked(exclusive=True):
+            self._read()
+            added = []
+            for url in urls:
+                url = url.strip()
+                if url and self.normalize:
+                    url = self.normalize(url)
+                if url and url not in self._urls:
+                    self._urls[url] = None
+                    added.append(url)
+            if added:
+                self._write()
+        return added
+
+    def add(self, url):
+        """Eklendiyse True, zaten varsa False."""
+        return bool(self.add_many([url]))
+
+    def normalize_file(self):
+        """Dosyayı normalize edilmiş ve tekilleştirilmiş haliyle yeniden yazar. URL sayısını döndürür."""
+        with self._locked(exclusive=True):
+            self._read()
+            self._write()
+        return len(self._urls)
+
+    def remove(self, url):
+        if self.normalize:
+            url = self.normalize(url)
+        with self._locked(exclusive=True):
+            self._read()
+            if url not in self._urls:
+                return False
+            del self._urls[url]
+            self._write()
+        return True
+
+    def remove_at(self, index):
+        """0 tabanlı sıradaki URL'yi siler ve döndürür; geçersiz sırada None."""
+        with self._locked(exclusive=True):
+            self._read()
+            urls = list(self._urls)
+            if index < 0 or index >= len(urls):
+                return None
+            removed = urls[index]
+            del self._urls[removed]
+            self._write()
+        return removed